@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accountModule', '0002_userprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentinstallmentschedule',
+            name='is_overdue',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='paymentinstallmentschedule',
+            index=models.Index(fields=['is_paid', 'due_date'], name='schedule_paid_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentinstallmentschedule',
+            index=models.Index(condition=models.Q(('is_overdue', True)), fields=['due_date'], name='schedule_overdue_idx'),
+        ),
+    ]
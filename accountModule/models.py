@@ -47,6 +47,14 @@ class PaymentInstallmentSchedule(models.Model):
     amount_due = models.DecimalField(max_digits=10, decimal_places=2)
     is_paid = models.BooleanField(default=False)
     paid_at = models.DateTimeField(null=True, blank=True)
+    # Set by the daily overdue job (bankModule.overdue) while the installment is unpaid past its due date.
+    is_overdue = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_paid', 'due_date'], name='schedule_paid_due_idx'),
+            models.Index(fields=['due_date'], condition=models.Q(is_overdue=True), name='schedule_overdue_idx'),
+        ]
 
     def __str__(self):
         return f"Installment due {self.due_date} - Amount: {self.amount_due}"
@@ -19,7 +19,8 @@ class CustomUserSerializer(serializers.ModelSerializer):
 class PaymentInstallmentScheduleSerializer(serializers.ModelSerializer):
     class Meta:
         model = PaymentInstallmentSchedule
-        fields = ['id', 'due_date', 'amount_due', 'is_paid', 'paid_at']
+        fields = ['id', 'due_date', 'amount_due', 'is_paid', 'paid_at', 'is_overdue']
+        read_only_fields = ['is_overdue']
 
 
 # Serializer for payment installments
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AgriculturemoduleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'agricultureModule'
+
+    def ready(self):
+        from . import signals  # noqa: F401
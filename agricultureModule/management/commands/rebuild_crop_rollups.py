@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from agricultureModule.models import CropYieldRollup
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the crop yield rollup table from the Crop table."
+
+    def handle(self, *args, **options):
+        rollups = CropYieldRollup.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(rollups)} crop yield rollup rows"))
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-18 15:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agricultureModule', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CropYieldRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('usage', models.CharField(choices=[('SALE', 'Sale'), ('ANIMAL_FEED', 'Animal Feed')], max_length=50, verbose_name='Usage')),
+                ('harvest_month', models.DateField(verbose_name='Harvest Month')),
+                ('crop_count', models.IntegerField(default=0, verbose_name='Crop Count')),
+                ('total_yield', models.FloatField(default=0, verbose_name='Total Yield (tons)')),
+                ('land', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='crop_rollups', to='agricultureModule.land', verbose_name='Land')),
+                ('region', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='crop_rollups', to='agricultureModule.region', verbose_name='Region')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['region', 'harvest_month'], name='crop_rollup_region_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('land', 'usage', 'harvest_month'), name='unique_crop_yield_bucket')],
+            },
+        ),
+    ]
@@ -99,18 +99,129 @@ class Statistics(models.Model):
 
     @staticmethod
     def generate_statistics():
+        """
+        Computes the land and crop totals of every region in one aggregate query and stores them in one insert.
+        """
         from django.db.models import Sum, Count
-        
-        stats = []
-        for region in Region.objects.all():
-            total_land = region.lands.count()
-            total_crops = Crop.objects.filter(land__region=region).count()
-            total_yield = Crop.objects.filter(land__region=region).aggregate(Sum("quantity"))["quantity__sum"] or 0
-            
-            stats.append(Statistics.objects.create(
+
+        # Lands are repeated once per crop by the join, so they are counted distinctly;
+        # each crop still appears once, so its count and quantity sum need no dedup.
+        regions = Region.objects.annotate(
+            land_count=Count("lands", distinct=True),
+            crop_count=Count("lands__crops"),
+            yield_sum=Sum("lands__crops__quantity"),
+        )
+        return Statistics.objects.bulk_create([
+            Statistics(
                 region=region,
-                total_land=total_land,
-                total_crops=total_crops,
-                total_yield=total_yield,
-            ))
-        return stats
+                total_land=region.land_count,
+                total_crops=region.crop_count,
+                total_yield=region.yield_sum or 0,
+            )
+            for region in regions
+        ])
+
+
+class CropYieldRollup(models.Model):
+    """
+    Crop count and yield per (region, land, usage, harvest month).
+
+    Kept up to date by the Crop signals in agricultureModule.signals, which apply the difference
+    each save or delete makes. Only active crops with a harvest date are counted. Bulk writes
+    (queryset.update(), bulk_create) bypass the signals: run `manage.py rebuild_crop_rollups` after them.
+    """
+    region = models.ForeignKey(Region, on_delete=models.CASCADE, related_name="crop_rollups", verbose_name=_("Region"))
+    land = models.ForeignKey(Land, on_delete=models.CASCADE, related_name="crop_rollups", verbose_name=_("Land"))
+    usage = models.CharField(max_length=50, choices=CropUsageChoices.choices, verbose_name=_("Usage"))
+    harvest_month = models.DateField(verbose_name=_("Harvest Month"))
+    crop_count = models.IntegerField(default=0, verbose_name=_("Crop Count"))
+    total_yield = models.FloatField(default=0, verbose_name=_("Total Yield (tons)"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["land", "usage", "harvest_month"], name="unique_crop_yield_bucket"),
+        ]
+        indexes = [
+            models.Index(fields=["region", "harvest_month"], name="crop_rollup_region_month_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.land.name} - {self.usage} ({self.harvest_month:%Y-%m})"
+
+    @staticmethod
+    def bucket(region_id, land_id, usage, harvest_date, is_active):
+        """
+        Key of the bucket a crop with these values counts towards, or None if it is not counted.
+        Values are converted first: a crop holds whatever was assigned (e.g. strings) until it is reloaded.
+        """
+        harvest_date = models.DateField().to_python(harvest_date)
+        if not models.BooleanField().to_python(is_active) or harvest_date is None:
+            return None
+        return (region_id, land_id, usage, harvest_date.replace(day=1))
+
+    @staticmethod
+    def apply_delta(bucket, crop_count, total_yield):
+        """
+        Adds crop_count and total_yield to a bucket with an F() update, creating the bucket if needed.
+        """
+        from django.db.models import F
+
+        region_id, land_id, usage, harvest_month = bucket
+        rows = CropYieldRollup.objects.filter(land_id=land_id, usage=usage, harvest_month=harvest_month)
+        if not rows.update(crop_count=F("crop_count") + crop_count, total_yield=F("total_yield") + total_yield):
+            rollup, created = CropYieldRollup.objects.get_or_create(
+                land_id=land_id, usage=usage, harvest_month=harvest_month,
+                defaults={"region_id": region_id, "crop_count": crop_count, "total_yield": total_yield},
+            )
+            if not created:
+                rows.update(crop_count=F("crop_count") + crop_count, total_yield=F("total_yield") + total_yield)
+        if crop_count < 0:
+            rows.filter(crop_count__lte=0).delete()
+
+    @staticmethod
+    def rebuild():
+        """
+        Recomputes the whole table from Crop in one aggregate query.
+        """
+        from django.db import transaction
+        from django.db.models import Count, Sum
+        from django.db.models.functions import TruncMonth
+
+        buckets = (
+            Crop.objects.filter(is_active=True, harvest_date__isnull=False)
+            .annotate(harvest_month=TruncMonth("harvest_date"))
+            .values("land__region", "land", "usage", "harvest_month")
+            .annotate(crop_count=Count("id"), total_yield=Sum("quantity"))
+            .order_by()
+        )
+        with transaction.atomic():
+            CropYieldRollup.objects.all().delete()
+            return CropYieldRollup.objects.bulk_create([
+                CropYieldRollup(
+                    region_id=row["land__region"],
+                    land_id=row["land"],
+                    usage=row["usage"],
+                    harvest_month=row["harvest_month"],
+                    crop_count=row["crop_count"],
+                    total_yield=row["total_yield"],
+                )
+                for row in buckets.iterator()
+            ], batch_size=1000)
+
+    @staticmethod
+    def yield_per_region(months=24):
+        """
+        Total yield per region and harvest month over the last `months` months, read from the rollup table.
+        """
+        from django.db.models import Sum
+        from django.utils import timezone
+
+        today = timezone.localdate()
+        month_index = today.year * 12 + today.month - months
+        since = today.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+        return (
+            CropYieldRollup.objects.filter(harvest_month__gte=since)
+            .values("region", "region__name", "harvest_month")
+            .annotate(total_yield=Sum("total_yield"), crop_count=Sum("crop_count"))
+            .order_by("region__name", "harvest_month")
+        )
@@ -0,0 +1,61 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import Crop, CropYieldRollup, Land
+
+
+def _crop_bucket(crop):
+    return CropYieldRollup.bucket(crop.land.region_id, crop.land_id, crop.usage, crop.harvest_date, crop.is_active)
+
+
+@receiver(pre_save, sender=Crop)
+def remember_crop_bucket(sender, instance, raw=False, **kwargs):
+    """
+    Stores the bucket and quantity the crop counted towards before this save.
+    """
+    instance._rollup_previous = None
+    if raw or instance.pk is None:
+        return
+    previous = (
+        Crop.objects.filter(pk=instance.pk)
+        .values_list("land__region", "land", "usage", "harvest_date", "is_active", "quantity")
+        .first()
+    )
+    if previous is not None:
+        instance._rollup_previous = (CropYieldRollup.bucket(*previous[:5]), previous[5])
+
+
+@receiver(post_save, sender=Crop)
+def update_crop_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_bucket, old_quantity = getattr(instance, "_rollup_previous", None) or (None, 0)
+    new_bucket = _crop_bucket(instance)
+    quantity = float(instance.quantity)
+    if old_bucket == new_bucket:
+        if new_bucket is not None and quantity != old_quantity:
+            CropYieldRollup.apply_delta(new_bucket, 0, quantity - old_quantity)
+        return
+    if old_bucket is not None:
+        CropYieldRollup.apply_delta(old_bucket, -1, -old_quantity)
+    if new_bucket is not None:
+        CropYieldRollup.apply_delta(new_bucket, 1, quantity)
+
+
+@receiver(post_delete, sender=Crop)
+def remove_crop_from_rollup(sender, instance, **kwargs):
+    try:
+        bucket = _crop_bucket(instance)
+    except Land.DoesNotExist:
+        # The land is being deleted too; its rollup rows go with it.
+        return
+    if bucket is not None:
+        CropYieldRollup.apply_delta(bucket, -1, -float(instance.quantity))
+
+
+@receiver(post_save, sender=Land)
+def move_land_rollups(sender, instance, raw=False, created=False, **kwargs):
+    """
+    Keeps the region of a land's rollup rows in line when the land moves to another region.
+    """
+    if not raw and not created:
+        CropYieldRollup.objects.filter(land=instance).exclude(region_id=instance.region_id).update(region_id=instance.region_id)
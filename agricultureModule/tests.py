@@ -1,3 +1,107 @@
+from datetime import date, timedelta
 from django.test import TestCase
+from django.utils import timezone
+from .models import Crop, CropYieldRollup, Land, Region, Statistics
 
-# Create your tests here.
+
+class GenerateStatisticsTests(TestCase):
+    def add_region(self, index, lands=2, crops_per_land=3):
+        region = Region.objects.create(name=f"Region {index}")
+        for land_index in range(lands):
+            land = Land.objects.create(region=region, land_id=f"L-{index}-{land_index}", name="Land")
+            for crop_index in range(crops_per_land):
+                Crop.objects.create(
+                    land=land, crop_id=f"C-{index}-{land_index}-{crop_index}", status="Growing",
+                    quantity=1.5, usage="SALE",
+                )
+        return region
+
+    def test_totals_per_region(self):
+        busy = self.add_region(1)
+        empty = self.add_region(2, lands=0)
+        bare = self.add_region(3, lands=1, crops_per_land=0)
+
+        stats = {stat.region_id: stat for stat in Statistics.generate_statistics()}
+
+        self.assertEqual((stats[busy.pk].total_land, stats[busy.pk].total_crops, stats[busy.pk].total_yield), (2, 6, 9.0))
+        self.assertEqual((stats[empty.pk].total_land, stats[empty.pk].total_crops, stats[empty.pk].total_yield), (0, 0, 0))
+        self.assertEqual((stats[bare.pk].total_land, stats[bare.pk].total_crops, stats[bare.pk].total_yield), (1, 0, 0))
+        self.assertEqual(Statistics.objects.count(), 3)
+
+    def test_query_count_does_not_grow_with_regions(self):
+        self.add_region(1)
+        # One aggregate SELECT over all regions and one INSERT.
+        with self.assertNumQueries(2):
+            Statistics.generate_statistics()
+
+        for index in range(2, 12):
+            self.add_region(index)
+        with self.assertNumQueries(2):
+            stats = Statistics.generate_statistics()
+        self.assertEqual(len(stats), 11)
+
+
+class CropYieldRollupTests(TestCase):
+    def setUp(self):
+        self.region = Region.objects.create(name="North")
+        self.land = Land.objects.create(region=self.region, land_id="L-1", name="Field")
+
+    def rollups(self):
+        return {
+            (row.land_id, row.usage, row.harvest_month): (row.crop_count, row.total_yield)
+            for row in CropYieldRollup.objects.all()
+        }
+
+    def crop(self, crop_id, harvest_date, quantity, usage="SALE"):
+        return Crop.objects.create(
+            land=self.land, crop_id=crop_id, status="Harvested", quantity=quantity, harvest_date=harvest_date,
+            usage=usage,
+        )
+
+    def test_create_update_move_and_delete_deltas(self):
+        january = date(2025, 1, 1)
+        crop = self.crop("C-1", "2025-01-20", "3.5")
+        self.crop("C-2", date(2025, 1, 5), 1.5)
+        self.assertEqual(self.rollups(), {(self.land.pk, "SALE", january): (2, 5.0)})
+
+        crop.quantity = "4.5"
+        crop.save()
+        self.assertEqual(self.rollups(), {(self.land.pk, "SALE", january): (2, 6.0)})
+
+        crop.harvest_date = "2025-02-03"
+        crop.usage = "ANIMAL_FEED"
+        crop.save()
+        self.assertEqual(self.rollups(), {
+            (self.land.pk, "SALE", january): (1, 1.5),
+            (self.land.pk, "ANIMAL_FEED", date(2025, 2, 1)): (1, 4.5),
+        })
+
+        crop.is_active = False
+        crop.save()
+        self.assertEqual(self.rollups(), {(self.land.pk, "SALE", january): (1, 1.5)})
+        Crop.objects.get(crop_id="C-2").delete()
+        self.assertEqual(self.rollups(), {})
+
+    def test_rebuild_matches_the_incremental_rollups(self):
+        self.crop("C-1", date(2025, 1, 20), 3.5)
+        self.crop("C-2", date(2025, 3, 2), 2.0, usage="ANIMAL_FEED")
+        self.crop("C-3", None, 9.0)
+        incremental = self.rollups()
+        Crop.objects.filter(crop_id="C-1").update(quantity=10.0)  # bypasses the signals
+
+        CropYieldRollup.rebuild()
+        self.assertEqual(self.rollups(), {**incremental, (self.land.pk, "SALE", date(2025, 1, 1)): (1, 10.0)})
+
+    def test_yield_per_region(self):
+        today = timezone.localdate()
+        self.crop("C-1", today, 2.0)
+        self.crop("C-2", today.replace(day=1), 1.0)
+        self.crop("C-3", today - timedelta(days=3 * 365), 5.0)
+        other = Land.objects.create(region=Region.objects.create(name="South"), land_id="L-2", name="Field")
+        Crop.objects.create(land=other, crop_id="C-4", status="Harvested", quantity=4.0, harvest_date=today, usage="SALE")
+
+        rows = list(CropYieldRollup.yield_per_region(months=24))
+        self.assertEqual(
+            [(row["region__name"], row["harvest_month"], row["crop_count"], row["total_yield"]) for row in rows],
+            [("North", today.replace(day=1), 2, 3.0), ("South", today.replace(day=1), 1, 4.0)],
+        )
@@ -0,0 +1,182 @@
+"""
+Loan amortization schedules.
+
+A loan is repaid in installments_count equal installments, one every duration / installments_count
+months from the receipt date, at interest_rate percent a year on the outstanding balance.
+Schedules are computed with numpy for a whole batch of loans at once, in integer cents: the
+balances come from the annuity closed form, each principal is the drop in the balance, and the last
+installment settles whatever balance is left (never more than a regular one, as the level payment
+is rounded up to the cent), reconciled in Decimal so the principals add up to the loan amount to the cent.
+
+Paid installments are kept: a regenerated schedule re-amortizes the outstanding principal over the
+remaining installments, so a rate change only affects what is still to be paid.
+"""
+from decimal import Decimal
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+from .models import Installment, Loan, LoanReport
+
+BATCH_SIZE = 2000           # loans computed and written per transaction
+INSERT_BATCH_SIZE = 5000
+
+
+def months_per_installment(duration, installments_count):
+    return max(1, duration // installments_count) if installments_count else 1
+
+
+def amortize(principals, annual_rates, counts, months_per_period):
+    """
+    Schedules of a batch of loans: principals in cents, annual rates in percent, counts of
+    installments and months between installments, one entry per loan.
+
+    Returns (payment, principal, interest, balance) int64 cent arrays of shape
+    (loans, max(counts)); column j is installment j + 1 and balance is what remains after it.
+    Columns past a loan's count are zero.
+    """
+    principals = np.asarray(principals, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.int64)
+    rates = np.asarray(annual_rates, dtype=np.float64) / 100 * np.asarray(months_per_period) / 12
+    width = int(counts.max(initial=0))
+    periods = np.arange(width + 1)
+    active = counts > 0
+    safe_counts = np.where(active, counts, 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (1 + rates)[:, None] ** periods
+        interest_bearing = rates > 0
+        level = np.where(
+            interest_bearing,
+            principals * rates / (1 - (1 + rates) ** -safe_counts),
+            principals / safe_counts,
+        )
+        # Rounded up to the cent (the epsilon keeps float noise on a whole cent from adding one): the
+        # balance then falls slightly ahead of the exact schedule and the last installment only
+        # absorbs a small surplus. Rounded down, the shortfall would pile up on the last installment.
+        payment = np.ceil(level - 1e-6)
+        # Balance after each payment of the rounded installment; the last one absorbs the rounding.
+        balance = np.where(
+            interest_bearing[:, None],
+            principals[:, None] * growth - payment[:, None] * (growth - 1) / rates[:, None],
+            principals[:, None] - payment[:, None] * periods,
+        )
+    balance = np.maximum(np.rint(balance), 0).astype(np.int64)
+    balance[periods >= counts[:, None]] = 0
+    balance[~active] = 0
+
+    principal = balance[:, :-1] - balance[:, 1:]
+    installments = periods[:-1]
+    last = installments == (counts[:, None] - 1)
+    regular = np.maximum(payment.astype(np.int64)[:, None] - principal, 0)
+    final = np.rint(balance[:, :-1] * rates[:, None]).astype(np.int64)
+    interest = np.where(last, final, regular)
+    interest[installments >= counts[:, None]] = 0
+    return principal + interest, principal, interest, balance[:, 1:]
+
+
+def due_dates(receipt_dates, first_periods, months_per_period, width):
+    """
+    Due dates of installments first_periods + 1 ... first_periods + width of each loan, as a
+    datetime64[D] array. A receipt on the 31st falls due on the last day of shorter months.
+    """
+    receipts = np.array(receipt_dates, dtype='datetime64[D]')
+    months = receipts.astype('datetime64[M]')
+    days = (receipts - months.astype('datetime64[D]')).astype(np.int64)
+    offsets = (np.asarray(first_periods)[:, None] + np.arange(1, width + 1)) * np.asarray(months_per_period)[:, None]
+    due_months = months[:, None] + offsets.astype('timedelta64[M]')
+    starts = due_months.astype('datetime64[D]')
+    lengths = ((due_months + 1).astype('datetime64[D]') - starts).astype(np.int64)
+    return starts + np.minimum(days[:, None], lengths - 1).astype('timedelta64[D]')
+
+
+def cents(value):
+    return int(value * 100)
+
+
+def money(value):
+    return Decimal(value).scaleb(-2)
+
+
+def _paid_so_far(loan_ids):
+    # Installments paid before the schedule existed have no principal split: count them as principal.
+    return {
+        row['loan_id']: row
+        for row in Installment.objects.filter(loan_id__in=loan_ids, is_paid=True)
+        .values('loan_id')
+        .annotate(count=Count('id'), principal=Coalesce(Sum(Coalesce('principal', 'amount')), Decimal(0)))
+        .order_by()
+    }
+
+
+def _schedule_batch(loans):
+    paid = _paid_so_far([loan.pk for loan in loans])
+    no_payments = {'count': 0, 'principal': Decimal(0)}
+    paid_counts, outstanding, remaining = [], [], []
+    for loan in loans:
+        done = paid.get(loan.pk, no_payments)
+        paid_counts.append(done['count'])
+        outstanding.append(max(loan.amount - done['principal'], Decimal(0)))
+        remaining.append(max(loan.installments_count - done['count'], 0) if outstanding[-1] else 0)
+    steps = [months_per_installment(loan.duration, loan.installments_count) for loan in loans]
+
+    payment, principal, interest, balance = amortize(
+        [cents(amount) for amount in outstanding], [loan.interest_rate for loan in loans], remaining, steps
+    )
+    dates = due_dates([loan.receipt_date for loan in loans], paid_counts, steps, payment.shape[1])
+
+    installments = []
+    loan_rows, columns = np.nonzero(np.arange(payment.shape[1]) < np.asarray(remaining)[:, None])
+    rows = zip(
+        loan_rows.tolist(), columns.tolist(), dates[loan_rows, columns].tolist(),
+        payment[loan_rows, columns].tolist(), principal[loan_rows, columns].tolist(),
+        interest[loan_rows, columns].tolist(),
+    )
+    for index, column, due_date, amount, principal_cents, interest_cents in rows:
+        loan = loans[index]
+        if column == 0:
+            left = outstanding[index]
+            loan.installment_amount = money(amount)
+        installment_principal = money(principal_cents)
+        left -= installment_principal
+        if column == remaining[index] - 1 and left:
+            installment_principal += left
+            left = Decimal(0)
+        installment_interest = money(interest_cents)
+        installments.append(Installment(
+            loan_id=loan.pk,
+            due_date=due_date,
+            amount=installment_principal + installment_interest,
+            principal=installment_principal,
+            interest=installment_interest,
+            balance=left,
+        ))
+    return installments
+
+
+def generate_schedules(loans, batch_size=BATCH_SIZE):
+    """
+    Replaces the unpaid installments of loans (a queryset or a list) with freshly computed ones and
+    updates their installment_amount. Each batch of loans is written in one transaction.
+    Returns the number of installments created.
+    """
+    if not isinstance(loans, list):
+        loans = list(loans.only('id', 'amount', 'receipt_date', 'duration', 'interest_rate',
+                                'installments_count', 'installment_amount'))
+    created = 0
+    for start in range(0, len(loans), batch_size):
+        batch = loans[start:start + batch_size]
+        installments = _schedule_batch(batch)
+        with transaction.atomic():
+            unpaid = Installment.objects.filter(loan__in=[loan.pk for loan in batch], is_paid=False)
+            removed = unpaid.aggregate(count=Count('id'), interest=Sum('interest', default=Decimal(0)))
+            unpaid.delete()
+            Installment.objects.bulk_create(installments, batch_size=INSERT_BATCH_SIZE)
+            Loan.objects.bulk_update(batch, ['installment_amount'], batch_size=INSERT_BATCH_SIZE)
+            # bulk_create sends no signals: keep the running loan report in line here.
+            LoanReport.apply_delta(
+                unpaid_installments=len(installments) - removed['count'],
+                total_interest=sum(installment.interest for installment in installments) - removed['interest'],
+            )
+        created += len(installments)
+    return created
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BankmoduleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bankModule'
+
+    def ready(self):
+        from . import signals  # noqa: F401
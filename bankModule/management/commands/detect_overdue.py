@@ -0,0 +1,14 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from bankModule.overdue import detect_overdue
+
+
+class Command(BaseCommand):
+    help = "Flags overdue loans, payment schedules and debts; the fallback when celery beat isn't running."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help="Detect as of this date (YYYY-MM-DD); today by default")
+
+    def handle(self, *args, **options):
+        for name, (flagged, cleared) in detect_overdue(options['date']).items():
+            self.stdout.write(f"{name}: {flagged} flagged overdue, {cleared} no longer overdue")
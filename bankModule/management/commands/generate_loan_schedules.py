@@ -0,0 +1,68 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from bankModule.amortization import BATCH_SIZE, generate_schedules
+from bankModule.models import Bank, Loan, LoanReport
+
+BENCHMARK_PREFIX = "BENCH-"
+
+
+class Command(BaseCommand):
+    help = "Regenerates the unpaid installments of loans from their amount, rate and duration."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loan', nargs='*', default=[], help="Loan numbers; all loans by default")
+        parser.add_argument('--bank', help="Only the loans of this bank number")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Loans written per transaction")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Insert this many synthetic loans first and only regenerate those (benchmark)")
+        parser.add_argument('--cleanup', action='store_true', help="Delete the synthetic loans afterwards")
+
+    def handle(self, *args, **options):
+        loans = Loan.objects.all()
+        if options['seed']:
+            self.seed(options['seed'])
+            loans = loans.filter(loan_number__startswith=BENCHMARK_PREFIX)
+        if options['loan']:
+            loans = loans.filter(loan_number__in=options['loan'])
+        if options['bank']:
+            loans = loans.filter(bank__bank_number=options['bank'])
+
+        started = time.perf_counter()
+        created = generate_schedules(loans, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {created} installments for {loans.count()} loans in {elapsed:.2f}s"
+        ))
+        if options['cleanup']:
+            Loan.objects.filter(loan_number__startswith=BENCHMARK_PREFIX).delete()
+            Bank.objects.filter(bank_number__startswith=BENCHMARK_PREFIX).delete()
+
+    def seed(self, count):
+        bank, _ = Bank.objects.get_or_create(
+            bank_number=f"{BENCHMARK_PREFIX}BANK",
+            defaults={'name': "Benchmark Bank", 'account_number': "0", 'branch_name': "-", 'address': "-",
+                      'phone': "-", 'email': "bench@example.com", 'currency': "TRY"},
+        )
+        offset = Loan.objects.filter(loan_number__startswith=BENCHMARK_PREFIX).count()
+        rng = random.Random(offset)
+        loans = []
+        for number in range(offset, offset + count):
+            duration = rng.choice([12, 24, 36, 60, 120, 240])
+            loans.append(Loan(
+                loan_number=f"{BENCHMARK_PREFIX}{number}",
+                name=f"Benchmark loan {number}",
+                bank=bank,
+                amount=Decimal(rng.randrange(100_000, 500_000_000)) / 100,
+                receipt_date=date(2020, 1, 1) + timedelta(days=rng.randrange(1800)),
+                duration=duration,
+                interest_rate=Decimal(rng.randrange(0, 4500)) / 100,
+                payment_method=Loan.PaymentMethod.BANK_TRANSFER,
+                installments_count=duration // rng.choice([1, 1, 3]),
+                installment_amount=Decimal(0),
+            ))
+        Loan.objects.bulk_create(loans, batch_size=5000)
+        LoanReport.apply_delta(total_loans=sum(loan.amount for loan in loans))
+        self.stdout.write(f"Seeded {count} loans")
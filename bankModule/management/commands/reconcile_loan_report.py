@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.timezone import localdate
+from bankModule.models import LoanReport
+
+
+class Command(BaseCommand):
+    help = "Compares the running loan report totals with a full recompute from loans and installments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Overwrite today's report with the recomputed totals")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # Holding today's row keeps payments from changing it between the read and the recompute.
+            report = LoanReport.objects.select_for_update().filter(report_date=localdate()).first() or LoanReport.current()
+            expected = LoanReport.compute_totals()
+            if report is None:
+                differences = {name: (None, value) for name, value in expected.items()}
+            else:
+                differences = {
+                    name: (getattr(report, name), value)
+                    for name, value in expected.items() if getattr(report, name) != value
+                }
+            for name, (running, recomputed) in differences.items():
+                self.stdout.write(f"{name}: running {running}, recomputed {recomputed}")
+            if differences and options['fix']:
+                LoanReport.objects.update_or_create(report_date=localdate(), defaults=expected)
+                self.stdout.write(self.style.SUCCESS("Today's loan report now holds the recomputed totals"))
+        if not differences:
+            self.stdout.write(self.style.SUCCESS("The loan report matches the loans and installments"))
+        elif not options['fix']:
+            raise CommandError(f"{len(differences)} loan report totals drifted; run with --fix to correct them")
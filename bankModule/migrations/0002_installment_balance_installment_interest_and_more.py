@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bankModule', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='installment',
+            name='balance',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True, verbose_name='Remaining Balance'),
+        ),
+        migrations.AddField(
+            model_name='installment',
+            name='interest',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True, verbose_name='Interest'),
+        ),
+        migrations.AddField(
+            model_name='installment',
+            name='principal',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True, verbose_name='Principal'),
+        ),
+    ]
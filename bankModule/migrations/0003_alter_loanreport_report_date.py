@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:33
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def keep_latest_report_per_day(apps, schema_editor):
+    LoanReport = apps.get_model('bankModule', 'LoanReport')
+    latest = LoanReport.objects.values('report_date').annotate(latest=Max('id')).values('latest')
+    LoanReport.objects.exclude(id__in=latest).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bankModule', '0002_installment_balance_installment_interest_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_latest_report_per_day, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='loanreport',
+            name='report_date',
+            field=models.DateField(default=django.utils.timezone.localdate, unique=True, verbose_name='Report Date'),
+        ),
+    ]
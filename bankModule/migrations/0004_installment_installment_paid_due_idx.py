@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bankModule', '0003_alter_loanreport_report_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='installment',
+            index=models.Index(fields=['is_paid', 'due_date'], name='installment_paid_due_idx'),
+        ),
+    ]
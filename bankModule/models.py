@@ -1,4 +1,7 @@
-from django.db import models
+from decimal import Decimal
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils.timezone import localdate
 from django.utils.translation import gettext_lazy as _
 
 class BankManager(models.Manager):
@@ -95,6 +98,13 @@ class Loan(models.Model):
     def __str__(self):
         return f"{self.name} - {self.loan_number}"
 
+    def generate_schedule(self):
+        """
+        Replaces the unpaid installments with a freshly computed amortization schedule.
+        """
+        from .amortization import generate_schedules
+        return generate_schedules([self])
+
 class Installment(models.Model):
     loan = models.ForeignKey(
         Loan,
@@ -108,6 +118,27 @@ class Installment(models.Model):
         max_digits=15,
         decimal_places=2
     )
+    principal = models.DecimalField(
+        _("Principal"),
+        max_digits=15,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    interest = models.DecimalField(
+        _("Interest"),
+        max_digits=15,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    balance = models.DecimalField(
+        _("Remaining Balance"),
+        max_digits=15,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
     paid_date = models.DateField(_("Paid Date"), null=True, blank=True)
     is_paid = models.BooleanField(_("Is Paid"), default=False)
 
@@ -115,12 +146,36 @@ class Installment(models.Model):
         verbose_name = _("Installment")
         verbose_name_plural = _("Installments")
         ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['is_paid', 'due_date'], name='installment_paid_due_idx'),
+        ]
 
     def __str__(self):
         return f"Installment #{self.id} for {self.loan}"
 
+    def delete(self, *args, **kwargs):
+        # Not a post_delete receiver: that would turn the cascade from Loan into a row by row delete.
+        deleted = super().delete(*args, **kwargs)
+        LoanReport.apply_delta(
+            paid_installments=-int(self.is_paid),
+            unpaid_installments=-int(not self.is_paid),
+            total_interest=-(self.interest or 0),
+        )
+        return deleted
+
 class LoanReport(models.Model):
-    report_date = models.DateField(_("Report Date"), auto_now_add=True)
+    """
+    Daily snapshot of the loan book totals.
+
+    Today's row holds the running totals: the signals in bankModule.signals add the difference each
+    loan or installment save or delete makes with F() updates, and the first change of a day starts
+    the day's row from the previous one. Bulk writes (queryset.update(), bulk_create) bypass the
+    signals and must call apply_delta themselves; `manage.py reconcile_loan_report` compares the
+    running totals with a full recompute.
+    """
+    TOTAL_FIELDS = ("total_loans", "paid_installments", "unpaid_installments", "overdue_loans", "total_interest")
+
+    report_date = models.DateField(_("Report Date"), default=localdate, unique=True)
     total_loans = models.DecimalField(
         _("Total Loans"),
         max_digits=15,
@@ -141,4 +196,53 @@ class LoanReport(models.Model):
         ordering = ['-report_date']
 
     def __str__(self):
-        return f"Loan Report - {self.report_date}"
\ No newline at end of file
+        return f"Loan Report - {self.report_date}"
+
+    @staticmethod
+    def compute_totals():
+        """
+        The totals recomputed from every Loan and Installment row, in two aggregate queries.
+        """
+        totals = Loan.objects.aggregate(
+            total_loans=Sum("amount", default=Decimal(0)),
+            overdue_loans=Count("id", filter=Q(status=Loan.Status.OVERDUE)),
+        )
+        totals.update(Installment.objects.aggregate(
+            paid_installments=Count("id", filter=Q(is_paid=True)),
+            unpaid_installments=Count("id", filter=Q(is_paid=False)),
+            total_interest=Sum("interest", default=Decimal(0)),
+        ))
+        return totals
+
+    @staticmethod
+    def current():
+        """
+        The latest report, read without scanning loans or installments; None before the first change.
+        """
+        return LoanReport.objects.order_by("-report_date").first()
+
+    @staticmethod
+    def apply_delta(**deltas):
+        """
+        Adds deltas ({total field: difference}) to today's report with an F() update.
+
+        Called after the change is written: when there is no report at all yet, today's row is
+        computed from scratch and already includes it.
+        """
+        deltas = {name: value for name, value in deltas.items() if value}
+        if not deltas:
+            return
+        today = localdate()
+        rows = LoanReport.objects.filter(report_date=today)
+        updates = {name: F(name) + value for name, value in deltas.items()}
+        if rows.update(**updates):
+            return
+        with transaction.atomic():
+            previous = LoanReport.objects.filter(report_date__lt=today).order_by("-report_date").first()
+            if previous is None:
+                totals = LoanReport.compute_totals()
+            else:
+                totals = {name: getattr(previous, name) + deltas.get(name, 0) for name in LoanReport.TOTAL_FIELDS}
+            _, created = LoanReport.objects.get_or_create(report_date=today, defaults=totals)
+        if not created:
+            rows.update(**updates)
@@ -0,0 +1,63 @@
+"""
+Daily overdue detection.
+
+Unpaid loan installments, account payment schedules and debts past their due date are found with
+range scans of the (is_paid, due_date) and (debt_status, due_date) indexes, and flagged with one
+UPDATE per table: loans move to OVERDUE, schedules and debts get is_overdue. Rows that were paid or
+rescheduled since are unflagged the same way (loans back to UNPAID, or PAID once nothing is left to
+pay), so running the job twice changes nothing.
+Run by the celery beat schedule (bankModule.tasks.detect_overdue) or `manage.py detect_overdue`.
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils.timezone import localdate
+from accountModule.models import PaymentInstallmentSchedule
+from expenseModule.models import OPEN_DEBT_STATUSES, Debt
+from .models import Installment, Loan, LoanReport
+
+
+def flag_overdue_loans(today):
+    """
+    Moves loans with an unpaid installment due before today to OVERDUE. Overdue loans without one go
+    back to UNPAID while installments remain to be paid, and to PAID once all are. Loans without any
+    installment (e.g. marked overdue by hand before their schedule exists) are left alone.
+    Returns (flagged, cleared).
+    """
+    late = Installment.objects.filter(is_paid=False, due_date__lt=today).values("loan_id")
+    scheduled = Installment.objects.filter(loan=OuterRef("pk"))
+    unpaid = scheduled.filter(is_paid=False)
+    with transaction.atomic():
+        flagged = Loan.objects.filter(pk__in=late).exclude(status=Loan.Status.OVERDUE).update(status=Loan.Status.OVERDUE)
+        clearing = Loan.objects.filter(Exists(scheduled), status=Loan.Status.OVERDUE).exclude(pk__in=late)
+        cleared = clearing.filter(Exists(unpaid)).update(status=Loan.Status.UNPAID)
+        # Evaluated again: only the loans left overdue, whose installments are all paid.
+        cleared += clearing.update(status=Loan.Status.PAID)
+        # update() sends no signals: keep the running loan report in line here.
+        LoanReport.apply_delta(overdue_loans=flagged - cleared)
+    return flagged, cleared
+
+
+def flag_overdue_rows(queryset, late):
+    """
+    Sets is_overdue on the rows of queryset matching late and clears it on the others. Returns (flagged, cleared).
+    """
+    flagged = queryset.filter(late, is_overdue=False).update(is_overdue=True)
+    cleared = queryset.filter(is_overdue=True).exclude(late).update(is_overdue=False)
+    return flagged, cleared
+
+
+def detect_overdue(today=None):
+    """
+    Flags everything past due as of today (the local date by default).
+    Returns {"loans" | "payment_schedules" | "debts": (flagged, cleared)}.
+    """
+    today = today or localdate()
+    return {
+        "loans": flag_overdue_loans(today),
+        "payment_schedules": flag_overdue_rows(
+            PaymentInstallmentSchedule.objects.all(), Q(is_paid=False, due_date__lt=today)
+        ),
+        "debts": flag_overdue_rows(
+            Debt.objects.all(), Q(debt_status__in=OPEN_DEBT_STATUSES, due_date__lt=today)
+        ),
+    }
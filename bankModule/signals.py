@@ -0,0 +1,103 @@
+from decimal import Decimal
+from django.db.models import Count, Q, Sum
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .models import Installment, Loan, LoanReport
+
+LOAN_FIELDS = ("amount", "status")
+INSTALLMENT_FIELDS = ("is_paid", "interest")
+
+
+def _loaded(instance, fields):
+    return {name: instance.__dict__[name] for name in fields if name in instance.__dict__}
+
+
+def _report_values(model, instance, fields):
+    """
+    The values the report last counted for instance. Fields deferred when it was loaded are read back.
+    """
+    values = dict(getattr(instance, "_report_values", {}))
+    missing = [name for name in fields if name not in values]
+    if missing and instance.pk is not None:
+        values.update(model.objects.filter(pk=instance.pk).values(*missing).first() or {})
+    return values
+
+
+def _loan_totals(amount, status):
+    return {"total_loans": amount or 0, "overdue_loans": int(status == Loan.Status.OVERDUE)}
+
+
+def _installment_totals(is_paid, interest):
+    return {
+        "paid_installments": int(bool(is_paid)),
+        "unpaid_installments": int(not is_paid),
+        "total_interest": interest or 0,
+    }
+
+
+def _difference(new, old):
+    return {name: new[name] - old[name] for name in new}
+
+
+@receiver(post_init, sender=Loan)
+def remember_loan_values(sender, instance, **kwargs):
+    instance._report_values = _loaded(instance, LOAN_FIELDS)
+
+
+@receiver(post_init, sender=Installment)
+def remember_installment_values(sender, instance, **kwargs):
+    instance._report_values = _loaded(instance, INSTALLMENT_FIELDS)
+
+
+@receiver(pre_save, sender=Loan)
+@receiver(pre_save, sender=Installment)
+def read_deferred_values(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    fields = LOAN_FIELDS if sender is Loan else INSTALLMENT_FIELDS
+    instance._report_values = _report_values(sender, instance, fields)
+
+
+@receiver(post_save, sender=Loan)
+def count_saved_loan(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    new = _loan_totals(instance.amount, instance.status)
+    if created:
+        LoanReport.apply_delta(**new)
+    else:
+        old = instance._report_values
+        LoanReport.apply_delta(**_difference(new, _loan_totals(old.get("amount"), old.get("status"))))
+    instance._report_values = _loaded(instance, LOAN_FIELDS)
+
+
+@receiver(post_save, sender=Installment)
+def count_saved_installment(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    new = _installment_totals(instance.is_paid, instance.interest)
+    if created:
+        LoanReport.apply_delta(**new)
+    else:
+        old = instance._report_values
+        LoanReport.apply_delta(**_difference(new, _installment_totals(old.get("is_paid"), old.get("interest"))))
+    instance._report_values = _loaded(instance, INSTALLMENT_FIELDS)
+
+
+@receiver(pre_delete, sender=Loan)
+def remember_loan_installments(sender, instance, **kwargs):
+    """
+    Installments go with their loan in a fast cascade delete that sends no signals: count them first.
+    """
+    instance._report_installments = instance.installments.aggregate(
+        paid_installments=Count("id", filter=Q(is_paid=True)),
+        unpaid_installments=Count("id", filter=Q(is_paid=False)),
+        total_interest=Sum("interest", default=Decimal(0)),
+    )
+
+
+@receiver(post_delete, sender=Loan)
+def count_deleted_loan(sender, instance, **kwargs):
+    deltas = _loan_totals(instance.amount, instance.status)
+    deltas.update(getattr(instance, "_report_installments", {}))
+    LoanReport.apply_delta(**{name: -value for name, value in deltas.items()})
@@ -0,0 +1,10 @@
+from celery import shared_task
+from .overdue import detect_overdue
+
+
+@shared_task
+def detect_overdue_task():
+    """
+    Daily overdue detection, scheduled in CELERY_BEAT_SCHEDULE.
+    """
+    return {name: list(counts) for name, counts in detect_overdue().items()}
@@ -1,3 +1,195 @@
+import itertools
+from datetime import date
+from decimal import Decimal
+import numpy as np
 from django.test import TestCase
+from .amortization import amortize, generate_schedules
+from .models import Bank, Installment, Loan, LoanReport
 
-# Create your tests here.
+
+class LoanTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.bank = Bank.objects.create(
+            bank_number="B1", name="Bank", account_number="1", branch_name="Main", address="-",
+            phone="-", email="bank@example.com", currency="TRY",
+        )
+
+    def make_loan(self, number, amount, rate, duration, count, receipt_date=date(2024, 1, 31)):
+        return Loan.objects.create(
+            loan_number=number, name=number, bank=self.bank, amount=Decimal(amount), receipt_date=receipt_date,
+            duration=duration, interest_rate=Decimal(rate), payment_method=Loan.PaymentMethod.CASH,
+            installments_count=count, installment_amount=Decimal(0),
+        )
+
+
+class AmortizationTests(LoanTestCase):
+    def test_annuity_matches_the_closed_form(self):
+        payment, principal, interest, balance = amortize([10_000_000], [12], [12], [1])
+        self.assertEqual(payment[0, 0], 888_488)
+        self.assertEqual(interest[0, 0], 100_000)
+        self.assertEqual(principal[0].sum(), 10_000_000)
+        self.assertEqual(balance[0, -1], 0)
+
+    def test_last_installment_never_balloons(self):
+        for amount, rate, count in itertools.product(
+            [100, 9_999_999, 12_345_678, 9_999_999_999], [0, 0.01, 3.5, 17.35, 45, 99.99], [1, 2, 7, 12, 60, 240, 360],
+        ):
+            with self.subTest(amount=amount, rate=rate, count=count):
+                payment, principal, interest, balance = amortize([amount], [rate], [count], [1])
+                payment, principal, interest = payment[0, :count], principal[0, :count], interest[0, :count]
+                self.assertEqual(principal.sum(), amount)
+                self.assertTrue((principal >= 0).all() and (interest >= 0).all())
+                self.assertTrue((np.diff(balance[0, :count]) <= 0).all())
+                # The rounding surplus lowers the last installment; its own interest rounding may add a cent.
+                self.assertLessEqual(payment[-1], payment[0] + 1)
+
+    def test_schedule_is_exact_to_the_cent(self):
+        loans = [
+            self.make_loan("L1", "123456.78", "17.35", 36, 36),
+            self.make_loan("L2", "1000.00", "0", 12, 7),
+            self.make_loan("L3", "999999.99", "45", 240, 80),
+        ]
+        generate_schedules(Loan.objects.all())
+        for loan in loans:
+            installments = list(loan.installments.order_by('due_date'))
+            self.assertEqual(len(installments), loan.installments_count)
+            self.assertEqual(sum(i.principal for i in installments), loan.amount)
+            self.assertEqual(installments[-1].balance, 0)
+            for installment in installments:
+                self.assertEqual(installment.amount, installment.principal + installment.interest)
+            loan.refresh_from_db()
+            self.assertEqual(loan.installment_amount, installments[0].amount)
+
+    def test_due_dates_follow_the_receipt_day(self):
+        loan = self.make_loan("L1", "1200.00", "0", 12, 4)
+        loan.generate_schedule()
+        self.assertEqual(
+            list(loan.installments.values_list('due_date', flat=True)),
+            [date(2024, 4, 30), date(2024, 7, 31), date(2024, 10, 31), date(2025, 1, 31)],
+        )
+
+    def test_rate_change_keeps_paid_installments(self):
+        loan = self.make_loan("L1", "12000.00", "10", 12, 12)
+        loan.generate_schedule()
+        paid = list(loan.installments.order_by('due_date')[:3])
+        Installment.objects.filter(pk__in=[i.pk for i in paid]).update(is_paid=True)
+
+        Loan.objects.filter(pk=loan.pk).update(interest_rate=Decimal("20"))
+        with self.assertNumQueries(9):
+            generate_schedules(Loan.objects.filter(pk=loan.pk))
+
+        installments = list(loan.installments.order_by('due_date'))
+        self.assertEqual(len(installments), 12)
+        self.assertEqual(installments[:3], paid)
+        self.assertEqual(installments[3].due_date, date(2024, 5, 31))
+        self.assertEqual(installments[3].interest, (paid[-1].balance * Decimal("0.2") / 12).quantize(Decimal("0.01")))
+        self.assertEqual(sum(i.principal for i in installments), loan.amount)
+
+
+class LoanReportTests(LoanTestCase):
+    def assertReportMatchesRecompute(self):
+        report = LoanReport.current()
+        self.assertEqual({name: getattr(report, name) for name in LoanReport.TOTAL_FIELDS}, LoanReport.compute_totals())
+
+    def test_running_totals_follow_changes(self):
+        first = self.make_loan("L1", "1000.00", "12", 12, 12)
+        second = self.make_loan("L2", "500.00", "0", 6, 6)
+        generate_schedules(Loan.objects.all())
+        self.assertReportMatchesRecompute()
+
+        installment = first.installments.order_by('due_date').first()
+        installment.is_paid = True
+        installment.paid_date = date(2024, 2, 29)
+        installment.save()
+        second.status = Loan.Status.OVERDUE
+        second.save()
+        Loan.objects.get(pk=first.pk).installments.last().delete()
+        self.assertReportMatchesRecompute()
+        self.assertEqual(LoanReport.current().paid_installments, 1)
+        self.assertEqual(LoanReport.current().overdue_loans, 1)
+
+        second.delete()
+        self.assertReportMatchesRecompute()
+        self.assertEqual(LoanReport.objects.count(), 1)
+
+    def test_payment_is_a_single_update(self):
+        loan = self.make_loan("L1", "1000.00", "12", 12, 12)
+        generate_schedules([loan])
+        installment = Installment.objects.filter(loan=loan).first()
+        installment.is_paid = True
+        # The installment UPDATE and the F() update of the report.
+        with self.assertNumQueries(2):
+            installment.save(update_fields=['is_paid'])
+        self.assertReportMatchesRecompute()
+
+    def test_new_day_starts_from_the_previous_report(self):
+        self.make_loan("L1", "1000.00", "12", 12, 12)
+        LoanReport.objects.update(report_date=date(2024, 1, 1))
+        self.make_loan("L2", "250.00", "12", 12, 12)
+        self.assertEqual(LoanReport.objects.count(), 2)
+        self.assertEqual(LoanReport.current().total_loans, Decimal("1250.00"))
+        self.assertReportMatchesRecompute()
+
+
+class OverdueDetectionTests(LoanTestCase):
+    def test_loans_schedules_and_debts_are_flagged_and_cleared(self):
+        from accountModule.models import CustomUser, PaymentInstallment, PaymentInstallmentSchedule
+        from expenseModule.models import Debt
+        from .overdue import detect_overdue
+
+        late = self.make_loan("L1", "1200.00", "0", 12, 12)
+        on_time = self.make_loan("L2", "1200.00", "0", 12, 12)
+        generate_schedules(Loan.objects.all())
+        on_time.installments.filter(due_date__lt=date(2024, 4, 1)).update(is_paid=True)
+        user = CustomUser.objects.create(username="payer")
+        plan = PaymentInstallment.objects.create(
+            user=user, total_amount=100, initial_payment=0, remaining_amount=100
+        )
+        schedule = PaymentInstallmentSchedule.objects.create(installment=plan, due_date=date(2024, 3, 1), amount_due=50)
+        debts = {
+            status: Debt.objects.create(
+                debtor_number=status, name=status, amount=10, debt_reason="-", due_date=date(2024, 3, 1),
+                debt_status=status, description="-",
+            )
+            for status in ("DUE", "PART", "FULL")
+        }
+
+        # Two UPDATEs per table plus one for the loans cleared as paid, the loan report update and
+        # the savepoint around the loan updates.
+        with self.assertNumQueries(10):
+            counts = detect_overdue(date(2024, 4, 1))
+        self.assertEqual(counts, {"loans": (1, 0), "payment_schedules": (1, 0), "debts": (2, 0)})
+        self.assertEqual(list(Loan.objects.overdue_loans()), [late])
+        schedule.refresh_from_db()
+        self.assertTrue(schedule.is_overdue)
+        self.assertEqual(set(Debt.objects.filter(is_overdue=True)), {debts["DUE"], debts["PART"]})
+        self.assertEqual(LoanReport.current().overdue_loans, 1)
+        self.assertEqual(detect_overdue(date(2024, 4, 1))["loans"], (0, 0))
+
+        late.installments.update(is_paid=True)
+        Debt.objects.filter(pk=debts["PART"].pk).update(debt_status="FULL")
+        counts = detect_overdue(date(2024, 4, 1))
+        self.assertEqual(counts, {"loans": (0, 1), "payment_schedules": (0, 0), "debts": (0, 1)})
+        self.assertEqual(Loan.objects.get(pk=late.pk).status, Loan.Status.PAID)
+        self.assertEqual(LoanReport.current().overdue_loans, 0)
+
+    def test_cleared_loans_are_paid_only_when_nothing_is_left(self):
+        from .overdue import flag_overdue_loans
+
+        paid_off = self.make_loan("L1", "1200.00", "0", 12, 12)
+        caught_up = self.make_loan("L2", "1200.00", "0", 12, 12)
+        generate_schedules(Loan.objects.all())
+        # Marked overdue by hand before it has a schedule: nothing says it was repaid.
+        unscheduled = self.make_loan("L3", "500.00", "0", 12, 12)
+        Loan.objects.filter(pk=unscheduled.pk).update(status=Loan.Status.OVERDUE)
+        self.assertEqual(flag_overdue_loans(date(2024, 4, 1)), (2, 0))
+
+        paid_off.installments.update(is_paid=True)
+        caught_up.installments.filter(due_date__lt=date(2024, 4, 1)).update(is_paid=True)
+        self.assertEqual(flag_overdue_loans(date(2024, 4, 1)), (0, 2))
+        self.assertEqual(Loan.objects.get(pk=paid_off.pk).status, Loan.Status.PAID)
+        self.assertEqual(Loan.objects.get(pk=caught_up.pk).status, Loan.Status.UNPAID)
+        self.assertEqual(Loan.objects.get(pk=unscheduled.pk).status, Loan.Status.OVERDUE)
+        self.assertEqual(LoanReport.current().overdue_loans, 0)
+        self.assertEqual(flag_overdue_loans(date(2024, 4, 1)), (0, 0))
@@ -0,0 +1,11 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'elitAgriTurkey.settings.development')
+
+app = Celery('elitAgriTurkey')
+
+# All celery settings live in the django settings under the CELERY_ prefix.
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
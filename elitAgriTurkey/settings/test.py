@@ -0,0 +1,6 @@
+from .development import *
+
+# Run celery tasks inline so the test suite needs no broker. Only here: the development settings are
+# also what a worker or beat started without DJANGO_SETTINGS_MODULE gets, and eager mode would make
+# it run every task inside the process that queued it.
+CELERY_TASK_ALWAYS_EAGER = True
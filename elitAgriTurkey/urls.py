@@ -13,7 +13,10 @@ urlpatterns = [
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/token/verify/', TokenVerifyView.as_view(), name='token_verify'),
-#    path('reports/', include('reportingModule.urls')),
+    path('reports/', include('reportingModule.urls')),
+    path('lands/', include('landModule.urls')),
+    path('images/', include('mediaModule.urls')),
+    path('expenses/', include('expenseModule.urls')),
 ]
 
 if settings.DEBUG:
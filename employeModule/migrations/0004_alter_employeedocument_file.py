@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:18
+
+import mediaModule.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employeModule', '0003_documentcategory_employeedocument_document_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employeedocument',
+            name='file',
+            field=models.FileField(storage=mediaModule.storage.document_storage, upload_to='employees/documents/', verbose_name='File'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
+from mediaModule.storage import document_storage
 
 
 
@@ -123,7 +124,7 @@ class EmployeeDocument(models.Model):
     category = models.ForeignKey(
         DocumentCategory, on_delete=models.SET_NULL, null=True, blank=True, verbose_name=_("Category")
     )
-    file = models.FileField(upload_to="employees/documents/", verbose_name=_("File"))
+    file = models.FileField(upload_to="employees/documents/", storage=document_storage, verbose_name=_("File"))
     uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Uploaded At"))
 
     class Meta:
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ExpenseList, ExpenseItem,ReceiptVoucher, PaymentVoucher,Order,RevenueList,RevenueItem,Company,Subscription,Debt,Buyer,SaleTransaction,PurchaseTransaction,PurchaseTransactionDetail
+from .models import ExpenseList, ExpenseItem,ReceiptVoucher, PaymentVoucher,Order,RevenueList,RevenueItem,Company,Subscription,Debt,Buyer,SaleTransaction,PurchaseTransaction,PurchaseTransactionDetail,LedgerEntry,VatRate,DebtAgingSnapshot
 
 admin.site.register(ExpenseList)
 admin.site.register(ExpenseItem)
@@ -15,6 +15,9 @@ admin.site.register(Buyer)
 admin.site.register(SaleTransaction)
 admin.site.register(PurchaseTransaction)
 admin.site.register(PurchaseTransactionDetail)
+admin.site.register(LedgerEntry)
+admin.site.register(VatRate)
+admin.site.register(DebtAgingSnapshot)
 
 
 
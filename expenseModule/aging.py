@@ -0,0 +1,92 @@
+"""
+Debt aging: open debts (DUE or PART) per debtor, bucketed by days past due as of a date.
+
+The buckets are Case/When sums over due_date compared with dates computed from as_of, so the report
+is one grouped query that reads open debts only through the (debt_status, due_date) index, however
+many settled debts there are. Reports can be kept per as-of date in DebtAgingSnapshot.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, Max, Q, Sum, Value, When
+from django.utils.timezone import localdate
+from .models import OPEN_DEBT_STATUSES, Debt, DebtAgingSnapshot
+
+# name: (least, most) days past due; None leaves the side open. "current" debts are not due yet.
+BUCKETS = {
+    "current": (None, -1),
+    "days_0_30": (0, 30),
+    "days_31_60": (31, 60),
+    "days_61_90": (61, 90),
+    "days_over_90": (91, None),
+}
+TOTAL_FIELDS = ("debts", "total", *BUCKETS)
+
+
+def bucket_filter(as_of, least, most):
+    condition = Q()
+    if least is not None:
+        condition &= Q(due_date__lte=as_of - timedelta(days=least))
+    if most is not None:
+        condition &= Q(due_date__gte=as_of - timedelta(days=most))
+    return condition
+
+
+def bucket_sum(as_of, least, most):
+    return Sum(Case(
+        When(bucket_filter(as_of, least, most), then="amount"),
+        default=Value(Decimal(0)),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    ))
+
+
+def debt_aging(as_of=None):
+    """
+    {"as_of", "debtors": [{debtor_number, name, debts, total, <bucket>...}], "totals": {debts, total, <bucket>...}}
+    as of the given date (today by default).
+    """
+    as_of = as_of or localdate()
+    debtors = list(
+        Debt.objects.filter(debt_status__in=OPEN_DEBT_STATUSES)
+        .values("debtor_number")
+        .annotate(
+            name=Max("name"),
+            debts=Count("id"),
+            total=Sum("amount"),
+            **{name: bucket_sum(as_of, least, most) for name, (least, most) in BUCKETS.items()},
+        )
+        .order_by("debtor_number")
+    )
+    totals = {name: sum((debtor[name] for debtor in debtors), Decimal(0)) for name in TOTAL_FIELDS}
+    totals["debts"] = int(totals["debts"])
+    return {"as_of": as_of, "debtors": debtors, "totals": totals}
+
+
+def aging_snapshot(as_of=None, refresh=False):
+    """
+    The stored report as of the given date. Today's is computed and stored when missing (or when refresh
+    is set); a past date without a snapshot gets the live report, since its day has gone by.
+    """
+    as_of = as_of or localdate()
+    snapshot = None if refresh else DebtAgingSnapshot.objects.filter(as_of=as_of).first()
+    if snapshot is None and as_of < localdate():
+        return debt_aging(as_of)
+    if snapshot is None:
+        report = debt_aging(as_of)
+        try:
+            with transaction.atomic():
+                snapshot, _ = DebtAgingSnapshot.objects.update_or_create(
+                    as_of=as_of, defaults={"debtors": report["debtors"], "totals": report["totals"]}
+                )
+        except IntegrityError:
+            # Another request stored the same day first; its report is just as fresh.
+            snapshot = DebtAgingSnapshot.objects.get(as_of=as_of)
+    return {"as_of": snapshot.as_of, "debtors": snapshot.debtors, "totals": snapshot.totals,
+            "created_at": snapshot.created_at}
+
+
+def drop_current_snapshots():
+    """
+    Forgets the snapshots a debt change makes stale: today's and any taken ahead of time.
+    """
+    DebtAgingSnapshot.objects.filter(as_of__gte=localdate()).delete()
@@ -0,0 +1,65 @@
+"""
+Budget-vs-actual per expense list and month.
+
+ExpenseList.monthly_expense is the budget of every month; the actual spend is the sum of the list's
+ExpenseItem amounts dated in that month. All lists and months come from two queries: the lists,
+and one TruncMonth + Sum aggregate over the expense items of the period.
+"""
+from datetime import date
+from decimal import Decimal
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils.timezone import localdate
+from .models import ExpenseItem, ExpenseList
+
+DEFAULT_MONTHS = 12
+MAX_MONTHS = 60
+
+
+def month_starts(last_month, months):
+    """
+    The first day of the `months` months ending with the month of last_month, oldest first.
+    """
+    index = last_month.year * 12 + last_month.month - 1
+    return [date(i // 12, i % 12 + 1, 1) for i in range(index - months + 1, index + 1)]
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def budget_vs_actual(months=DEFAULT_MONTHS, last_month=None, status=None):
+    """
+    Every expense list with its budget, actual spend and variance (budget - actual) in each of the
+    `months` months up to last_month (the current month by default), plus the period totals.
+    Only expense items with the given status count when status is set.
+    """
+    periods = month_starts(last_month or localdate(), months)
+    items = ExpenseItem.objects.filter(date__gte=periods[0], date__lt=next_month(periods[-1]))
+    if status:
+        items = items.filter(status=status)
+    spent = {
+        (row["expense_list"], row["month"]): row["actual"]
+        for row in items.annotate(month=TruncMonth("date"))
+        .values("expense_list", "month")
+        .annotate(actual=Sum("amount"))
+        .order_by()
+    }
+
+    rows = []
+    for expense_list in ExpenseList.objects.values("id", "list_number", "list_name", "monthly_expense"):
+        budget = expense_list.pop("monthly_expense")
+        cells = []
+        for month in periods:
+            actual = spent.get((expense_list["id"], month), Decimal(0))
+            cells.append({"month": month, "budget": budget, "actual": actual, "variance": budget - actual})
+        total_budget = budget * len(periods)
+        total_actual = sum((cell["actual"] for cell in cells), Decimal(0))
+        rows.append({
+            **expense_list,
+            "months": cells,
+            "total_budget": total_budget,
+            "total_actual": total_actual,
+            "total_variance": total_budget - total_actual,
+        })
+    return {"months": periods, "lists": rows}
@@ -0,0 +1,202 @@
+"""
+Bulk import of sale and purchase transactions from CSV or XLSX spreadsheets.
+
+Rows are streamed from the file and handled in chunks. For each chunk the buyer, supplier and
+product numbers are resolved with one query per related model, existing transaction numbers with
+one more, and the valid rows are inserted with bulk_create in one transaction. Rows that fail
+validation are left out and reported with their line number; they never abort the import.
+Imported rows are added to the cash-flow ledger, and the reports built from them are invalidated,
+both of which bulk_create would otherwise bypass.
+Sale totals and VAT must match the ones derived from quantity, price and the VAT rate (see pricing).
+"""
+import csv
+import io
+import zipfile
+from dataclasses import dataclass
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from productModule.models import Product, Supplier
+from reportingModule.cache import bump_version
+from .ledger import sync_entries
+from .models import Buyer, PurchaseTransaction, SaleTransaction
+from .pricing import sale_price_checker
+
+CHUNK_SIZE = 5000
+BATCH_SIZE = 1000
+FORMATS = ('csv', 'xlsx')
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    model: type
+    number_field: str
+    # foreign key field: (related model, column holding its number, number field of the related model)
+    relations: dict
+    columns: tuple
+    # Called once per chunk: returns a function giving the errors ({column: [message]}) of a valid row's instance.
+    checker: object = None
+
+
+SPECS = {
+    'sales': ImportSpec(
+        model=SaleTransaction,
+        number_field='sale_number',
+        relations={'buyer': (Buyer, 'buyer_number', 'buyer_number'),
+                   'product': (Product, 'product_number', 'product_number')},
+        columns=('sale_number', 'buyer_number', 'product_number', 'sale_place', 'address', 'phone', 'date',
+                 'quantity', 'total_value', 'price_per_product', 'payment_method', 'delivery_date', 'vat'),
+        checker=sale_price_checker,
+    ),
+    'purchases': ImportSpec(
+        model=PurchaseTransaction,
+        number_field='purchase_number',
+        relations={'supplier': (Supplier, 'supplier_number', 'supplier_number'),
+                   'product': (Product, 'product_number', 'product_number')},
+        columns=('purchase_number', 'supplier_number', 'product_number', 'address', 'date', 'quantity', 'amount'),
+    ),
+}
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    rows: int = 0
+    errors: list = None
+
+    def __post_init__(self):
+        self.errors = self.errors or []
+
+
+def format_of(filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported file type '{extension}', expected one of: {', '.join(FORMATS)}")
+    return extension
+
+
+def _cell(value):
+    # Spreadsheet numbers arrive as floats: their shortest repr keeps 12.3 from becoming 12.2999...
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, str):
+        return value.strip()
+    return '' if value is None else value
+
+
+def read_rows(file, file_format):
+    """
+    Yields (line number, {column: value}) from a binary file, one row at a time. The first row is the header.
+    """
+    if file_format == 'csv':
+        text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        reader = csv.reader(text)
+        close = text.detach  # leaves the caller's file open
+    else:
+        from openpyxl import load_workbook
+
+        try:
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            raise ValueError(f"Not a readable XLSX file: {e}")
+        reader = workbook.worksheets[0].iter_rows(values_only=True)
+        close = workbook.close
+    try:
+        header = [str(name).strip() for name in next(reader, None) or ()]
+        for line, values in enumerate(reader, start=2):
+            if any(value not in (None, '') for value in values):
+                yield line, {name: _cell(value) for name, value in zip(header, values)}
+    except csv.Error as e:
+        raise ValueError(f"Not a readable CSV file (line {reader.line_num}): {e}")
+    finally:
+        close()
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _lookup(model, number_field, numbers):
+    numbers = {number for number in numbers if number}
+    if not numbers:
+        return {}
+    return {getattr(obj, number_field): obj for obj in model.objects.filter(**{f"{number_field}__in": numbers}).order_by()}
+
+
+def _import_chunk(spec, chunk, result, batch_size):
+    related = {
+        field: _lookup(model, number_field, (str(row.get(column, '')) for _, row in chunk))
+        for field, (model, column, number_field) in spec.relations.items()
+    }
+    numbers = [str(row.get(spec.number_field, '')) for _, row in chunk]
+    taken = set(
+        spec.model.objects.filter(**{f"{spec.number_field}__in": numbers})
+        .values_list(spec.number_field, flat=True)
+        .order_by()
+    )
+    plain_columns = [column for column in spec.columns if column not in {c for _, c, _ in spec.relations.values()}]
+    check = spec.checker() if spec.checker else None
+
+    instances = []
+    for line, row in chunk:
+        errors = {}
+        instance = spec.model(**{column: row.get(column, '') for column in plain_columns})
+        for field, (_, column, _) in spec.relations.items():
+            number = str(row.get(column, ''))
+            if number and number not in related[field]:
+                errors[column] = [f"Unknown {column.replace('_', ' ')} '{number}'"]
+            setattr(instance, field, related[field].get(number))
+        try:
+            instance.full_clean(exclude=list(spec.relations), validate_unique=False, validate_constraints=False)
+        except ValidationError as e:
+            errors.update(e.message_dict)
+        else:
+            if check:
+                errors.update(check(instance))
+        number = getattr(instance, spec.number_field)
+        if number in taken:
+            errors.setdefault(spec.number_field, []).append(f"'{number}' already exists")
+        if errors:
+            result.errors.extend((line, column, message) for column, messages in errors.items() for message in messages)
+            continue
+        taken.add(number)
+        instances.append(instance)
+
+    try:
+        with transaction.atomic():
+            spec.model.objects.bulk_create(instances, batch_size=batch_size)
+            sync_entries(spec.model, instances)
+            if instances:
+                bump_version(spec.model._meta.label)
+    except IntegrityError as e:
+        # A concurrent write took one of the numbers checked above; earlier chunks stay imported.
+        raise ValueError(
+            f"Rows from line {chunk[0][0]} on were not imported ({result.created} rows already were): {e}"
+        )
+    result.created += len(instances)
+
+
+def import_transactions(kind, file, file_format, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE):
+    """
+    Imports the rows of file as sales or purchases (kind). Returns an ImportResult whose errors are
+    (line, column, message) tuples. Raises ValueError when the file cannot be read, or when a
+    transaction number is taken concurrently; the chunks imported before that are kept.
+    """
+    spec = SPECS[kind]
+    result = ImportResult()
+    for chunk in _chunks(read_rows(file, file_format), chunk_size):
+        result.rows += len(chunk)
+        _import_chunk(spec, chunk, result, batch_size)
+    return result
+
+
+def write_error_report(errors, output):
+    writer = csv.writer(output)
+    writer.writerow(['line', 'column', 'error'])
+    writer.writerows(errors)
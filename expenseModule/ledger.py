@@ -0,0 +1,175 @@
+"""
+Cash-flow ledger across the money tables of expenseModule.
+
+Every row of the source models below maps to ledger movements (date, direction, amount,
+counterparty). LedgerEntry is append-only: when a source row is saved or deleted, the movements
+already in the ledger for it are compared with the ones it maps to now, and if they differ the old
+ones are reversed (appended with negative amounts) and the new ones appended. Summing a source's
+entries therefore always gives its current movements, and history is never rewritten.
+
+Subscriptions move money once a month from start_date to end_date; debts are expected to be
+repaid on their due date.
+"""
+import calendar
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from django.db.models import Case, DateField, DecimalField, F, Q, Sum, Value, When, Window
+from django.db.models.functions import TruncDay, TruncMonth, TruncYear
+from .models import (
+    Debt, ExpenseItem, LedgerEntry, PaymentVoucher, PurchaseTransaction, ReceiptVoucher, RevenueItem,
+    SaleTransaction, Subscription,
+)
+
+IN = 'IN'
+OUT = 'OUT'
+PERIODS = {'day': TruncDay, 'month': TruncMonth, 'year': TruncYear}
+# Fields hold whatever was assigned until the row is reloaded, e.g. strings from a form or a test.
+to_date = DateField().to_python
+
+
+def _name(related, field):
+    return getattr(related, field) if related is not None else ""
+
+
+def _monthly(start, end):
+    """
+    The same day of every month from start to end, clamped to the end of shorter months.
+    """
+    start, end = to_date(start), to_date(end)
+    index = start.year * 12 + start.month - 1
+    while True:
+        year, month = divmod(index, 12)
+        day = date(year, month + 1, min(start.day, calendar.monthrange(year, month + 1)[1]))
+        if day > end:
+            return
+        yield day
+        index += 1
+
+
+# model: (related fields to select, function returning the [(date, direction, amount, counterparty)] of a row)
+SOURCES = {
+    ExpenseItem: ((), lambda item: [(item.date, OUT, item.amount, item.name)]),
+    RevenueItem: (("revenue_list",), lambda item: [(item.date, IN, item.amount, item.revenue_list.list_name)]),
+    ReceiptVoucher: (("buyer",), lambda voucher: [
+        (voucher.date, IN, voucher.amount, _name(voucher.buyer, "buyer_name")),
+    ]),
+    PaymentVoucher: (("supplier",), lambda voucher: [
+        (voucher.date, OUT, voucher.amount, _name(voucher.supplier, "supplier_name")),
+    ]),
+    SaleTransaction: (("buyer",), lambda sale: [
+        (sale.date, IN, sale.total_value, _name(sale.buyer, "buyer_name")),
+    ]),
+    PurchaseTransaction: (("supplier",), lambda purchase: [
+        (purchase.date, OUT, purchase.amount, _name(purchase.supplier, "supplier_name")),
+    ]),
+    Subscription: (("company",), lambda subscription: [
+        (day, OUT, subscription.monthly_amount, _name(subscription.company, "company_name"))
+        for day in _monthly(subscription.start_date, subscription.end_date)
+    ]),
+    Debt: ((), lambda debt: [(debt.due_date, IN, debt.amount, debt.name)]),
+}
+
+
+def _totals(movements):
+    totals = defaultdict(Decimal)
+    for day, direction, amount, counterparty in movements:
+        totals[(to_date(day), direction, counterparty)] += Decimal(str(amount))
+    return {key: amount for key, amount in totals.items() if amount}
+
+
+def sync_entries(model, instances, deleted=False):
+    """
+    Appends the entries that bring the ledger in line with instances (all of model), or with their
+    deletion. Reads the ledger once and writes with one bulk_create. Returns the entries appended.
+    """
+    source = model.__name__
+    movements = SOURCES[model][1]
+    recorded = defaultdict(list)
+    rows = (
+        LedgerEntry.objects.filter(source=source, source_id__in=[instance.pk for instance in instances])
+        .values_list('source_id', 'date', 'direction', 'counterparty')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+    for source_id, day, direction, counterparty, total in rows:
+        recorded[source_id].append((day, direction, total, counterparty))
+
+    entries = []
+    for instance in instances:
+        old = _totals(recorded.get(instance.pk, []))
+        new = {} if deleted else _totals(movements(instance))
+        if old == new:
+            continue
+        changes = [(key, -amount) for key, amount in old.items()] + list(new.items())
+        entries.extend(
+            LedgerEntry(date=day, direction=direction, amount=amount, source=source, source_id=instance.pk,
+                        counterparty=counterparty[:255])
+            for (day, direction, counterparty), amount in changes
+        )
+    return LedgerEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+def sync_all(batch_size=1000):
+    """
+    Brings the ledger in line with every source row, e.g. to backfill it. Returns {source: entries appended}.
+    """
+    appended = {}
+    for model, (related, _) in SOURCES.items():
+        rows = model._default_manager.select_related(*related).order_by('pk')
+        count, last_pk = 0, 0
+        while batch := list(rows.filter(pk__gt=last_pk)[:batch_size]):
+            count += len(sync_entries(model, batch))
+            last_pk = batch[-1].pk
+        appended[model.__name__] = count
+    return appended
+
+
+def signed_amount():
+    return Case(
+        When(direction=IN, then=F('amount')),
+        default=-F('amount'),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def entries_between(start, end, counterparty=None):
+    entries = LedgerEntry.objects.filter(date__range=(start, end))
+    if counterparty:
+        entries = entries.filter(counterparty=counterparty)
+    return entries
+
+
+def opening_balance(start, counterparty=None):
+    entries = LedgerEntry.objects.filter(date__lt=start)
+    if counterparty:
+        entries = entries.filter(counterparty=counterparty)
+    return entries.aggregate(balance=Sum(signed_amount(), default=Decimal(0)))['balance']
+
+
+def running_balance(start, end, counterparty=None):
+    """
+    Entries from start to end in ledger order, each annotated with the balance after it.
+    """
+    opening = opening_balance(start, counterparty)
+    return entries_between(start, end, counterparty).order_by('date', 'id').annotate(
+        balance=Window(Sum(signed_amount()), order_by=[F('date').asc(), F('id').asc()])
+        + Value(opening, output_field=DecimalField(max_digits=14, decimal_places=2)),
+    )
+
+
+def period_totals(start, end, period='month', counterparty=None):
+    """
+    Money in, money out and the net movement per day, month or year from start to end.
+    """
+    return (
+        entries_between(start, end, counterparty)
+        .annotate(period=PERIODS[period]('date'))
+        .values('period')
+        .annotate(
+            money_in=Sum('amount', filter=Q(direction=IN), default=Decimal(0)),
+            money_out=Sum('amount', filter=Q(direction=OUT), default=Decimal(0)),
+            net=Sum(signed_amount()),
+        )
+        .order_by('period')
+    )
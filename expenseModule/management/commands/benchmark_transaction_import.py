@@ -0,0 +1,78 @@
+import csv
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from expenseModule.importer import BATCH_SIZE, CHUNK_SIZE, SPECS, import_transactions
+from expenseModule.models import Buyer, SaleTransaction
+from expenseModule.pricing import price, rates_by_day
+from productModule.models import Product, ProductCategory
+
+BENCHMARK_PREFIX = "BENCH-"
+
+
+class Command(BaseCommand):
+    help = "Times the import of a synthetic sales CSV (benchmark)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--invalid', type=float, default=0.01, help="Share of rows with an error")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--cleanup', action='store_true', help="Delete the synthetic rows afterwards")
+
+    def handle(self, *args, **options):
+        buyers, products = self.seed()
+        offset = SaleTransaction.objects.filter(sale_number__startswith=BENCHMARK_PREFIX).count()
+        rng = random.Random(offset)
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8", newline="") as file:
+            self.write_csv(file, rng, offset, options['rows'], options['invalid'], buyers, products)
+            file.flush()
+            started = time.perf_counter()
+            with open(file.name, "rb") as source:
+                result = import_transactions('sales', source, 'csv', options['chunk_size'], options['batch_size'])
+            elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} of {result.rows} rows ({len(result.errors)} errors) in {elapsed:.2f}s, "
+            f"{result.rows / elapsed:.0f} rows/s"
+        ))
+        if options['cleanup']:
+            # A regular delete: its signals drop the ledger entries and invalidate the cached reports.
+            SaleTransaction.objects.filter(sale_number__startswith=BENCHMARK_PREFIX).delete()
+            Buyer.objects.filter(buyer_number__startswith=BENCHMARK_PREFIX).delete()
+            Product.objects.filter(product_number__startswith=BENCHMARK_PREFIX).delete()
+            ProductCategory.objects.filter(name=f"{BENCHMARK_PREFIX}CATEGORY").delete()
+
+    def seed(self):
+        category, _ = ProductCategory.objects.get_or_create(name=f"{BENCHMARK_PREFIX}CATEGORY", defaults={'description': "-"})
+        buyers = [f"{BENCHMARK_PREFIX}B{number}" for number in range(500)]
+        products = [f"{BENCHMARK_PREFIX}P{number}" for number in range(50)]
+        Buyer.objects.bulk_create(
+            [Buyer(buyer_name=number, buyer_number=number, phone="-") for number in buyers], ignore_conflicts=True
+        )
+        Product.objects.bulk_create(
+            [Product(name=number, product_number=number, category=category, description="-", benefit="-")
+             for number in products],
+            ignore_conflicts=True,
+        )
+        return buyers, products
+
+    def write_csv(self, file, rng, offset, rows, invalid, buyers, products):
+        writer = csv.writer(file)
+        writer.writerow(SPECS['sales'].columns)
+        # The import rejects totals and VAT that differ from the derived ones.
+        rate_of = rates_by_day()
+        for number in range(offset, offset + rows):
+            quantity = rng.randrange(1, 500)
+            unit_price = Decimal(rng.randrange(100, 100_000)) / 100
+            day = date(2023, 1, 1) + timedelta(days=rng.randrange(730))
+            total, vat = price(quantity, unit_price, rate_of(day) or 20)
+            row = [
+                f"{BENCHMARK_PREFIX}S{number}", rng.choice(buyers), rng.choice(products), "Market", "-", "-",
+                day.isoformat(), quantity, total, unit_price, "cash", (day + timedelta(days=3)).isoformat(), vat,
+            ]
+            if rng.random() < invalid:
+                row[rng.choice([1, 6, 7])] = "x"
+            writer.writerow(row)
@@ -0,0 +1,32 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from expenseModule.pricing import drifted_sales, reprice
+
+REPORTED_ROWS = 50
+
+
+class Command(BaseCommand):
+    help = "Lists the sales whose total_value or vat differ from quantity, price and the VAT rate in effect."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help="First sale date (YYYY-MM-DD)")
+        parser.add_argument('--end', type=date.fromisoformat, help="Last sale date (YYYY-MM-DD)")
+        parser.add_argument('--fix', action='store_true', help="Reprice the drifted sales")
+
+    def handle(self, *args, **options):
+        drifted = drifted_sales(options['start'], options['end'])
+        count = drifted.count()
+        rows = drifted.order_by('date', 'pk').values_list(
+            'sale_number', 'date', 'total_value', 'expected_total', 'vat', 'expected_vat'
+        )
+        for sale_number, day, total, expected_total, vat, expected_vat in rows[:REPORTED_ROWS]:
+            self.stdout.write(
+                f"{sale_number} ({day}): total_value {total}, expected {expected_total}; vat {vat}, expected {expected_vat}"
+            )
+        if not count:
+            self.stdout.write(self.style.SUCCESS("Every sale matches its quantity, price and VAT rate"))
+        elif options['fix']:
+            changed = reprice(options['start'], options['end'])
+            self.stdout.write(self.style.SUCCESS(f"Repriced {changed} sales"))
+        else:
+            raise CommandError(f"{count} sales drifted; run with --fix to reprice them")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from expenseModule.importer import BATCH_SIZE, CHUNK_SIZE, FORMATS, SPECS, format_of, import_transactions, write_error_report
+
+
+class Command(BaseCommand):
+    help = "Imports sale or purchase transactions from a CSV or XLSX file, skipping and reporting invalid rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(SPECS))
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, help="File format; taken from the file extension by default.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--errors", help="Write the rejected rows to this CSV file.")
+
+    def handle(self, *args, **options):
+        try:
+            file_format = options["format"] or format_of(options["path"])
+        except ValueError as e:
+            raise CommandError(e)
+        with open(options["path"], "rb") as file:
+            result = import_transactions(
+                options["kind"], file, file_format, options["chunk_size"], options["batch_size"]
+            )
+        self.stdout.write(f"{result.rows} rows read, {result.created} imported, {len(result.errors)} errors")
+        if options["errors"]:
+            with open(options["errors"], "w", newline="", encoding="utf-8") as output:
+                write_error_report(result.errors, output)
+        else:
+            for line, column, message in result.errors[:20]:
+                self.stdout.write(f"line {line}, {column}: {message}")
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from expenseModule.ledger import sync_all
+
+
+class Command(BaseCommand):
+    help = "Appends the cash-flow ledger entries missing for the expense, revenue, voucher, sale, purchase, subscription and debt rows."
+
+    def handle(self, *args, **options):
+        for source, count in sync_all().items():
+            self.stdout.write(f"{source}: {count} entries appended")
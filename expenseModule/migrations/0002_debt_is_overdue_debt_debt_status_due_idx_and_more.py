@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenseModule', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='debt',
+            name='is_overdue',
+            field=models.BooleanField(default=False, help_text='Set daily while the debt is not fully paid past its due date', verbose_name='Overdue'),
+        ),
+        migrations.AddIndex(
+            model_name='debt',
+            index=models.Index(fields=['debt_status', 'due_date'], name='debt_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='debt',
+            index=models.Index(condition=models.Q(('is_overdue', True)), fields=['due_date'], name='debt_overdue_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenseModule', '0002_debt_is_overdue_debt_debt_status_due_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Date the money moves', verbose_name='Date')),
+                ('direction', models.CharField(choices=[('IN', 'Money In'), ('OUT', 'Money Out')], help_text='Money in or out', max_length=3, verbose_name='Direction')),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Amount moved; negative for reversals', max_digits=12, verbose_name='Amount')),
+                ('source', models.CharField(help_text='Model the entry comes from', max_length=50, verbose_name='Source')),
+                ('source_id', models.PositiveBigIntegerField(help_text='Primary key of the source row', verbose_name='Source ID')),
+                ('counterparty', models.CharField(blank=True, help_text='Buyer, supplier, company or debtor', max_length=255, verbose_name='Counterparty')),
+                ('recorded_at', models.DateTimeField(auto_now_add=True, help_text='Date when the entry was appended', verbose_name='Recorded At')),
+            ],
+            options={
+                'verbose_name': 'Ledger Entry',
+                'verbose_name_plural': 'Ledger Entries',
+                'ordering': ['date', 'id'],
+                'indexes': [models.Index(fields=['date', 'id'], name='ledger_date_idx'), models.Index(fields=['counterparty', 'date'], name='ledger_counterparty_date_idx'), models.Index(fields=['source', 'source_id'], name='ledger_source_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenseModule', '0003_ledgerentry'),
+        ('productModule', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VatRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rate', models.DecimalField(decimal_places=2, help_text='VAT rate in percent, e.g. 20.00', max_digits=5, verbose_name='Rate')),
+                ('valid_from', models.DateField(help_text='First sale date the rate applies to', unique=True, verbose_name='Valid From')),
+                ('description', models.CharField(blank=True, help_text='Reason for the change, e.g. the regulation', max_length=255, verbose_name='Description')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date when the rate was recorded', verbose_name='Creation Date')),
+            ],
+            options={
+                'verbose_name': 'VAT Rate',
+                'verbose_name_plural': 'VAT Rates',
+                'ordering': ['-valid_from'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='saletransaction',
+            index=models.Index(fields=['date'], name='sale_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:01
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenseModule', '0004_vatrate_sale_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DebtAgingSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField(help_text='Date the debts were aged against', unique=True, verbose_name='As Of')),
+                ('debtors', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Aging buckets per debtor', verbose_name='Debtors')),
+                ('totals', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Aging buckets over all debtors', verbose_name='Totals')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date when the snapshot was taken', verbose_name='Creation Date')),
+            ],
+            options={
+                'verbose_name': 'Debt Aging Snapshot',
+                'verbose_name_plural': 'Debt Aging Snapshots',
+                'ordering': ['-as_of'],
+            },
+        ),
+    ]
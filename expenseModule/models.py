@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from productModule.models import Supplier  
@@ -194,6 +195,7 @@ DEBT_STATUS_CHOICES = [
     ('PART', _("Partially Paid")),  
     ('FULL', _("Fully Paid")),   
 ]
+OPEN_DEBT_STATUSES = ('DUE', 'PART')
 
 class Debt(models.Model):
     debtor_number = models.CharField(max_length=50, verbose_name=_("Debtor Number"), help_text=_("Number of buyer, supplier, person, or employee associated with the debt"))   
@@ -205,6 +207,7 @@ class Debt(models.Model):
     description = models.TextField(verbose_name=_("Description"), help_text=_("Additional details about the debt"))  
     image = models.ImageField(upload_to='debts/', null=True, blank=True, verbose_name=_("Image"), help_text=_("Attach an image of related documents"))   
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Creation Date"), help_text=_("Date when the debt was recorded"))   
+    is_overdue = models.BooleanField(default=False, verbose_name=_("Overdue"), help_text=_("Set daily while the debt is not fully paid past its due date"))
 
     objects = CustomFieldManager()  
 
@@ -213,6 +216,10 @@ class Debt(models.Model):
         verbose_name = _("Debt") 
         verbose_name_plural = _("Debts")  
         ordering = ['due_date'] 
+        indexes = [
+            models.Index(fields=['debt_status', 'due_date'], name='debt_status_due_idx'),
+            models.Index(fields=['due_date'], condition=models.Q(is_overdue=True), name='debt_overdue_idx'),
+        ]
 
  
 class Buyer(models.Model):
@@ -249,10 +256,25 @@ class SaleTransaction(models.Model):
     objects = CustomFieldManager()  
 
     def __str__(self): return self.sale_number
+
+    def save(self, *args, **kwargs):
+        """
+        Derives total_value and vat from quantity, price_per_product and the VAT rate of the sale date
+        (see expenseModule.pricing) before saving.
+        """
+        from .pricing import apply_price, rate_on
+        apply_price(self, rate_on(self.date))
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "total_value", "vat"}
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = _("Sale Transaction")   
         verbose_name_plural = _("Sale Transactions")  
         ordering = ['sale_number']  
+        indexes = [
+            models.Index(fields=['date'], name='sale_date_idx'),
+        ]
 
  
 class PurchaseTransaction(models.Model):
@@ -293,6 +315,76 @@ class PurchaseTransactionDetail(models.Model):
         ordering = ['transaction_date']   
 
  
+LEDGER_DIRECTION_CHOICES = [
+    ('IN', _("Money In")),
+    ('OUT', _("Money Out")),
+]
+
+class LedgerEntry(models.Model):
+    """
+    Append-only cash-flow ledger fed by the signals in expenseModule.signals (see expenseModule.ledger).
+    A change to a source row appends the reversal of its previous entries (negative amounts) and its new ones.
+    """
+    date = models.DateField(verbose_name=_("Date"), help_text=_("Date the money moves"))  
+    direction = models.CharField(max_length=3, choices=LEDGER_DIRECTION_CHOICES, verbose_name=_("Direction"), help_text=_("Money in or out"))  
+    amount = models.DecimalField(max_digits=12, decimal_places=2, verbose_name=_("Amount"), help_text=_("Amount moved; negative for reversals"))  
+    source = models.CharField(max_length=50, verbose_name=_("Source"), help_text=_("Model the entry comes from"))  
+    source_id = models.PositiveBigIntegerField(verbose_name=_("Source ID"), help_text=_("Primary key of the source row"))  
+    counterparty = models.CharField(max_length=255, blank=True, verbose_name=_("Counterparty"), help_text=_("Buyer, supplier, company or debtor"))  
+    recorded_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Recorded At"), help_text=_("Date when the entry was appended"))  
+
+    objects = CustomFieldManager()  
+
+    def __str__(self): return f"{self.date} {self.direction} {self.amount} ({self.source} #{self.source_id})"
+    class Meta:
+        verbose_name = _("Ledger Entry")  
+        verbose_name_plural = _("Ledger Entries")  
+        ordering = ['date', 'id']  
+        indexes = [
+            models.Index(fields=['date', 'id'], name='ledger_date_idx'),
+            models.Index(fields=['counterparty', 'date'], name='ledger_counterparty_date_idx'),
+            models.Index(fields=['source', 'source_id'], name='ledger_source_idx'),
+        ]
+
+
+class VatRate(models.Model):
+    """
+    VAT rate versions: a rate applies to sales dated from valid_from until the next version starts.
+    Saving or deleting a version reprices the sales it covers (see expenseModule.pricing).
+    """
+    rate = models.DecimalField(max_digits=5, decimal_places=2, verbose_name=_("Rate"), help_text=_("VAT rate in percent, e.g. 20.00"))  
+    valid_from = models.DateField(unique=True, verbose_name=_("Valid From"), help_text=_("First sale date the rate applies to"))  
+    description = models.CharField(max_length=255, blank=True, verbose_name=_("Description"), help_text=_("Reason for the change, e.g. the regulation"))  
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Creation Date"), help_text=_("Date when the rate was recorded"))  
+
+    objects = CustomFieldManager()  
+
+    def __str__(self): return f"{self.rate}% from {self.valid_from}"
+    class Meta:
+        verbose_name = _("VAT Rate")  
+        verbose_name_plural = _("VAT Rates")  
+        ordering = ['-valid_from']  
+
+
+class DebtAgingSnapshot(models.Model):
+    """
+    Debt aging report (see expenseModule.aging) stored per as-of date. Snapshots from today on are
+    dropped whenever a debt changes; older ones keep what the report showed on their day.
+    """
+    as_of = models.DateField(unique=True, verbose_name=_("As Of"), help_text=_("Date the debts were aged against"))  
+    debtors = models.JSONField(encoder=DjangoJSONEncoder, verbose_name=_("Debtors"), help_text=_("Aging buckets per debtor"))  
+    totals = models.JSONField(encoder=DjangoJSONEncoder, verbose_name=_("Totals"), help_text=_("Aging buckets over all debtors"))  
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Creation Date"), help_text=_("Date when the snapshot was taken"))  
+
+    objects = CustomFieldManager()  
+
+    def __str__(self): return f"Debt aging as of {self.as_of}"
+    class Meta:
+        verbose_name = _("Debt Aging Snapshot")  
+        verbose_name_plural = _("Debt Aging Snapshots")  
+        ordering = ['-as_of']  
+
+ 
  
  
  
@@ -0,0 +1,152 @@
+"""
+Sale pricing: total_value and vat derived from quantity, price_per_product and the VatRate versions.
+
+    total_value = round(quantity * price_per_product, 2)
+    vat         = round(total_value * rate / 100, 2)   # rate of the VatRate version in effect on the sale date
+
+The formulas exist twice: as Python (price) for single sales, and as database expressions with the
+rate read by a correlated subquery (expected_total, expected_vat). Saving a sale derives its values
+with price (apply_price), and imports are checked against it (sale_price_checker). Repricing and
+the drift check run entirely in the database, so a rate change rewrites any number of sales with one
+UPDATE that only touches the rows whose stored values differ. Sales dated before the first VatRate
+keep the vat they were given.
+"""
+from bisect import bisect_right
+from decimal import ROUND_HALF_UP, Decimal
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Round
+from reportingModule.cache import bump_version
+from .ledger import sync_entries
+from .models import SaleTransaction, VatRate
+
+CENT = Decimal("0.01")
+LEDGER_BATCH_SIZE = 1000
+
+
+def rate_on(day):
+    """
+    The VAT rate in effect on day, or None before the first version.
+    """
+    return VatRate.objects.filter(valid_from__lte=day).order_by("-valid_from").values_list("rate", flat=True).first()
+
+
+def price(quantity, price_per_product, rate):
+    """
+    (total_value, vat) of a sale, rounded half up like numeric rounding in the database.
+    """
+    total = (Decimal(quantity) * Decimal(price_per_product)).quantize(CENT, ROUND_HALF_UP)
+    return total, (total * Decimal(rate) / 100).quantize(CENT, ROUND_HALF_UP)
+
+
+def rates_by_day():
+    """
+    rate_on for any number of days, with the versions read in one query.
+    """
+    versions = list(VatRate.objects.order_by("valid_from").values_list("valid_from", "rate"))
+    starts = [valid_from for valid_from, _ in versions]
+
+    def rate(day):
+        index = bisect_right(starts, day)
+        return versions[index - 1][1] if index else None
+
+    return rate
+
+
+def apply_price(sale, rate):
+    """
+    Sets the derived total_value of a sale, and its vat unless no rate applies (rate is None).
+    """
+    total, vat = price(sale.quantity, sale.price_per_product, rate or 0)
+    sale.total_value = total
+    if rate is not None:
+        sale.vat = vat
+
+
+def sale_price_checker():
+    """
+    A function giving the errors ({field: [message]}) of a validated sale whose total_value or vat differ
+    from the derived ones. Used by imports, which insert with bulk_create and never call save().
+    """
+    rate_of = rates_by_day()
+
+    def check(sale):
+        rate = rate_of(sale.date)
+        total, vat = price(sale.quantity, sale.price_per_product, rate or 0)
+        errors = {}
+        if sale.total_value != total:
+            errors["total_value"] = [f"Expected {total} (quantity x price_per_product), got {sale.total_value}"]
+        if rate is not None and sale.vat != vat:
+            errors["vat"] = [f"Expected {vat} ({rate}% of the total on {sale.date}), got {sale.vat}"]
+        return errors
+
+    return check
+
+
+def _money(expression):
+    return Round(ExpressionWrapper(expression, output_field=DecimalField(max_digits=20, decimal_places=6)), 2,
+                 output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def rate_in_effect():
+    return Subquery(
+        VatRate.objects.filter(valid_from__lte=OuterRef("date")).order_by("-valid_from").values("rate")[:1]
+    )
+
+
+def expected_total():
+    return _money(F("quantity") * F("price_per_product"))
+
+
+def expected_vat():
+    # Written from quantity and price rather than total_value: UPDATE evaluates every SET from the old row.
+    return _money(expected_total() * rate_in_effect() / Value(100))
+
+
+def priced_sales(start=None, end=None):
+    """
+    Sales dated from start to end (both optional) that a VatRate version applies to.
+    """
+    first = VatRate.objects.order_by("valid_from").values("valid_from")[:1]
+    sales = SaleTransaction.objects.filter(date__gte=Subquery(first))
+    if start:
+        sales = sales.filter(date__gte=start)
+    if end:
+        sales = sales.filter(date__lte=end)
+    return sales
+
+
+def drifted_sales(start=None, end=None):
+    """
+    Sales whose stored total_value or vat differ from the derived ones, annotated with expected_total and expected_vat.
+    """
+    return priced_sales(start, end).annotate(expected_total=expected_total(), expected_vat=expected_vat()).filter(
+        ~Q(total_value=F("expected_total")) | ~Q(vat=F("expected_vat"))
+    )
+
+
+def reprice(start=None, end=None):
+    """
+    Rewrites total_value and vat of the drifted sales from start to end with one UPDATE. Returns the rows changed.
+
+    update() sends no signals: the cash-flow ledger, which records total_value, is brought in line for the
+    sales whose total changed (a rate change only moves vat and leaves the ledger alone), and the cached
+    sales reports are invalidated here.
+    """
+    sales = priced_sales(start, end)
+    with transaction.atomic():
+        moved = list(
+            sales.annotate(expected_total=expected_total()).exclude(total_value=F("expected_total"))
+            .values_list("pk", flat=True)
+        )
+        changed = sales.filter(~Q(total_value=expected_total()) | ~Q(vat=expected_vat())).update(
+            total_value=expected_total(), vat=expected_vat()
+        )
+        for offset in range(0, len(moved), LEDGER_BATCH_SIZE):
+            batch = SaleTransaction.objects.select_related("buyer").filter(
+                pk__in=moved[offset:offset + LEDGER_BATCH_SIZE]
+            )
+            sync_entries(SaleTransaction, list(batch))
+        if changed:
+            bump_version(SaleTransaction._meta.label)
+    return changed
@@ -0,0 +1,49 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from .aging import drop_current_snapshots
+from .ledger import SOURCES, sync_entries, to_date
+from .models import Debt, VatRate
+from .tasks import reprice_sales_task
+
+
+def record_saved_source(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_entries(sender, [instance])
+
+
+def record_deleted_source(sender, instance, **kwargs):
+    sync_entries(sender, [instance], deleted=True)
+
+
+for model in SOURCES:
+    post_save.connect(record_saved_source, sender=model, dispatch_uid=f"cash_ledger_{model.__name__}_save")
+    post_delete.connect(record_deleted_source, sender=model, dispatch_uid=f"cash_ledger_{model.__name__}_delete")
+
+
+def remember_valid_from(sender, instance, **kwargs):
+    instance._loaded_valid_from = instance.__dict__.get("valid_from")
+
+
+def reprice_covered_sales(sender, instance, raw=False, **kwargs):
+    """
+    Queues the repricing of the sales from the earliest date the version covered or now covers.
+    """
+    if raw:
+        return
+    start = min(to_date(day) for day in (instance.valid_from, instance._loaded_valid_from) if day)
+    transaction.on_commit(lambda: reprice_sales_task.delay(start=str(start)))
+    instance._loaded_valid_from = instance.valid_from
+
+
+post_init.connect(remember_valid_from, sender=VatRate, dispatch_uid="vat_rate_init")
+post_save.connect(reprice_covered_sales, sender=VatRate, dispatch_uid="vat_rate_save")
+post_delete.connect(reprice_covered_sales, sender=VatRate, dispatch_uid="vat_rate_delete")
+
+
+def drop_stale_aging(sender, instance, raw=False, **kwargs):
+    if not raw:
+        drop_current_snapshots()
+
+
+post_save.connect(drop_stale_aging, sender=Debt, dispatch_uid="debt_aging_save")
+post_delete.connect(drop_stale_aging, sender=Debt, dispatch_uid="debt_aging_delete")
@@ -0,0 +1,20 @@
+from datetime import date
+from celery import shared_task
+from .aging import aging_snapshot
+from .pricing import reprice
+
+
+@shared_task
+def reprice_sales_task(start=None, end=None):
+    """
+    Reprices the sales from start to end (ISO dates, both optional), queued when a VatRate version changes.
+    """
+    return reprice(start and date.fromisoformat(start), end and date.fromisoformat(end))
+
+
+@shared_task
+def debt_aging_snapshot_task():
+    """
+    Takes today's debt aging snapshot, scheduled in CELERY_BEAT_SCHEDULE after the overdue detection.
+    """
+    return str(aging_snapshot(refresh=True)["as_of"])
@@ -1,3 +1,357 @@
+import io
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
 from django.test import TestCase
+from django.utils.timezone import localdate
+from rest_framework.test import APIClient
+from productModule.models import Product, ProductCategory
+from reportingModule.cache import cached_generate, report_cache
+from reportingModule.reports.sales_report import SalesReport
+from .aging import debt_aging
+from .budget import budget_vs_actual
+from .importer import import_transactions
+from .pricing import drifted_sales, price, reprice
+from .ledger import period_totals, running_balance, sync_all
+from .models import (
+    Buyer, Company, Debt, DebtAgingSnapshot, ExpenseItem, ExpenseList, LedgerEntry, ReceiptVoucher, SaleTransaction,
+    Subscription, VatRate,
+)
 
-# Create your tests here.
+
+class CashFlowLedgerTests(TestCase):
+    def setUp(self):
+        self.expenses = ExpenseList.objects.create(
+            list_name="Fuel", list_number="E1", expense_type="fuel", monthly_expense=100, description="-"
+        )
+        self.buyer = Buyer.objects.create(buyer_name="Ali", buyer_number="B1", phone="-")
+
+    def receipt(self, number, amount, day):
+        return ReceiptVoucher.objects.create(
+            buyer=self.buyer, voucher_number=number, amount=Decimal(amount), date=day, description="-",
+            receiver_signature="-", accountant_signature="-",
+        )
+
+    def expense(self, number, amount, day):
+        return ExpenseItem.objects.create(
+            expense_number=number, name=number, amount=Decimal(amount), description="-", date=day,
+            status="approved", expense_list=self.expenses,
+        )
+
+    def test_changes_are_appended_as_reversals(self):
+        voucher = self.receipt("R1", "100.00", date(2024, 1, 10))
+        voucher.amount = Decimal("120.00")
+        voucher.save()
+        voucher.save()
+        self.assertEqual(
+            list(LedgerEntry.objects.values_list("direction", "amount", "counterparty")),
+            [("IN", Decimal("100.00"), "Ali"), ("IN", Decimal("-100.00"), "Ali"), ("IN", Decimal("120.00"), "Ali")],
+        )
+        voucher.delete()
+        self.assertEqual(running_balance(date(2024, 1, 1), date(2024, 1, 31)).last().balance, 0)
+
+    def test_running_balance_and_period_totals(self):
+        self.receipt("R1", "500.00", date(2023, 12, 20))
+        self.expense("X1", "80.00", date(2024, 1, 5))
+        self.receipt("R2", "200.00", date(2024, 2, 1))
+        company = Company.objects.create(
+            company_number="C1", company_name="Power", branch_name="-", branch_address="-", phone="-",
+            description="-", service="ELE",
+        )
+        Subscription.objects.create(
+            subscription_name="Power", subscription_number="S1", company=company, subscription_account_number="1",
+            monthly_amount=Decimal("30.00"), payment_method="cash", start_date=date(2024, 1, 31),
+            end_date=date(2024, 3, 31), description="-", address="-",
+        )
+
+        balances = [
+            (entry.date, entry.balance) for entry in running_balance(date(2024, 1, 1), date(2024, 2, 29))
+        ]
+        self.assertEqual(balances, [
+            (date(2024, 1, 5), Decimal("420.00")),
+            (date(2024, 1, 31), Decimal("390.00")),
+            (date(2024, 2, 1), Decimal("590.00")),
+            (date(2024, 2, 29), Decimal("560.00")),
+        ])
+        totals = list(period_totals(date(2024, 1, 1), date(2024, 3, 31)))
+        self.assertEqual(
+            [(row["money_in"], row["money_out"], row["net"]) for row in totals],
+            [(0, Decimal("110.00"), Decimal("-110.00")), (Decimal("200.00"), Decimal("30.00"), Decimal("170.00")),
+             (0, Decimal("30.00"), Decimal("-30.00"))],
+        )
+
+    def test_backfill_only_appends_what_is_missing(self):
+        self.receipt("R1", "100.00", date(2024, 1, 10))
+        self.expense("X1", "80.00", date(2024, 1, 5))
+        LedgerEntry.objects.filter(source="ExpenseItem").delete()
+        appended = sync_all()
+        self.assertEqual((appended["ExpenseItem"], appended["ReceiptVoucher"]), (1, 0))
+        self.assertEqual(LedgerEntry.objects.count(), 2)
+
+    def test_cash_flow_endpoint(self):
+        self.receipt("R1", "100.00", date(2024, 1, 10))
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create(username="accountant"))
+        response = client.get("/expenses/cash-flow/", {"start": "2024-01-01", "end": "2024-01-31"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["entries"][0]["balance"], Decimal("100.00"))
+        self.assertEqual(client.get("/expenses/cash-flow/", {"start": "2024-01-01"}).status_code, 400)
+
+
+class BudgetVsActualTests(TestCase):
+    def test_every_list_and_month_in_two_queries(self):
+        lists = [
+            ExpenseList.objects.create(
+                list_name=f"List {index}", list_number=f"E{index}", expense_type="-", monthly_expense=100,
+                description="-",
+            )
+            for index in range(3)
+        ]
+        for number, (expense_list, amount, day) in enumerate([
+            (lists[0], "30.00", date(2024, 1, 5)),
+            (lists[0], "90.00", date(2024, 1, 31)),
+            (lists[0], "10.00", date(2024, 3, 1)),
+            (lists[1], "50.00", date(2023, 12, 31)),
+        ]):
+            ExpenseItem.objects.create(
+                expense_number=f"X{number}", name="-", amount=Decimal(amount), description="-", date=day,
+                status="approved", expense_list=expense_list,
+            )
+
+        with self.assertNumQueries(2):
+            report = budget_vs_actual(months=3, last_month=date(2024, 3, 20))
+        self.assertEqual(report["months"], [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)])
+        first = report["lists"][0]
+        self.assertEqual([cell["actual"] for cell in first["months"]], [Decimal("120.00"), 0, Decimal("10.00")])
+        self.assertEqual(first["months"][0]["variance"], Decimal("-20.00"))
+        self.assertEqual((first["total_budget"], first["total_actual"], first["total_variance"]), (300, 130, 170))
+        self.assertEqual(report["lists"][1]["total_actual"], 0)
+
+    def test_budget_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create(username="accountant"))
+        ExpenseList.objects.create(
+            list_name="Fuel", list_number="E1", expense_type="-", monthly_expense=100, description="-"
+        )
+        response = client.get("/expenses/budget/", {"months": 6, "end": "2024-06"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["lists"][0]["months"]), 6)
+        self.assertEqual(client.get("/expenses/budget/", {"months": 0}).status_code, 400)
+        self.assertEqual(client.get("/expenses/budget/", {"end": "June"}).status_code, 400)
+
+
+class TransactionImportTests(TestCase):
+    HEADER = ("sale_number,buyer_number,product_number,sale_place,address,phone,date,quantity,total_value,"
+              "price_per_product,payment_method,delivery_date,vat\n")
+
+    def setUp(self):
+        Buyer.objects.create(buyer_name="Ali", buyer_number="B1", phone="-")
+        category = ProductCategory.objects.create(name="Feed", description="-")
+        Product.objects.create(name="Corn", product_number="P1", category=category, description="-", benefit="-")
+        report_cache.clear()
+        self.addCleanup(report_cache.clear)
+
+    def sale(self, number, buyer="B1", day="2024-01-10", quantity="2"):
+        return f"{number},{buyer},P1,Market,-,-,{day},{quantity},20.00,10.00,cash,{day},4.00\n"
+
+    def test_valid_rows_are_imported_and_errors_reported(self):
+        SaleTransaction.objects.create(
+            sale_number="S0", sale_place="-", address="-", phone="-", date=date(2024, 1, 1), quantity=1,
+            total_value=1, price_per_product=1, payment_method="-", delivery_date=date(2024, 1, 1), vat=0,
+        )
+        rows = [self.sale("S1"), self.sale("S2", buyer="B9"), self.sale("S3", day="10/01/2024"),
+                self.sale("S1"), self.sale("S0"), self.sale("S4", quantity="-1"), self.sale("S5")]
+        data = io.BytesIO((self.HEADER + "".join(rows)).encode())
+
+        # per chunk: buyers, products, existing sale numbers, VAT rates, then the savepoint, insert,
+        # ledger read, ledger insert, the report version bump (8 queries on the database cache) and release
+        with self.assertNumQueries(2 * 17):
+            result = import_transactions("sales", data, "csv", chunk_size=4)
+        self.assertEqual((result.rows, result.created), (7, 2))
+        self.assertEqual([(line, column) for line, column, _ in result.errors], [
+            (3, "buyer_number"), (4, "date"), (4, "delivery_date"), (5, "sale_number"), (6, "sale_number"),
+            (7, "quantity"),
+        ])
+        self.assertEqual(SaleTransaction.objects.get(sale_number="S5").buyer.buyer_name, "Ali")
+        self.assertEqual(LedgerEntry.objects.filter(source="SaleTransaction").count(), 3)
+
+    def test_import_invalidates_cached_sales_reports(self):
+        report = SalesReport(["sale_number"], {})
+        self.assertEqual(cached_generate("sales", report).splitlines(), ["sale_number"])
+        import_transactions("sales", io.BytesIO((self.HEADER + self.sale("S1") + self.sale("S2")).encode()), "csv")
+        self.assertEqual(cached_generate("sales", report).splitlines(), ["sale_number", "S1", "S2"])
+
+    def test_totals_and_vat_must_match_the_derived_ones(self):
+        VatRate.objects.create(rate=Decimal("20.00"), valid_from=date(2024, 1, 1))
+        rows = [
+            self.sale("S1"),
+            "S2,B1,P1,Market,-,-,2024-01-10,2,21.00,10.00,cash,2024-01-10,4.00\n",
+            "S3,B1,P1,Market,-,-,2024-01-10,2,20.00,10.00,cash,2024-01-10,3.60\n",
+            # Before the first VAT rate the given vat is kept.
+            "S4,B1,P1,Market,-,-,2023-12-31,2,20.00,10.00,cash,2023-12-31,3.60\n",
+        ]
+        result = import_transactions("sales", io.BytesIO((self.HEADER + "".join(rows)).encode()), "csv")
+        self.assertEqual(result.created, 2)
+        self.assertEqual([(line, column) for line, column, _ in result.errors], [(3, "total_value"), (4, "vat")])
+        self.assertIn("Expected 20.00", result.errors[0][2])
+        self.assertEqual(dict(SaleTransaction.objects.values_list("sale_number", "vat")),
+                         {"S1": Decimal("4.00"), "S4": Decimal("3.60")})
+
+    def test_xlsx_upload_endpoint(self):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        workbook.active.append(self.HEADER.strip().split(","))
+        workbook.active.append(["S1", "B1", "P1", "Market", "-", "-", date(2024, 1, 10), 2, 20.1, 10.05, "cash",
+                                date(2024, 1, 12), 4])
+        content = io.BytesIO()
+        workbook.save(content)
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create(username="accountant"))
+
+        upload = SimpleUploadedFile("sales.xlsx", content.getvalue())
+        response = client.post("/expenses/import/sales/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["created"], response.data["error_count"]), (1, 0))
+        self.assertEqual(SaleTransaction.objects.get().total_value, Decimal("20.10"))
+        upload = SimpleUploadedFile("sales.txt", b"-")
+        self.assertEqual(client.post("/expenses/import/sales/", {"file": upload}).status_code, 400)
+
+    def test_unreadable_csv_and_taken_numbers_are_bad_requests(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create(username="accountant"))
+
+        oversized = self.HEADER + "x" * 200_000 + self.sale("S1")[1:]
+        upload = SimpleUploadedFile("sales.csv", oversized.encode())
+        response = client.post("/expenses/import/sales/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("line 2", response.data["error"])
+
+        # Another import commits S1 between the number check and the insert.
+        with mock.patch("expenseModule.importer.sync_entries", side_effect=IntegrityError("UNIQUE constraint failed")):
+            upload = SimpleUploadedFile("sales.csv", (self.HEADER + self.sale("S1")).encode())
+            response = client.post("/expenses/import/sales/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("UNIQUE constraint failed", response.data["error"])
+        self.assertFalse(SaleTransaction.objects.exists())
+
+
+class SalePricingTests(TestCase):
+    def setUp(self):
+        self.buyer = Buyer.objects.create(buyer_name="Ali", buyer_number="B1", phone="-")
+
+    def sale(self, number, day, quantity, unit_price, total, vat):
+        return SaleTransaction.objects.create(
+            buyer=self.buyer, sale_number=number, sale_place="-", address="-", phone="-", date=day,
+            quantity=quantity, price_per_product=Decimal(unit_price), total_value=Decimal(total), vat=Decimal(vat),
+            payment_method="cash", delivery_date=day,
+        )
+
+    def test_rate_change_reprices_covered_sales(self):
+        VatRate.objects.create(rate=Decimal("18.00"), valid_from=date(2023, 1, 1))
+        self.sale("S0", date(2022, 12, 31), 1, "10.00", "10.00", "0.00")
+        self.sale("S1", date(2023, 3, 1), 3, "10.05", "30.15", "5.43")
+        self.sale("S2", date(2023, 8, 1), 2, "10.00", "20.00", "3.60")
+        self.assertFalse(drifted_sales().exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            VatRate.objects.create(rate=Decimal("20.00"), valid_from=date(2023, 7, 10))
+        self.assertEqual(
+            list(SaleTransaction.objects.order_by("date").values_list("vat", flat=True)),
+            [Decimal("0.00"), Decimal("5.43"), Decimal("4.00")],
+        )
+        self.assertEqual(LedgerEntry.objects.filter(source="SaleTransaction").count(), 3)
+
+    def test_save_derives_total_and_vat(self):
+        VatRate.objects.create(rate=Decimal("20.00"), valid_from=date(2023, 1, 1))
+        sale = self.sale("S1", date(2023, 3, 1), 3, "10.05", "99.00", "0.00")
+        early = self.sale("S0", date(2022, 12, 31), 2, "10.00", "0.00", "1.50")
+        self.assertEqual((sale.total_value, sale.vat), (Decimal("30.15"), Decimal("6.03")))
+        self.assertEqual((early.total_value, early.vat), (Decimal("20.00"), Decimal("1.50")))
+
+        sale.quantity = 4
+        sale.save(update_fields=["quantity"])
+        sale.refresh_from_db()
+        self.assertEqual((sale.total_value, sale.vat), (Decimal("40.20"), Decimal("8.04")))
+        self.assertFalse(drifted_sales().exists())
+
+    def test_repricing_invalidates_cached_sales_reports(self):
+        report_cache.clear()
+        self.addCleanup(report_cache.clear)
+        VatRate.objects.create(rate=Decimal("20.00"), valid_from=date(2023, 1, 1))
+        self.sale("S1", date(2023, 3, 1), 1, "10.00", "10.00", "2.00")
+        report = SalesReport(["sale_number", "vat"], {})
+        self.assertEqual(cached_generate("sales", report).splitlines()[1:], ["S1,2.00"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            VatRate.objects.create(rate=Decimal("10.00"), valid_from=date(2023, 2, 1))
+        self.assertEqual(cached_generate("sales", report).splitlines()[1:], ["S1,1.00"])
+
+        SaleTransaction.objects.update(vat=Decimal("5.00"))  # drift from a bulk write, then --fix
+        report_cache.clear()
+        self.assertEqual(cached_generate("sales", report).splitlines()[1:], ["S1,5.00"])
+        self.assertEqual(reprice(), 1)
+        self.assertEqual(cached_generate("sales", report).splitlines()[1:], ["S1,1.00"])
+
+    def test_drifted_totals_are_reported_and_fixed(self):
+        VatRate.objects.create(rate=Decimal("20.00"), valid_from=date(2023, 1, 1))
+        sale = self.sale("S1", date(2023, 3, 1), 3, "10.05", "30.15", "6.03")
+        # Bulk writes skip save() and can leave the stored values behind.
+        SaleTransaction.objects.filter(pk=sale.pk).update(total_value=Decimal("31.00"))
+        self.assertEqual(
+            list(drifted_sales().values_list("sale_number", "expected_total", "expected_vat")),
+            [("S1", Decimal("30.15"), Decimal("6.03"))],
+        )
+        self.assertEqual(price(3, "10.05", "20.00"), (Decimal("30.15"), Decimal("6.03")))
+
+        self.assertEqual(reprice(start=date(2023, 1, 1)), 1)
+        self.assertEqual(reprice(), 0)
+        sale.refresh_from_db()
+        self.assertEqual(sale.total_value, Decimal("30.15"))
+        self.assertEqual(running_balance(date(2023, 1, 1), date(2023, 12, 31)).last().balance, Decimal("30.15"))
+
+
+class DebtAgingTests(TestCase):
+    def debt(self, debtor, amount, due_date, debt_status="DUE"):
+        return Debt.objects.create(
+            debtor_number=debtor, name=f"Debtor {debtor}", amount=Decimal(amount), debt_reason="-",
+            due_date=due_date, debt_status=debt_status, description="-",
+        )
+
+    def test_buckets_per_debtor_in_one_query(self):
+        as_of = date(2024, 6, 30)
+        self.debt("D1", "100.00", date(2024, 7, 1))
+        self.debt("D1", "10.00", date(2024, 6, 30))
+        self.debt("D1", "20.00", date(2024, 5, 30), "PART")
+        self.debt("D1", "999.00", date(2024, 1, 1), "FULL")
+        self.debt("D2", "40.00", date(2024, 4, 1))
+        self.debt("D2", "50.00", date(2024, 3, 31))
+
+        with self.assertNumQueries(1):
+            report = debt_aging(as_of)
+        first, second = report["debtors"]
+        self.assertEqual(
+            [first[name] for name in ("debts", "total", "current", "days_0_30", "days_31_60")],
+            [3, Decimal("130.00"), Decimal("100.00"), Decimal("10.00"), Decimal("20.00")],
+        )
+        self.assertEqual((second["days_61_90"], second["days_over_90"]), (Decimal("40.00"), Decimal("50.00")))
+        self.assertEqual((report["totals"]["debts"], report["totals"]["total"]), (5, Decimal("220.00")))
+
+    def test_endpoint_serves_todays_snapshot_until_a_debt_changes(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create(username="accountant"))
+        debt = self.debt("D1", "100.00", localdate())
+
+        self.assertEqual(client.get("/expenses/debt-aging/").data["totals"]["days_0_30"], Decimal("100.00"))
+        self.assertTrue(DebtAgingSnapshot.objects.filter(as_of=localdate()).exists())
+        with self.assertNumQueries(1):
+            client.get("/expenses/debt-aging/")
+
+        debt.debt_status = "FULL"
+        debt.save()
+        self.assertFalse(DebtAgingSnapshot.objects.exists())
+        self.assertEqual(client.get("/expenses/debt-aging/").data["totals"]["debts"], 0)
+        self.assertEqual(client.get("/expenses/debt-aging/", {"as_of": "June"}).status_code, 400)
@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import BudgetVsActualView, CashFlowView, DebtAgingView, TransactionImportView
+
+urlpatterns = [
+    path('cash-flow/', CashFlowView.as_view(), name='cash_flow'),
+    path('budget/', BudgetVsActualView.as_view(), name='budget_vs_actual'),
+    path('debt-aging/', DebtAgingView.as_view(), name='debt_aging'),
+    path('import/<str:kind>/', TransactionImportView.as_view(), name='transaction_import'),
+]
@@ -1,3 +1,121 @@
-from django.shortcuts import render
+# expenseModule/views.py
 
-# Create your views here.
+from datetime import date
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from .aging import aging_snapshot
+from .budget import DEFAULT_MONTHS, MAX_MONTHS, budget_vs_actual
+from .importer import SPECS, format_of, import_transactions
+from .ledger import PERIODS, period_totals, running_balance
+
+MAX_REPORTED_ERRORS = 100
+ENTRY_FIELDS = ("id", "date", "direction", "amount", "source", "source_id", "counterparty", "balance")
+
+
+def get_date(params, name):
+    if not params.get(name):
+        raise ValueError(f"{name} is required")
+    return date.fromisoformat(params[name])
+
+
+class CashFlowView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Ledger entries with running balances, and totals per period, between two dates.
+
+        Query parameters:
+            start=2024-01-01&end=2024-12-31   # inclusive
+            counterparty=...                  # optional, exact name
+            period=month                      # day, month or year
+        """
+        params = request.query_params
+        try:
+            start, end = get_date(params, "start"), get_date(params, "end")
+            period = params.get("period", "month")
+            if period not in PERIODS:
+                raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        counterparty = params.get("counterparty")
+        entries = list(running_balance(start, end, counterparty).values(*ENTRY_FIELDS))
+        return Response({
+            "entries": entries,
+            "totals": list(period_totals(start, end, period, counterparty)),
+        })
+
+
+class BudgetVsActualView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Budget, actual spend and variance of every expense list in each month of the period.
+
+        Query parameters:
+            months=12               # number of months, at most 60
+            end=2024-12             # last month of the period; the current month by default
+            status=approved         # optional, only count expense items with this status
+        """
+        params = request.query_params
+        try:
+            months = int(params.get("months", DEFAULT_MONTHS))
+            if not 1 <= months <= MAX_MONTHS:
+                raise ValueError(f"months must be between 1 and {MAX_MONTHS}")
+            last_month = date.fromisoformat(f"{params['end']}-01") if params.get("end") else None
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(budget_vs_actual(months, last_month, params.get("status")))
+
+
+class TransactionImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, kind, *args, **kwargs):
+        """
+        Imports sales or purchases from an uploaded CSV or XLSX file (multipart field "file").
+        Invalid rows are skipped; the first errors are returned with their line numbers.
+        """
+        upload = request.FILES.get("file")
+        try:
+            if kind not in SPECS:
+                raise ValueError(f"kind must be one of {', '.join(SPECS)}")
+            if upload is None:
+                raise ValueError("file is required")
+            result = import_transactions(kind, upload, format_of(upload.name))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "rows": result.rows,
+            "created": result.created,
+            "error_count": len(result.errors),
+            "errors": [
+                {"line": line, "column": column, "error": message}
+                for line, column, message in result.errors[:MAX_REPORTED_ERRORS]
+            ],
+        })
+
+
+class DebtAgingView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Open debts per debtor in current / 0-30 / 31-60 / 61-90 / 90+ days past due buckets.
+
+        Query parameters:
+            as_of=2024-12-31        # today by default
+            refresh=true            # recompute today's snapshot instead of serving the stored one
+        """
+        params = request.query_params
+        try:
+            as_of = date.fromisoformat(params["as_of"]) if params.get("as_of") else None
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(aging_snapshot(as_of, refresh=params.get("refresh") in ("1", "true")))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:18
+
+import mediaModule.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructionsModule', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='instructionattachment',
+            name='attachment',
+            field=models.FileField(help_text='Attach a video, image, or note', storage=mediaModule.storage.document_storage, upload_to='instruction_attachments/', verbose_name='Attachment'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from mediaModule.storage import document_storage
 from django.contrib.contenttypes.models import ContentType   
 from django.contrib.contenttypes.fields import GenericForeignKey   
  
@@ -47,7 +48,7 @@ class Instruction(models.Model):
  
 class InstructionAttachment(models.Model):
     instruction = models.ForeignKey(Instruction, on_delete=models.CASCADE, related_name='attachments', verbose_name=_("Instruction"), help_text=_("Associated instruction"))   
-    attachment = models.FileField(upload_to='instruction_attachments/', verbose_name=_("Attachment"), help_text=_("Attach a video, image, or note"))  
+    attachment = models.FileField(upload_to='instruction_attachments/', storage=document_storage, verbose_name=_("Attachment"), help_text=_("Attach a video, image, or note"))  
     description = models.TextField(verbose_name=_("Description"), help_text=_("Attachment description"))  
     date = models.DateField(verbose_name=_("Date"), help_text=_("Date for the attachment"))  
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Creation Date"), help_text=_("Date when the attachment was added"))  
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class LandmoduleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'landModule'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .audit import install_shutdown_hooks
+
+        install_shutdown_hooks()
@@ -0,0 +1,174 @@
+"""
+Batched, asynchronous AuditLog writer.
+
+Land changes are recorded as unsaved AuditLog rows. Rows recorded inside a transaction are queued
+when it commits (on_commit), so rolled back changes leave no audit trail. The queue is written with
+one bulk_create once it holds BATCH_SIZE rows, or FLUSH_INTERVAL seconds after its first row,
+whichever comes first. The queue is also flushed at interpreter exit and on celery worker shutdown,
+so a graceful shutdown loses nothing. Rows of lands deleted while the rows were queued are dropped,
+as the delete would have cascaded to them; a row that cannot be inserted never blocks the others.
+"""
+import atexit
+import contextvars
+import logging
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils.timezone import now
+from .models import AuditLog, Land
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 500,          # queued rows that trigger a flush
+    'FLUSH_INTERVAL': 2.0,      # seconds a row may wait in the queue; 0 flushes as soon as it is queued
+}
+
+_acting_user = contextvars.ContextVar("land_audit_user", default=None)
+
+
+def get_setting(name):
+    return getattr(settings, 'LAND_AUDIT', {}).get(name, DEFAULTS[name])
+
+
+@contextmanager
+def acting_user(user):
+    """
+    Attributes the land changes made inside the block to user.
+    """
+    token = _acting_user.set(str(user) if user is not None else None)
+    try:
+        yield
+    finally:
+        _acting_user.reset(token)
+
+
+def field_changes(old, new):
+    """
+    {"field": [old, new]} for every key whose value differs between the two snapshots.
+    """
+    return {name: [old.get(name), value] for name, value in new.items() if old.get(name) != value}
+
+
+def audit_entry(land_id, action, details, user=None):
+    """
+    Unsaved AuditLog row stamped with the current time and, by default, the acting user.
+    """
+    return AuditLog(
+        land_id=land_id,
+        action=action,
+        details=details,
+        user=user if user is not None else _acting_user.get(),
+        action_timestamp=now(),
+    )
+
+
+class AuditWriter:
+    def __init__(self, batch_size, flush_interval):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def record(self, land_id, action, details, user=None):
+        entry = audit_entry(land_id, action, details, user)
+        connection = connections[AuditLog.objects.db]
+        if connection.in_atomic_block:
+            transaction.on_commit(lambda: self.enqueue([entry]), using=connection.alias)
+        else:
+            self.enqueue([entry])
+
+    def enqueue(self, entries):
+        with self._lock:
+            self._queue.extend(entries)
+            size = len(self._queue)
+            if size < self.batch_size and self.flush_interval and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+        if size >= self.batch_size or not self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes every queued row with bulk_create and returns how many were written. Rows of deleted
+        lands are dropped; the others are put back if the database cannot be reached.
+        """
+        with self._lock:
+            entries, self._queue = self._queue, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not entries:
+            return 0
+        try:
+            entries = self._drop_deleted_lands(entries)
+            AuditLog.objects.bulk_create(entries, batch_size=self.batch_size)
+        except IntegrityError:
+            # A land was deleted after the check: find the offending rows one by one.
+            return self._write_each(entries)
+        except Exception:
+            logger.exception("Writing %d land audit rows failed; they stay queued", len(entries))
+            self._requeue(entries)
+            return 0
+        return len(entries)
+
+    def _drop_deleted_lands(self, entries):
+        land_ids = {entry.land_id for entry in entries}
+        existing = set(Land.objects.filter(pk__in=land_ids).values_list("pk", flat=True))
+        kept = [entry for entry in entries if entry.land_id in existing]
+        if len(kept) < len(entries):
+            logger.warning("Dropping %d land audit rows of deleted lands", len(entries) - len(kept))
+        return kept
+
+    def _write_each(self, entries):
+        written = 0
+        for index, entry in enumerate(entries):
+            entry.pk = None  # may hold an id from the rolled back bulk insert
+            try:
+                with transaction.atomic(using=AuditLog.objects.db):
+                    entry.save(force_insert=True)
+            except IntegrityError:
+                logger.warning("Dropping the %s audit row of land %s, which cannot be written", entry.action,
+                               entry.land_id, exc_info=True)
+            except Exception:
+                logger.exception("Writing %d land audit rows failed; they stay queued", len(entries) - index)
+                self._requeue(entries[index:])
+                break
+            else:
+                written += 1
+        return written
+
+    def _requeue(self, entries):
+        with self._lock:
+            self._queue[:0] = entries
+
+    def _flush_in_background(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        finally:
+            # The timer thread opened its own connection.
+            connections.close_all()
+
+    def pending(self):
+        with self._lock:
+            return len(self._queue)
+
+
+audit_writer = AuditWriter(get_setting('BATCH_SIZE'), get_setting('FLUSH_INTERVAL'))
+
+
+def flush_on_shutdown(**kwargs):
+    audit_writer.flush()
+
+
+def install_shutdown_hooks():
+    from celery.signals import worker_process_shutdown, worker_shutdown
+
+    atexit.register(audit_writer.flush)
+    worker_shutdown.connect(flush_on_shutdown, dispatch_uid="land_audit_flush_worker")
+    worker_process_shutdown.connect(flush_on_shutdown, dispatch_uid="land_audit_flush_process")
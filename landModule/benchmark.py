@@ -0,0 +1,57 @@
+"""
+Helpers for the land benchmark commands: synthetic data and query timing.
+"""
+import random
+import statistics
+import time
+from decimal import Decimal
+from django.db import transaction
+from .models import Land, LandStatus, LandType, Wilaya
+
+BENCHMARK_PREFIX = "BENCH-"
+STREETS = ("Olive", "Wheat", "River", "Cedar", "Harbor", "Mill", "Orchard", "Valley")
+
+
+def seed_lands(count, batch_size=10000, wilayas=48):
+    """
+    Inserts count synthetic lands whose international number starts with BENCHMARK_PREFIX.
+    """
+    wilaya_ids = []
+    for index in range(1, wilayas + 1):
+        wilaya, _ = Wilaya.objects.get_or_create(name=f"{BENCHMARK_PREFIX}Wilaya {index:02d}")
+        wilaya_ids.append(wilaya.pk)
+    start = Land.objects.filter(international_number__startswith=BENCHMARK_PREFIX).count()
+    rng = random.Random(start)
+    for offset in range(start, start + count, batch_size):
+        with transaction.atomic():
+            Land.objects.bulk_create([
+                Land(
+                    international_number=f"{BENCHMARK_PREFIX}{number:09d}",
+                    land_number=f"LN-{rng.randrange(10 ** 6):06d}",
+                    wilaya_id=rng.choice(wilaya_ids),
+                    address=f"{rng.randrange(1, 500)} {rng.choice(STREETS)} Road",
+                    price=Decimal(rng.randrange(10 ** 4, 10 ** 7)) / 100,
+                    land_type=rng.choice(LandType.values),
+                    area=Decimal(rng.randrange(10 ** 3, 10 ** 7)) / 100,
+                    status=rng.choice(LandStatus.values),
+                )
+                for number in range(offset, min(offset + batch_size, start + count))
+            ])
+
+
+def delete_seeded_lands():
+    Land.objects.filter(international_number__startswith=BENCHMARK_PREFIX).delete()
+    Wilaya.objects.filter(name__startswith=BENCHMARK_PREFIX, lands__isnull=True).delete()
+
+
+def time_query(run, repeat):
+    """
+    Median and worst wall time in milliseconds of run() over repeat calls, after one warm-up call.
+    """
+    run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
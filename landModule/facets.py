@@ -0,0 +1,141 @@
+"""
+Faceted land inventory: the counts of the filter sidebar in one conditional aggregate query.
+
+Each facet is counted with the selections of the other facets applied but not its own, so
+picking a status still shows how many lands every other status would give.
+"""
+import hashlib
+import json
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from .models import LandStatus, LandType, Wilaya
+
+FACETS = ("status", "land_type", "wilaya", "area")
+
+# (key, minimum area, maximum area) in sqm, minimum included, maximum excluded.
+AREA_BUCKETS = [
+    ("0-1000", None, Decimal("1000")),
+    ("1000-10000", Decimal("1000"), Decimal("10000")),
+    ("10000-100000", Decimal("10000"), Decimal("100000")),
+    ("100000+", Decimal("100000"), None),
+]
+AREA_KEYS = [key for key, _, _ in AREA_BUCKETS]
+
+
+def area_condition(key):
+    for bucket, minimum, maximum in AREA_BUCKETS:
+        if bucket == key:
+            condition = Q()
+            if minimum is not None:
+                condition &= Q(area__gte=minimum)
+            if maximum is not None:
+                condition &= Q(area__lt=maximum)
+            return condition
+    raise ValueError(f"Invalid area bucket: {key}")
+
+
+def clean_selection(selected):
+    """
+    Validates the selected facet values ({facet: [values]}); wilaya ids are turned into integers.
+    """
+    cleaned = {}
+    for facet, values in selected.items():
+        if facet not in FACETS:
+            raise ValueError(f"Invalid facet: {facet}")
+        if not values:
+            continue
+        if facet == "status":
+            invalid = [value for value in values if value not in LandStatus.values]
+        elif facet == "land_type":
+            invalid = [value for value in values if value not in LandType.values]
+        elif facet == "area":
+            invalid = [value for value in values if value not in AREA_KEYS]
+        else:
+            invalid = [value for value in values if not str(value).isdigit()]
+            values = [int(value) for value in values if str(value).isdigit()]
+        if invalid:
+            raise ValueError(f"Invalid {facet} values: {', '.join(map(str, invalid))}")
+        cleaned[facet] = sorted(set(values))
+    return cleaned
+
+
+def selection_condition(facet, values):
+    if facet == "status":
+        return Q(status__in=values)
+    if facet == "land_type":
+        return Q(land_type__in=values)
+    if facet == "wilaya":
+        return Q(wilaya_id__in=values)
+    condition = Q()
+    for key in values:
+        condition |= area_condition(key)
+    return condition
+
+
+def filter_selection(queryset, selected):
+    for facet, values in selected.items():
+        queryset = queryset.filter(selection_condition(facet, values))
+    return queryset
+
+
+def _count(*conditions):
+    condition = Q()
+    for part in conditions:
+        condition &= part
+    return Count("pk", filter=condition or None)
+
+
+def _others_condition(selected, facet):
+    condition = Q()
+    for other, values in selected.items():
+        if other != facet:
+            condition &= selection_condition(other, values)
+    return condition
+
+
+def compute_facet_counts(queryset, selected):
+    """
+    Total of the filtered lands plus the count of every facet value, in a single aggregate query.
+    """
+    options = {
+        "status": [(value, str(label), Q(status=value)) for value, label in LandStatus.choices],
+        "land_type": [(value, str(label), Q(land_type=value)) for value, label in LandType.choices],
+        "wilaya": [(pk, name, Q(wilaya_id=pk)) for pk, name in Wilaya.objects.values_list("pk", "name")],
+        "area": [(key, key, area_condition(key)) for key in AREA_KEYS],
+    }
+    aggregates = {"total": _count(*(selection_condition(facet, values) for facet, values in selected.items()))}
+    for facet, values in options.items():
+        others = _others_condition(selected, facet)
+        for index, (_, _, condition) in enumerate(values):
+            aggregates[f"{facet}_{index}"] = _count(others, condition)
+    counts = queryset.aggregate(**aggregates)
+    return {
+        "total": counts["total"],
+        "facets": {
+            facet: [
+                {"value": value, "label": label, "count": counts[f"{facet}_{index}"],
+                 "selected": value in selected.get(facet, ())}
+                for index, (value, label, _) in enumerate(values)
+            ]
+            for facet, values in options.items()
+        },
+    }
+
+
+def facet_counts(queryset, selected, cache_key_parts=None):
+    """
+    compute_facet_counts, cached for LAND_FACET_CACHE_TIMEOUT seconds when cache_key_parts
+    (whatever besides the selection shaped queryset, e.g. the search text) is given.
+    """
+    timeout = getattr(settings, "LAND_FACET_CACHE_TIMEOUT", 0)
+    if not timeout or cache_key_parts is None:
+        return compute_facet_counts(queryset, selected)
+    payload = json.dumps({"selected": selected, "parts": cache_key_parts}, sort_keys=True, default=str)
+    key = f"landModule:facets:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+    counts = cache.get(key)
+    if counts is None:
+        counts = compute_facet_counts(queryset, selected)
+        cache.set(key, counts, timeout)
+    return counts
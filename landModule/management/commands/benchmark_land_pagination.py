@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from landModule.benchmark import delete_seeded_lands, seed_lands, time_query
+from landModule.models import Land
+from landModule.pagination import ORDERING, encode_cursor, keyset_page
+from landModule.views import LIST_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Compares OFFSET and keyset (cursor) pagination of the land list at increasing depths."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help="Insert this many synthetic lands first (e.g. 1000000)")
+        parser.add_argument('--page-size', type=int, default=25)
+        parser.add_argument('--pages', type=int, nargs='*', default=[1, 10, 100, 1000, 10000, 40000],
+                            help="Page numbers to time")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per page")
+        parser.add_argument('--cleanup', action='store_true', help="Delete the synthetic lands afterwards")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.stdout.write(f"Seeding {options['seed']} lands...")
+            seed_lands(options['seed'])
+        total = Land.objects.count()
+        if not total:
+            raise CommandError("There are no lands to paginate; use --seed")
+        page_size = options['page_size']
+        lands = Land.objects.order_by(*ORDERING)
+        self.stdout.write(f"{total} lands, {page_size} per page")
+        self.stdout.write(f"{'page':>8}{'offset (ms)':>14}{'keyset (ms)':>14}")
+        for page in options['pages']:
+            offset = (page - 1) * page_size
+            if offset >= total:
+                self.stdout.write(f"{page:>8}  skipped: past the last page")
+                continue
+            cursor = None
+            if offset:
+                # The cursor a client would hold after reading the previous page.
+                created_at, pk = lands.values_list('created_at', 'id')[offset - 1]
+                cursor = encode_cursor(created_at, pk)
+
+            offset_ms, _ = time_query(lambda: list(lands.values(*LIST_FIELDS)[offset:offset + page_size]), options['repeat'])
+            keyset_ms, _ = time_query(lambda: keyset_page(lands, page_size, cursor, LIST_FIELDS), options['repeat'])
+            self.stdout.write(f"{page:>8}{offset_ms:>14.2f}{keyset_ms:>14.2f}")
+        if options['cleanup']:
+            delete_seeded_lands()
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from landModule.benchmark import delete_seeded_lands, seed_lands, time_query
+from landModule.models import Land
+
+DEFAULT_QUERIES = ["BENCH-0000123", "LN-4242", "Cedar", "Wilaya 07", "Road"]
+
+
+class Command(BaseCommand):
+    help = "Times typeahead land searches (first page of ranked results)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='*', default=DEFAULT_QUERIES, help="Search terms to time")
+        parser.add_argument('--seed', type=int, default=0, help="Insert this many synthetic lands first")
+        parser.add_argument('--limit', type=int, default=10, help="Results per typeahead request")
+        parser.add_argument('--repeat', type=int, default=20, help="Runs per query")
+        parser.add_argument('--cleanup', action='store_true', help="Delete the synthetic lands afterwards")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.stdout.write(f"Seeding {options['seed']} lands...")
+            seed_lands(options['seed'])
+        self.stdout.write(f"{Land.objects.count()} lands")
+        self.stdout.write(f"{'query':<20}{'hits':>8}{'median (ms)':>14}{'max (ms)':>12}")
+        for query in options['queries']:
+            def run():
+                return list(Land.objects.search(query).values_list('pk', flat=True)[:options['limit']])
+            hits = len(run())
+            median, worst = time_query(run, options['repeat'])
+            self.stdout.write(f"{query:<20}{hits:>8}{median:>14.2f}{worst:>12.2f}")
+        if options['cleanup']:
+            delete_seeded_lands()
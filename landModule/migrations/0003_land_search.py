@@ -0,0 +1,105 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+TRIGRAM_INDEXES = [
+    ("land", "international_number", "land_intl_number_trgm_idx"),
+    ("land", "land_number", "land_number_trgm_idx"),
+    ("land", "address", "land_address_trgm_idx"),
+    ("land", "description", "land_description_trgm_idx"),
+    ("wilaya", "name", "wilaya_name_trgm_idx"),
+]
+
+# The trigram tokenizer makes MATCH a case-insensitive substring search, like icontains.
+SQLITE_FTS_SETUP = [
+    """
+    CREATE VIRTUAL TABLE "landModule_land_fts" USING fts5(
+        land_id UNINDEXED, international_number, land_number, address, description, wilaya_name,
+        tokenize = 'trigram'
+    )
+    """,
+    """
+    INSERT INTO "landModule_land_fts" (land_id, international_number, land_number, address, description, wilaya_name)
+    SELECT l.id, l.international_number, l.land_number, l.address, COALESCE(l.description, ''), w.name
+    FROM "landModule_land" l JOIN "landModule_wilaya" w ON w.id = l.wilaya_id
+    """,
+    """
+    CREATE TRIGGER "landModule_land_fts_insert" AFTER INSERT ON "landModule_land" BEGIN
+        INSERT INTO "landModule_land_fts" (land_id, international_number, land_number, address, description, wilaya_name)
+        VALUES (NEW.id, NEW.international_number, NEW.land_number, NEW.address, COALESCE(NEW.description, ''),
+                (SELECT name FROM "landModule_wilaya" WHERE id = NEW.wilaya_id));
+    END
+    """,
+    """
+    CREATE TRIGGER "landModule_land_fts_update" AFTER UPDATE OF international_number, land_number, address, description, wilaya_id
+    ON "landModule_land" BEGIN
+        DELETE FROM "landModule_land_fts" WHERE land_id = OLD.id;
+        INSERT INTO "landModule_land_fts" (land_id, international_number, land_number, address, description, wilaya_name)
+        VALUES (NEW.id, NEW.international_number, NEW.land_number, NEW.address, COALESCE(NEW.description, ''),
+                (SELECT name FROM "landModule_wilaya" WHERE id = NEW.wilaya_id));
+    END
+    """,
+    """
+    CREATE TRIGGER "landModule_land_fts_delete" AFTER DELETE ON "landModule_land" BEGIN
+        DELETE FROM "landModule_land_fts" WHERE land_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER "landModule_wilaya_fts_update" AFTER UPDATE OF name ON "landModule_wilaya" BEGIN
+        UPDATE "landModule_land_fts" SET wilaya_name = NEW.name
+        WHERE land_id IN (SELECT id FROM "landModule_land" WHERE wilaya_id = NEW.id);
+    END
+    """,
+]
+
+SQLITE_FTS_TEARDOWN = [
+    'DROP TRIGGER IF EXISTS "landModule_wilaya_fts_update"',
+    'DROP TRIGGER IF EXISTS "landModule_land_fts_delete"',
+    'DROP TRIGGER IF EXISTS "landModule_land_fts_update"',
+    'DROP TRIGGER IF EXISTS "landModule_land_fts_insert"',
+    'DROP TABLE IF EXISTS "landModule_land_fts"',
+]
+
+
+def trigram_indexes(apps):
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+    from django.db.models.functions import Upper
+
+    for model_name, field, name in TRIGRAM_INDEXES:
+        yield apps.get_model("landModule", model_name), GinIndex(OpClass(Upper(field), name="gin_trgm_ops"), name=name)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for model, index in trigram_indexes(apps):
+            schema_editor.add_index(model, index)
+    elif vendor == "sqlite":
+        try:
+            for statement in SQLITE_FTS_SETUP:
+                schema_editor.execute(statement)
+        except OperationalError:
+            # SQLite without FTS5 or the trigram tokenizer (< 3.34): search falls back to icontains.
+            for statement in SQLITE_FTS_TEARDOWN:
+                schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for model, index in trigram_indexes(apps):
+            schema_editor.remove_index(model, index)
+    elif vendor == "sqlite":
+        for statement in SQLITE_FTS_TEARDOWN:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landModule', '0002_alter_land_land_number'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
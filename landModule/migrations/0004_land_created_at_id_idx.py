@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landModule', '0003_land_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='land',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Land', 'verbose_name_plural': 'Lands'},
+        ),
+        migrations.AddIndex(
+            model_name='land',
+            index=models.Index(fields=['-created_at', '-id'], name='land_created_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:11
+
+import json
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def wrap_text_details(apps, schema_editor):
+    # Free-text details become {"message": text} so every row is valid JSON before the column type changes.
+    AuditLog = apps.get_model('landModule', 'AuditLog')
+    for pk, details in AuditLog.objects.values_list('pk', 'details').iterator():
+        AuditLog.objects.filter(pk=pk).update(details=json.dumps({"message": details}))
+
+
+def unwrap_text_details(apps, schema_editor):
+    AuditLog = apps.get_model('landModule', 'AuditLog')
+    for pk, details in AuditLog.objects.values_list('pk', 'details').iterator():
+        data = json.loads(details)
+        if isinstance(data, dict) and list(data) == ["message"]:
+            AuditLog.objects.filter(pk=pk).update(details=data["message"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landModule', '0004_land_created_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(wrap_text_details, unwrap_text_details),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action_timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='details',
+            field=models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['land', 'action_timestamp'], name='auditlog_land_timestamp_idx'),
+        ),
+    ]
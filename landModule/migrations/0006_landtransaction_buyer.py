@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landModule', '0005_auditlog_json_details'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='landtransaction',
+            name='buyer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='land_purchases', to=settings.AUTH_USER_MODEL, verbose_name='Buyer'),
+        ),
+        migrations.AlterField(
+            model_name='land',
+            name='status',
+            field=models.CharField(choices=[('available', 'Available'), ('plowed', 'Plowed'), ('rented', 'Rented'), ('cultivated', 'Cultivated'), ('sold', 'Sold')], default='available', max_length=20, verbose_name='Land Status'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:18
+
+import mediaModule.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landModule', '0006_landtransaction_buyer'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='landdocument',
+            name='file',
+            field=models.FileField(storage=mediaModule.storage.document_storage, upload_to='land_documents/', verbose_name='Document File'),
+        ),
+    ]
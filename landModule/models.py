@@ -1,8 +1,10 @@
 from django.db import models
 #from django.contrib.gis.db.models import PointField  # For geolocation
 from django.utils.translation import gettext_lazy as _
+from mediaModule.storage import document_storage
 from django.utils.timezone import now
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 import uuid
 User = get_user_model()
 
@@ -19,6 +21,7 @@ class LandStatus(models.TextChoices):
     PLOWED = "plowed", _("Plowed")
     RENTED = "rented", _("Rented")
     CULTIVATED = "cultivated", _("Cultivated")
+    SOLD = "sold", _("Sold")
 
 
 
@@ -35,6 +38,55 @@ class Wilaya(models.Model):
 
 
 
+class LandQuerySet(models.QuerySet):
+    def by_wilaya(self, wilaya_id):
+        return self.filter(wilaya_id=wilaya_id)
+
+    def by_status(self, status):
+        return self.filter(status=status)
+
+    def search(self, query):
+        """ Indexed search over the numbers, address, description and wilaya name, best matches first """
+        from .search import search_lands
+        return search_lands(self, query)
+
+
+
+class LandManager(models.Manager):
+    def get_queryset(self):
+        return LandQuerySet(self.model, using=self._db)
+
+    def available_lands(self):
+        return self.get_queryset().by_status(LandStatus.AVAILABLE)
+
+    def plowed_lands(self):
+        return self.get_queryset().by_status(LandStatus.PLOWED)
+
+    def rented_lands(self):
+        return self.get_queryset().by_status(LandStatus.RENTED)
+
+    def search(self, query):
+        return self.get_queryset().search(query)
+
+    def filter_by_state(self, state_name):
+        return self.filter(state__name=state_name)
+
+    def filter_by_land_type(self, land_type):
+        return self.filter(land_type=land_type)
+
+    def filter_by_area(self, min_area=None, max_area=None):
+        query = self.all()
+        if min_area:
+            query = query.filter(area__gte=min_area)
+        if max_area:
+            query = query.filter(area__lte=max_area)
+        return query
+
+    def filter_by_transaction_date(self, start_date, end_date):
+        return self.filter(transactions__transaction_date__range=[start_date, end_date])
+
+
+
 class Land(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)  # Unique ID
     international_number = models.CharField(max_length=100, unique=True, verbose_name=_("International Land Number"))
@@ -69,11 +121,14 @@ class Land(models.Model):
         verbose_name="Previous Owner"
     )
     purchase_date = models.DateTimeField(default=now, verbose_name="Purchase Date")
+
+    objects = LandManager()
+
     def mark_as_sold(self, buyer):
         """ Marks the land as sold and updates ownership """
         self.previous_owner = self.current_owner   
         self.current_owner = buyer   
-        self.status = "Sold"
+        self.status = LandStatus.SOLD
         self.save()
     class Meta:
         verbose_name = _("Land")
@@ -82,8 +137,10 @@ class Land(models.Model):
             models.Index(fields=["international_number"]),
             models.Index(fields=["land_number"]),
             models.Index(fields=["wilaya"]),
+            # Supports the default ordering and keyset pagination (see landModule.pagination).
+            models.Index(fields=["-created_at", "-id"], name="land_created_at_id_idx"),
         ]
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
 
     def __str__(self):
         return f"{self.land_number} - {self.wilaya.name}"
@@ -100,7 +157,7 @@ class Land(models.Model):
 class LandDocument(models.Model):
     land = models.ForeignKey(Land, on_delete=models.CASCADE, related_name="documents", verbose_name=_("Land"))
     title = models.CharField(max_length=255, verbose_name=_("Document Title"))
-    file = models.FileField(upload_to="land_documents/", verbose_name=_("Document File"))
+    file = models.FileField(upload_to="land_documents/", storage=document_storage, verbose_name=_("Document File"))
     uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Uploaded At"))
 
     class Meta:
@@ -129,6 +186,7 @@ class LandTransaction(models.Model):
     land = models.ForeignKey(Land, on_delete=models.CASCADE, related_name='transactions', verbose_name=_("Land"))
     transaction_date = models.DateTimeField(auto_now_add=True, verbose_name=_("Transaction Date"))
     price = models.DecimalField(max_digits=15, decimal_places=2, verbose_name=_("Price (USD)"))
+    buyer = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="land_purchases", verbose_name=_("Buyer"))
     buyer_name = models.CharField(max_length=255, verbose_name=_("Buyer Name"), blank=True, null=True)
     buyer_phone = models.CharField(max_length=255, verbose_name=_("Buyer Phone") , blank=True, null=True)
     buyer_email = models.EmailField(max_length=255, verbose_name=_("Buyer Email") , blank=True, null=True)
@@ -140,10 +198,11 @@ class LandTransaction(models.Model):
         default="Pending"
     )  
     def complete_purchase(self):
-        """ Mark purchase as completed and update land status """
-        self.payment_status = "Completed"
-        self.land.mark_as_sold(self.buyer)
-        self.save() 
+        """ Mark purchase as completed and update land status, with the same locking as batch settlement """
+        from .services import settle_land_transactions
+        settled = settle_land_transactions(transaction_ids=[self.pk])["settled"]
+        self.refresh_from_db(fields=["payment_status"])
+        return self.pk in settled
     class Meta:
         verbose_name = _('Land Transaction')
         verbose_name_plural = _('Land Transactions')
@@ -161,56 +220,18 @@ class AuditLog(models.Model):
     
     land = models.ForeignKey(Land, on_delete=models.CASCADE)
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
-    action_timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the batched writer inserts it (see landModule.audit).
+    action_timestamp = models.DateTimeField(default=now)
     user = models.CharField(max_length=255, null=True, blank=True)
-    details = models.TextField()
+    # Changed fields as {"field": [old value, new value]}.
+    details = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
 
     class Meta:
         verbose_name = _('Audit Log')
         verbose_name_plural = _('Audit Logs')
+        indexes = [
+            models.Index(fields=["land", "action_timestamp"], name="auditlog_land_timestamp_idx"),
+        ]
 
     def __str__(self):
         return f"Audit Log for {self.land}"
-
-class LandQuerySet(models.QuerySet):
-    def by_wilaya(self, wilaya_id):
-        return self.filter(wilaya_id=wilaya_id)
-
-    def by_status(self, status):
-        return self.filter(status=status)
-
-    def search(self, query):
-        return self.filter(models.Q(international_number__icontains=query) | models.Q(land_number__icontains=query))
-
-
-
-class LandManager(models.Manager):
-    def get_queryset(self):
-        return LandQuerySet(self.model, using=self._db)
-
-    def available_lands(self):
-        return self.get_queryset().by_status(LandStatus.AVAILABLE)
-
-    def plowed_lands(self):
-        return self.get_queryset().by_status(LandStatus.PLOWED)
-
-    def rented_lands(self):
-        return self.get_queryset().by_status(LandStatus.RENTED)
-    def filter_by_state(self, state_name):
-        return self.filter(state__name=state_name)
-
-    def filter_by_land_type(self, land_type):
-        return self.filter(land_type=land_type)
-
-    def filter_by_area(self, min_area=None, max_area=None):
-        query = self.all()
-        if min_area:
-            query = query.filter(area__gte=min_area)
-        if max_area:
-            query = query.filter(area__lte=max_area)
-        return query
-
-    def filter_by_transaction_date(self, start_date, end_date):
-        return self.filter(transactions__transaction_date__range=[start_date, end_date])
-
-Land.objects = LandManager()
@@ -0,0 +1,52 @@
+"""
+Keyset (cursor) pagination of lands in their default order, newest first.
+
+A page starts right after the (created_at, id) of the previous page's last land, so the database
+seeks into the (created_at, id) index instead of counting and skipping OFFSET rows:
+deep pages cost the same as the first one.
+"""
+import base64
+import datetime
+import json
+import uuid
+from django.db.models import Q
+
+ORDERING = ("-created_at", "-id")
+
+
+def encode_cursor(created_at, pk):
+    payload = json.dumps([created_at.isoformat(), str(pk)])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.datetime.fromisoformat(created_at), uuid.UUID(pk)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+def after_cursor(queryset, cursor):
+    """
+    Lands that come after the cursor in ORDERING.
+    The leading created_at <= bound gives the database an index range to scan from.
+    """
+    created_at, pk = decode_cursor(cursor)
+    return queryset.filter(Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(id__lt=pk)))
+
+
+def keyset_page(queryset, page_size, cursor=None, fields=()):
+    """
+    One page of the queryset as values() rows, and the cursor of the next page (None on the last page).
+    """
+    queryset = queryset.order_by(*ORDERING)
+    if cursor:
+        queryset = after_cursor(queryset, cursor)
+    fields = list(dict.fromkeys([*fields, "created_at", "id"]))
+    rows = list(queryset.values(*fields)[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
@@ -0,0 +1,81 @@
+"""
+Land search backends.
+
+PostgreSQL: icontains compiles to UPPER(column::text) LIKE UPPER('%q%'), which the pg_trgm GIN indexes
+on UPPER(column) created by migration 0003 can serve, so matching never scans the whole table.
+SQLite: an FTS5 table using the trigram tokenizer (substring matching), kept in sync by triggers.
+Queries shorter than a trigram, or databases without the FTS table, fall back to plain icontains.
+"""
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+SEARCH_FIELDS = ("international_number", "land_number", "address", "description")
+NUMBER_FIELDS = ("international_number", "land_number")
+FTS_TABLE = "landModule_land_fts"
+# Trigram indexes and the FTS5 trigram tokenizer only help from three characters on.
+MIN_INDEXED_LENGTH = 3
+
+_fts_tables = {}
+
+
+def has_fts_table(using):
+    """
+    Whether the FTS5 table exists on this SQLite database (it needs SQLite 3.34+ built with FTS5).
+    """
+    connection = connections[using]
+    key = (using, str(connection.settings_dict["NAME"]))
+    if key not in _fts_tables:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_tables[key] = cursor.fetchone() is not None
+    return _fts_tables[key]
+
+
+def fts_phrase(query):
+    # A quoted FTS5 phrase: the query is matched as a substring, never parsed as FTS syntax.
+    return '"%s"' % query.replace('"', '""')
+
+
+def match_condition(queryset, query):
+    from .models import Wilaya
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite" and len(query) >= MIN_INDEXED_LENGTH and has_fts_table(queryset.db):
+        return Q(pk__in=RawSQL(f'SELECT land_id FROM "{FTS_TABLE}" WHERE "{FTS_TABLE}" MATCH %s', [fts_phrase(query)]))
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f"{field}__icontains": query})
+    # Matching wilayas are resolved in a subquery so every condition stays on the land table
+    # and PostgreSQL can combine the index scans with a BitmapOr.
+    return condition | Q(wilaya__in=Wilaya.objects.filter(name__icontains=query).values("pk"))
+
+
+def rank_expression(query):
+    """
+    Exact land numbers first, then numbers starting with the query, then any other match.
+    """
+    whens = [When(**{f"{field}__iexact": query}, then=Value(3)) for field in NUMBER_FIELDS]
+    whens += [When(**{f"{field}__istartswith": query}, then=Value(2)) for field in NUMBER_FIELDS]
+    return Case(*whens, default=Value(1), output_field=IntegerField())
+
+
+def search_lands(queryset, query):
+    """
+    Lands matching query in their numbers, address, description or wilaya name, best matches first.
+    The rank is exposed as the search_rank annotation.
+    """
+    query = (query or "").strip()
+    if not query:
+        return queryset
+    queryset = queryset.filter(match_condition(queryset, query)).annotate(search_rank=rank_expression(query))
+    if connections[queryset.db].vendor == "postgresql":
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        from django.db.models.functions import Greatest
+
+        queryset = queryset.annotate(search_similarity=Greatest(
+            *(TrigramWordSimilarity(query, field) for field in NUMBER_FIELDS),
+            TrigramWordSimilarity(query, "address"),
+        ))
+        return queryset.order_by("-search_rank", "-search_similarity", "international_number")
+    return queryset.order_by("-search_rank", "international_number")
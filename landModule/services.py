@@ -0,0 +1,70 @@
+"""
+Batch settlement of pending land transactions.
+
+Each batch runs in one database transaction: the pending transactions and their lands are locked
+with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers each take rows nobody else holds,
+and ownership, payment status and audit rows are written with bulk queries.
+A land is only sold once: pending transactions for a land that is already sold are not picked up,
+and those that lose to an earlier transaction for the same land are reported as conflicts.
+Both stay pending until someone reviews them.
+"""
+from django.db import transaction
+from django.utils.timezone import now
+from .audit import audit_entry, field_changes
+from .models import AuditLog, Land, LandStatus, LandTransaction
+
+PENDING = "Pending"
+COMPLETED = "Completed"
+OWNERSHIP_FIELDS = ("previous_owner_id", "current_owner_id", "status")
+
+
+def settle_land_transactions(transaction_ids=None, limit=100, user=None):
+    """
+    Settles up to limit pending transactions (optionally only among transaction_ids), oldest first.
+
+    Returns {"settled": [...], "conflicts": [...]} transaction ids. Transactions locked by another
+    worker are left out of both lists; they are settled by whoever holds them.
+    """
+    with transaction.atomic():
+        pending = (
+            LandTransaction.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(payment_status=PENDING)
+            .exclude(land__status=LandStatus.SOLD)
+        )
+        if transaction_ids is not None:
+            pending = pending.filter(pk__in=transaction_ids)
+        claimed = list(pending.order_by("transaction_date", "pk")[:limit])
+        if not claimed:
+            return {"settled": [], "conflicts": []}
+
+        lands = {
+            land.pk: land
+            for land in Land.objects.select_for_update(skip_locked=True)
+            .filter(pk__in={purchase.land_id for purchase in claimed})
+            .only("id", "previous_owner", "current_owner", "status")
+        }
+        settled, conflicts, sold, entries = [], [], [], []
+        for purchase in claimed:
+            land = lands.get(purchase.land_id)
+            if land is None:
+                # Another worker is settling this land; it gets another chance in a later batch.
+                continue
+            if land.status == LandStatus.SOLD:
+                conflicts.append(purchase.pk)
+                continue
+            before = {name: getattr(land, name) for name in OWNERSHIP_FIELDS}
+            land.previous_owner_id = land.current_owner_id
+            land.current_owner_id = purchase.buyer_id
+            land.status = LandStatus.SOLD
+            land.updated_at = now()
+            after = {name: getattr(land, name) for name in OWNERSHIP_FIELDS}
+            details = {**field_changes(before, after), "transaction": purchase.pk}
+            entries.append(audit_entry(land.pk, "STATUS_CHANGE", details, user))
+            settled.append(purchase.pk)
+            sold.append(land)
+
+        if sold:
+            Land.objects.bulk_update(sold, ["previous_owner", "current_owner", "status", "updated_at"])
+            LandTransaction.objects.filter(pk__in=settled).update(payment_status=COMPLETED)
+            AuditLog.objects.bulk_create(entries)
+    return {"settled": settled, "conflicts": conflicts}
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+from .audit import audit_writer, field_changes
+from .models import Land
+
+# Bookkeeping fields that change on every save and say nothing about the land itself.
+UNAUDITED_FIELDS = {"id", "created_at", "updated_at"}
+
+
+def audited_values(land):
+    # Only loaded values: reading a deferred field would cost a query per instance.
+    return {
+        field.attname: land.__dict__[field.attname]
+        for field in Land._meta.concrete_fields
+        if field.name not in UNAUDITED_FIELDS and field.attname in land.__dict__
+    }
+
+
+@receiver(post_init, sender=Land)
+def remember_land_values(sender, instance, **kwargs):
+    instance._audit_snapshot = audited_values(instance)
+
+
+@receiver(post_save, sender=Land)
+def audit_land_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    values = audited_values(instance)
+    if created:
+        audit_writer.record(instance.pk, "CREATE", field_changes({}, values))
+    else:
+        previous = getattr(instance, "_audit_snapshot", {})
+        changes = field_changes(previous, {name: value for name, value in values.items() if name in previous})
+        if changes:
+            audit_writer.record(instance.pk, "STATUS_CHANGE" if "status" in changes else "UPDATE", changes)
+    instance._audit_snapshot = values
@@ -1,3 +1,381 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from celery.signals import worker_shutdown
+from django.core.cache import cache
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+from accountModule.models import CustomUser
+from .models import AuditLog, Land, LandTransaction, Wilaya
+from .audit import AuditWriter, audit_writer
+from .facets import clean_selection, compute_facet_counts, facet_counts
+from .pagination import decode_cursor, encode_cursor, keyset_page
+from .services import settle_land_transactions
 
-# Create your tests here.
+
+class LandSearchTests(TestCase):
+    def setUp(self):
+        self.ankara = Wilaya.objects.create(name="Ankara")
+        self.izmir = Wilaya.objects.create(name="Izmir")
+        self.exact = self.add_land("TR-100", "A-7", self.izmir, "Olive Road 3")
+        self.prefix = self.add_land("TR-1001", "A-8", self.izmir, "Harbor Street")
+        self.address = self.add_land("DE-55", "B-1", self.izmir, "Near TR-100 junction")
+        self.other = self.add_land("FR-9", "C-3", self.ankara, "Wheat Field", description="Irrigated plot")
+
+    def add_land(self, number, land_number, wilaya, address, description=None):
+        return Land.objects.create(
+            international_number=number, land_number=land_number, wilaya=wilaya, address=address,
+            description=description, price=Decimal("1000.00"), land_type="agricultural", area=Decimal("50.00"),
+        )
+
+    def test_ranks_exact_then_prefix_then_other_matches(self):
+        results = list(Land.objects.search("tr-100"))
+        self.assertEqual(results, [self.exact, self.prefix, self.address])
+
+    def test_matches_description_and_wilaya_name(self):
+        self.assertEqual(list(Land.objects.search("irrigat")), [self.other])
+        self.assertEqual(list(Land.objects.search("ankar")), [self.other])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.other.address = "Cedar Lane"
+        self.other.save()
+        self.ankara.name = "Bursa"
+        self.ankara.save()
+        self.assertEqual(list(Land.objects.search("cedar")), [self.other])
+        self.assertEqual(list(Land.objects.search("bursa")), [self.other])
+        self.assertFalse(Land.objects.search("ankara").exists())
+
+        self.other.delete()
+        self.assertFalse(Land.objects.search("cedar").exists())
+
+    def test_short_and_empty_queries(self):
+        self.assertEqual(set(Land.objects.search("a-")), {self.exact, self.prefix})
+        self.assertEqual(Land.objects.search("  ").count(), 4)
+
+
+class LandFacetTests(TestCase):
+    def setUp(self):
+        self.ankara = Wilaya.objects.create(name="Ankara")
+        self.izmir = Wilaya.objects.create(name="Izmir")
+        self.add_land("F-1", "available", "agricultural", self.ankara, "500.00")
+        self.add_land("F-2", "available", "residential", self.ankara, "1000.00")
+        self.add_land("F-3", "rented", "agricultural", self.izmir, "9999.99")
+        self.add_land("F-4", "sold", "agricultural", self.izmir, "100000.00")
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create_user(username="surveyor", password="secret"))
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def add_land(self, number, status, land_type, wilaya, area):
+        return Land.objects.create(
+            international_number=number, wilaya=wilaya, address="Field", price=Decimal("1000.00"),
+            status=status, land_type=land_type, area=Decimal(area),
+        )
+
+    def counts(self, result, facet):
+        return {option["value"]: option["count"] for option in result["facets"][facet] if option["count"]}
+
+    def test_each_facet_ignores_its_own_selection(self):
+        selected = clean_selection({"status": ["available"], "land_type": ["agricultural"]})
+        with self.assertNumQueries(2):
+            result = compute_facet_counts(Land.objects.all(), selected)
+
+        self.assertEqual(result["total"], 1)
+        # Status counts only apply the land type filter, land type counts only the status filter.
+        self.assertEqual(self.counts(result, "status"), {"available": 1, "rented": 1, "sold": 1})
+        self.assertEqual(self.counts(result, "land_type"), {"agricultural": 1, "residential": 1})
+        self.assertEqual(self.counts(result, "wilaya"), {self.ankara.pk: 1})
+        self.assertEqual(self.counts(result, "area"), {"0-1000": 1})
+        selected_statuses = [option["value"] for option in result["facets"]["status"] if option["selected"]]
+        self.assertEqual(selected_statuses, ["available"])
+
+    def test_area_buckets_include_their_minimum(self):
+        result = compute_facet_counts(Land.objects.all(), {})
+        self.assertEqual(self.counts(result, "area"), {"0-1000": 1, "1000-10000": 2, "100000+": 1})
+
+        result = compute_facet_counts(Land.objects.all(), clean_selection({"area": ["1000-10000", "100000+"]}))
+        self.assertEqual(result["total"], 3)
+        self.assertEqual(self.counts(result, "area"), {"0-1000": 1, "1000-10000": 2, "100000+": 1})
+        self.assertEqual(self.counts(result, "status"), {"available": 1, "rented": 1, "sold": 1})
+
+    @override_settings(LAND_FACET_CACHE_TIMEOUT=30)
+    def test_cache_key_covers_selection_and_parts(self):
+        lands = Land.objects.all()
+        first = facet_counts(lands, clean_selection({"status": ["rented", "available"]}), {"q": ""})
+        with self.assertNumQueries(0):
+            again = facet_counts(lands, clean_selection({"status": ["available", "rented", "available"]}), {"q": ""})
+        self.assertEqual(again, first)
+
+        with self.assertNumQueries(2):
+            facet_counts(lands, clean_selection({"status": ["available"]}), {"q": ""})
+        with self.assertNumQueries(2):
+            facet_counts(lands, clean_selection({"status": ["rented", "available"]}), {"q": "olive"})
+
+    @override_settings(LAND_FACET_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        lands = Land.objects.all()
+        facet_counts(lands, {}, {"q": ""})
+        with self.assertNumQueries(2):
+            facet_counts(lands, {}, {"q": ""})
+
+    def test_search_endpoint(self):
+        response = self.client.get(reverse("land_faceted_search"), {"land_type": "agricultural", "page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["count"], len(response.data["results"])), (3, 2))
+        self.assertEqual(self.counts(response.data, "land_type"), {"agricultural": 3, "residential": 1})
+
+    def test_invalid_facet_values_are_rejected(self):
+        url = reverse("land_faceted_search")
+        for params in ({"status": "bogus"}, {"area": "5-10"}, {"wilaya": "ankara"}, {"page": "0"}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("error", response.data)
+
+
+class LandKeysetPaginationTests(TestCase):
+    def setUp(self):
+        wilaya = Wilaya.objects.create(name="Sivas")
+        self.lands = [
+            Land.objects.create(
+                international_number=f"SV-{index}", wilaya=wilaya, address="Field", price=Decimal("100.00"),
+                land_type="agricultural", area=Decimal("10.00"),
+            )
+            for index in range(7)
+        ]
+        # Five lands share one created_at, so only the id tells them apart.
+        stamp = now()
+        Land.objects.filter(pk__in=[land.pk for land in self.lands[:5]]).update(created_at=stamp)
+        Land.objects.filter(pk=self.lands[5].pk).update(created_at=stamp + timedelta(seconds=1))
+        Land.objects.filter(pk=self.lands[6].pk).update(created_at=stamp - timedelta(seconds=1))
+        self.expected = list(Land.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create_user(username="surveyor", password="secret"))
+
+    def walk(self, page_size):
+        pages, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(Land.objects.all(), page_size, cursor)
+            pages.append([row["id"] for row in rows])
+            if cursor is None:
+                return pages
+
+    def test_pages_through_ties_without_skips_or_repeats(self):
+        for page_size in (1, 2, 3):
+            pages = self.walk(page_size)
+            self.assertEqual([pk for page in pages for pk in page], self.expected, page_size)
+            self.assertTrue(all(len(page) == page_size for page in pages[:-1]))
+
+    def test_last_page_has_no_next_cursor(self):
+        rows, cursor = keyset_page(Land.objects.all(), 7)
+        self.assertEqual((len(rows), cursor), (7, None))
+        rows, cursor = keyset_page(Land.objects.all(), 6)
+        self.assertIsNotNone(cursor)
+        rows, cursor = keyset_page(Land.objects.all(), 6, cursor)
+        self.assertEqual(([row["id"] for row in rows], cursor), (self.expected[-1:], None))
+
+    def test_cursor_round_trip(self):
+        land = Land.objects.get(pk=self.lands[0].pk)
+        self.assertEqual(decode_cursor(encode_cursor(land.created_at, land.pk)), (land.created_at, land.pk))
+
+    def test_list_endpoint_follows_next_cursor(self):
+        url = reverse("land_list")
+        seen, params = [], {"page_size": 3}
+        while True:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row["id"] for row in response.data["results"])
+            if response.data["next_cursor"] is None:
+                break
+            params["cursor"] = response.data["next_cursor"]
+        self.assertEqual(seen, self.expected)
+
+    def test_malformed_cursor_is_rejected(self):
+        url = reverse("land_list")
+        for cursor in ("garbage", encode_cursor(now(), "not-a-uuid"), "WyJ4Il0="):
+            response = self.client.get(url, {"cursor": cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertEqual(response.data, {"error": "Invalid cursor"})
+
+
+class SettlementTests(TransactionTestCase):
+    def setUp(self):
+        self.wilaya = Wilaya.objects.create(name="Konya")
+        self.seller = CustomUser.objects.create_user(username="seller", password="secret")
+        self.buyers = [CustomUser.objects.create_user(username=f"buyer{index}", password="secret") for index in range(3)]
+        self.lands = [
+            Land.objects.create(
+                international_number=f"KN-{index}", wilaya=self.wilaya, address="Field", price=Decimal("500.00"),
+                land_type="agricultural", area=Decimal("10.00"), current_owner=self.seller,
+            )
+            for index in range(20)
+        ]
+        # Write the creation audit rows now so no background flush runs during or after the test.
+        audit_writer.flush()
+        self.addCleanup(audit_writer.flush)
+
+    def add_purchase(self, land, buyer):
+        return LandTransaction.objects.create(land=land, buyer=buyer, price=Decimal("500.00"))
+
+    def test_complete_purchase_transfers_ownership(self):
+        purchase = self.add_purchase(self.lands[0], self.buyers[0])
+        self.assertTrue(purchase.complete_purchase())
+
+        land = Land.objects.get(pk=self.lands[0].pk)
+        self.assertEqual((land.current_owner, land.previous_owner, land.status), (self.buyers[0], self.seller, "sold"))
+        self.assertEqual(purchase.payment_status, "Completed")
+        log = AuditLog.objects.get(land=land, action="STATUS_CHANGE")
+        self.assertEqual(log.details["current_owner_id"], [self.seller.pk, self.buyers[0].pk])
+        self.assertFalse(purchase.complete_purchase())
+
+    def test_competing_purchases_sell_a_land_once(self):
+        first = self.add_purchase(self.lands[0], self.buyers[0])
+        second = self.add_purchase(self.lands[0], self.buyers[1])
+
+        result = settle_land_transactions()
+        self.assertEqual(result, {"settled": [first.pk], "conflicts": [second.pk]})
+        self.assertEqual(Land.objects.get(pk=self.lands[0].pk).current_owner, self.buyers[0])
+        self.assertEqual(settle_land_transactions(), {"settled": [], "conflicts": []})
+        self.assertEqual(LandTransaction.objects.get(pk=second.pk).payment_status, "Pending")
+
+    def test_parallel_settlements(self):
+        purchases = [self.add_purchase(land, buyer) for land in self.lands for buyer in self.buyers]
+        results, errors = [], []
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        result = settle_land_transactions(limit=7)
+                    except OperationalError:
+                        # SQLite reports a concurrent writer as a lock error instead of waiting.
+                        time.sleep(0.01)
+                        continue
+                    if not result["settled"]:
+                        break
+                    results.append(result)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        settled = [pk for result in results for pk in result["settled"]]
+        self.assertEqual(len(settled), len(set(settled)))
+        self.assertEqual(len(settled), len(self.lands))
+        self.assertEqual(LandTransaction.objects.filter(payment_status="Completed").count(), len(self.lands))
+        self.assertEqual(Land.objects.filter(status="sold").count(), len(self.lands))
+        self.assertEqual(AuditLog.objects.filter(action="STATUS_CHANGE").count(), len(self.lands))
+        # Each land went to the buyer of its earliest transaction.
+        for land in self.lands:
+            completed = LandTransaction.objects.get(land=land, payment_status="Completed")
+            self.assertEqual(completed, min((p for p in purchases if p.land_id == land.pk), key=lambda p: (p.transaction_date, p.pk)))
+            self.assertEqual(Land.objects.get(pk=land.pk).current_owner_id, completed.buyer_id)
+
+
+class AuditWriterTests(TransactionTestCase):
+    def setUp(self):
+        wilaya = Wilaya.objects.create(name="Mersin")
+        self.lands = [
+            Land.objects.create(
+                international_number=f"MR-{index}", wilaya=wilaya, address="Field", price=Decimal("100.00"),
+                land_type="agricultural", area=Decimal("10.00"),
+            )
+            for index in range(2)
+        ]
+        audit_writer.flush()
+        self.addCleanup(audit_writer.flush)
+        AuditLog.objects.all().delete()
+
+    def writer(self, batch_size=100, flush_interval=60):
+        writer = AuditWriter(batch_size, flush_interval)
+        self.addCleanup(writer.flush)
+        return writer
+
+    def record(self, writer, land=None):
+        writer.record((land or self.lands[0]).pk, "UPDATE", {"address": ["Field", "Road"]}, user="clerk")
+
+    def test_flushes_when_the_batch_is_full(self):
+        writer = self.writer(batch_size=3)
+        self.record(writer)
+        self.record(writer)
+        self.assertEqual((writer.pending(), AuditLog.objects.count()), (2, 0))
+
+        self.record(writer)
+        self.assertEqual((writer.pending(), AuditLog.objects.count()), (0, 3))
+        self.assertIsNone(writer._timer)
+
+    def test_flushes_after_the_interval(self):
+        writer = self.writer(flush_interval=0.05)
+        self.record(writer)
+        timer = writer._timer
+        self.assertEqual(AuditLog.objects.count(), 0)
+        timer.join(5)
+        self.assertEqual(writer.pending(), 0)
+        self.assertEqual(AuditLog.objects.get().user, "clerk")
+
+    def test_queues_on_commit_only(self):
+        writer = self.writer()
+        with transaction.atomic():
+            self.record(writer)
+            self.assertEqual(writer.pending(), 0)
+        self.assertEqual(writer.pending(), 1)
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.record(writer)
+            raise RuntimeError
+        self.assertEqual(writer.pending(), 1)
+        self.assertEqual(writer.flush(), 1)
+
+    def test_worker_shutdown_flushes_the_queue(self):
+        land = self.lands[0]
+        land.status = "plowed"
+        land.save()
+        self.assertEqual(audit_writer.pending(), 1)
+
+        worker_shutdown.send(sender=None)
+        self.assertEqual(audit_writer.pending(), 0)
+        self.assertEqual(AuditLog.objects.get(land=land).action, "STATUS_CHANGE")
+
+    def test_rows_of_deleted_lands_are_dropped(self):
+        writer = self.writer()
+        self.record(writer, self.lands[0])
+        self.record(writer, self.lands[1])
+        Land.objects.filter(pk=self.lands[0].pk).delete()
+
+        with self.assertLogs("landModule.audit", "WARNING"):
+            self.assertEqual(writer.flush(), 1)
+        self.assertEqual(writer.pending(), 0)
+        self.assertEqual(list(AuditLog.objects.values_list("land_id", flat=True)), [self.lands[1].pk])
+
+    def test_land_deleted_during_the_flush(self):
+        writer = self.writer()
+        self.record(writer, self.lands[0])
+        self.record(writer, self.lands[1])
+        Land.objects.filter(pk=self.lands[0].pk).delete()
+
+        # The land disappears between the existence check and the insert.
+        with mock.patch.object(writer, "_drop_deleted_lands", side_effect=lambda entries: entries), \
+                self.assertLogs("landModule.audit", "WARNING"):
+            self.assertEqual(writer.flush(), 1)
+        self.assertEqual(writer.pending(), 0)
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    def test_rows_stay_queued_while_the_database_is_unavailable(self):
+        writer = self.writer()
+        self.record(writer)
+        with mock.patch.object(AuditLog.objects, "bulk_create", side_effect=OperationalError("database is locked")), \
+                self.assertLogs("landModule.audit", "ERROR"):
+            self.assertEqual(writer.flush(), 0)
+        self.assertEqual(writer.pending(), 1)
+        self.assertEqual(writer.flush(), 1)
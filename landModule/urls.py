@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import LandListView, LandFacetedSearchView
+
+urlpatterns = [
+    path('', LandListView.as_view(), name='land_list'),
+    path('search/', LandFacetedSearchView.as_view(), name='land_faceted_search'),
+]
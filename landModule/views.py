@@ -1,3 +1,86 @@
-from django.shortcuts import render
+# landModule/views.py
 
-# Create your views here.
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from .facets import FACETS, clean_selection, facet_counts, filter_selection
+from .models import Land
+from .pagination import keyset_page
+
+LIST_FIELDS = (
+    "id", "international_number", "land_number", "wilaya_id", "wilaya__name", "address",
+    "land_type", "status", "area", "price", "created_at",
+)
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+def get_page_size(params):
+    page_size = int(params.get("page_size", DEFAULT_PAGE_SIZE))
+    if page_size < 1:
+        raise ValueError("page_size must be positive")
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+class LandListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Lands newest first, paginated with an opaque cursor.
+
+        Query parameters:
+            cursor=...              # next_cursor of the previous page; omit for the first page
+            page_size=25
+            status, land_type, wilaya, area   # optional filters, same values as the faceted search
+        """
+        params = request.query_params
+        try:
+            selected = clean_selection({facet: params.getlist(facet) for facet in FACETS})
+            page_size = get_page_size(params)
+            results, next_cursor = keyset_page(
+                filter_selection(Land.objects.all(), selected), page_size, params.get("cursor"), LIST_FIELDS,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"results": results, "next_cursor": next_cursor})
+
+
+class LandFacetedSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        One page of lands plus the counts of every filter sidebar facet.
+
+        Query parameters (facet parameters can be repeated to select several values):
+            q=olive                 # optional search text, see LandQuerySet.search
+            status=available&status=rented
+            land_type=agricultural
+            wilaya=3
+            area=1000-10000         # 0-1000, 1000-10000, 10000-100000, 100000+ (sqm)
+            page=1&page_size=25
+        """
+        params = request.query_params
+        query = params.get("q", "").strip()
+        try:
+            selected = clean_selection({facet: params.getlist(facet) for facet in FACETS})
+            page = int(params.get("page", 1))
+            page_size = get_page_size(params)
+            if page < 1:
+                raise ValueError("page must be positive")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        lands = Land.objects.search(query) if query else Land.objects.all()
+        counts = facet_counts(lands, selected, cache_key_parts={"q": query})
+        offset = (page - 1) * page_size
+        results = list(filter_selection(lands, selected).values(*LIST_FIELDS)[offset:offset + page_size])
+        return Response({
+            "count": counts["total"],
+            "page": page,
+            "page_size": page_size,
+            "results": results,
+            "facets": counts["facets"],
+        })
@@ -6,7 +6,8 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'elitAgriTurkey.settings.development')
+    default_settings = 'test' if sys.argv[1:2] == ['test'] else 'development'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', f'elitAgriTurkey.settings.{default_settings}')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class MediamoduleConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'mediaModule'
+
+    def ready(self):
+        from .blobs import connect_reference_counting
+        from .derivatives import connect_image_fields
+
+        connect_image_fields()
+        connect_reference_counting()
@@ -0,0 +1,81 @@
+"""
+Reference counting of the blobs named by FileFields on ContentAddressedStorage.
+
+Saves and deletes adjust Blob.ref_count with F() updates in the same transaction as the write.
+Bulk updates and raw SQL bypass the signals: `manage.py collect_blobs --recount` recounts from the fields.
+"""
+import functools
+from collections import Counter
+from django.apps import apps
+from django.db.models import F, FileField
+from django.db.models.signals import post_delete, post_init, post_save
+from .models import Blob
+from .storage import BLOB_PREFIX, ContentAddressedStorage
+
+
+@functools.lru_cache(maxsize=None)
+def blob_fields():
+    """
+    (model, field name) of every FileField stored on a ContentAddressedStorage.
+    """
+    return tuple(
+        (model, field.name)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, FileField) and isinstance(field.storage, ContentAddressedStorage)
+    )
+
+
+def _field_names(model):
+    return [name for blob_model, name in blob_fields() if blob_model is model]
+
+
+def change_references(deltas):
+    for name, delta in deltas.items():
+        if name and delta:
+            Blob.objects.filter(name=name).update(ref_count=F("ref_count") + delta)
+
+
+def remember_blob_names(sender, instance, **kwargs):
+    # Raw values only: the FieldFile wrapper is built lazily and isn't needed to compare names.
+    instance._blob_names = {name: str(instance.__dict__.get(name) or "") for name in _field_names(sender)}
+
+
+def count_saved_references(sender, instance, **kwargs):
+    previous = getattr(instance, "_blob_names", {})
+    deltas = Counter()
+    for name in _field_names(sender):
+        old, new = previous.get(name, ""), getattr(instance, name).name or ""
+        if old != new:
+            deltas[old] -= 1
+            deltas[new] += 1
+    change_references(deltas)
+    remember_blob_names(sender, instance)
+
+
+def count_deleted_references(sender, instance, **kwargs):
+    # The names the row held, even if the field was cleared in memory (e.g. FieldFile.delete(save=False)).
+    previous = getattr(instance, "_blob_names", {})
+    deltas = Counter()
+    for name in _field_names(sender):
+        deltas[previous.get(name, getattr(instance, name).name or "")] -= 1
+    change_references(deltas)
+
+
+def connect_reference_counting():
+    for model in {model for model, _ in blob_fields()}:
+        uid = f"blob_refs_{model._meta.label}"
+        post_init.connect(remember_blob_names, sender=model, dispatch_uid=f"{uid}_init")
+        post_save.connect(count_saved_references, sender=model, dispatch_uid=f"{uid}_save")
+        post_delete.connect(count_deleted_references, sender=model, dispatch_uid=f"{uid}_delete")
+
+
+def count_references():
+    """
+    References to every blob, counted from the field values themselves.
+    """
+    counts = Counter()
+    for model, name in blob_fields():
+        values = model._default_manager.filter(**{f"{name}__startswith": f"{BLOB_PREFIX}/"}).values_list(name, flat=True)
+        counts.update(values.iterator())
+    return counts
@@ -0,0 +1,164 @@
+"""
+Resized WebP/JPEG derivatives of uploaded images.
+
+Derivatives are stored on the default storage under the SHA-256 of the source image,
+derivatives/<hash[:2]>/<hash>/<width>.<ext>, so identical uploads share them and their URLs never
+change content, which lets them be cached by browsers for good. They are rendered in a process pool,
+either right after an image of a registered field is saved (ON_UPLOAD) or on first request.
+"""
+import atexit
+import functools
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_init, post_save
+from .imaging import render_derivatives
+
+DEFAULTS = {
+    'FIELDS': [],                       # 'app_label.Model.field' image fields that get derivatives
+    'WIDTHS': [96, 320, 640, 1280],
+    'FORMATS': ['webp', 'jpeg'],
+    'QUALITY': 80,
+    'MAX_WORKERS': 2,                   # rendering processes; 0 renders in the calling thread
+    'ON_UPLOAD': True,                  # render when an image is saved instead of on first request
+    'PREFIX': 'derivatives',
+}
+CONTENT_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_pool = None
+_uploads = None
+_pool_lock = threading.Lock()
+
+
+def get_setting(name):
+    return getattr(settings, 'IMAGE_DERIVATIVES', {}).get(name, DEFAULTS[name])
+
+
+@functools.lru_cache(maxsize=None)
+def image_fields():
+    """
+    {(app_label, model_name): [field names]} of the registered fields; uninstalled apps are skipped.
+    """
+    fields = {}
+    for label in get_setting('FIELDS'):
+        app_label, model_name, field_name = label.split('.')
+        try:
+            model = apps.get_model(app_label, model_name)
+        except LookupError:
+            continue
+        fields.setdefault((model._meta.app_label, model._meta.model_name), []).append(field_name)
+    return fields
+
+
+def file_hash(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_hash(fieldfile):
+    """
+    SHA-256 of a stored image. Storage names are unique per upload, so the hash is cached by name.
+    """
+    key = f"mediaModule:hash:{hashlib.sha256(fieldfile.name.encode('utf-8')).hexdigest()}"
+    digest = cache.get(key)
+    if digest is None:
+        with fieldfile.storage.open(fieldfile.name, 'rb') as file:
+            digest = file_hash(file)
+        cache.set(key, digest, timeout=None)
+    return digest
+
+
+def derivative_name(digest, width, image_format):
+    return f"{get_setting('PREFIX')}/{digest[:2]}/{digest}/{width}.{EXTENSIONS[image_format]}"
+
+
+def _render(data, widths, formats):
+    quality = get_setting('QUALITY')
+    if not get_setting('MAX_WORKERS'):
+        return render_derivatives(data, widths, formats, quality)
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: workers don't inherit the server's threads, locks and database connections.
+            _pool = ProcessPoolExecutor(get_setting('MAX_WORKERS'), mp_context=multiprocessing.get_context('spawn'))
+    return _pool.submit(render_derivatives, data, widths, formats, quality).result()
+
+
+def ensure_derivatives(fieldfile, widths=None, formats=None):
+    """
+    Renders and stores the derivatives of fieldfile that don't exist yet. Returns the source hash.
+    """
+    widths = widths or get_setting('WIDTHS')
+    formats = formats or get_setting('FORMATS')
+    digest = source_hash(fieldfile)
+    missing_widths = sorted({
+        width for width in widths for image_format in formats
+        if not default_storage.exists(derivative_name(digest, width, image_format))
+    })
+    if missing_widths:
+        with fieldfile.storage.open(fieldfile.name, 'rb') as file:
+            data = file.read()
+        for width, image_format, content in _render(data, missing_widths, formats):
+            name = derivative_name(digest, width, image_format)
+            if not default_storage.exists(name):
+                default_storage.save(name, ContentFile(content))
+    return digest
+
+
+def schedule_derivatives(fieldfile):
+    """
+    Renders the derivatives in the background so the request that uploaded the image doesn't wait.
+    """
+    global _uploads
+    with _pool_lock:
+        if _uploads is None:
+            _uploads = ThreadPoolExecutor(max(1, get_setting('MAX_WORKERS')), thread_name_prefix='image-derivatives')
+    _uploads.submit(ensure_derivatives, fieldfile)
+
+
+def shutdown():
+    # Let queued renders finish so a graceful shutdown leaves no image without derivatives.
+    if _uploads is not None:
+        _uploads.shutdown(wait=True)
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+
+
+atexit.register(shutdown)
+
+
+def remember_image_names(sender, instance, **kwargs):
+    instance._derivative_sources = {
+        name: instance.__dict__.get(name) and str(instance.__dict__[name])
+        for name in image_fields()[(sender._meta.app_label, sender._meta.model_name)]
+    }
+
+
+def render_uploaded_images(sender, instance, raw=False, **kwargs):
+    if raw or not get_setting('ON_UPLOAD'):
+        return
+    previous = getattr(instance, '_derivative_sources', {})
+    for name in image_fields()[(sender._meta.app_label, sender._meta.model_name)]:
+        fieldfile = getattr(instance, name)
+        if fieldfile and fieldfile.name != previous.get(name):
+            transaction.on_commit(lambda fieldfile=fieldfile: schedule_derivatives(fieldfile))
+    remember_image_names(sender, instance)
+
+
+def connect_image_fields():
+    for app_label, model_name in image_fields():
+        model = apps.get_model(app_label, model_name)
+        uid = f"image_derivatives_{app_label}.{model_name}"
+        post_init.connect(remember_image_names, sender=model, dispatch_uid=f"{uid}_init")
+        post_save.connect(render_uploaded_images, sender=model, dispatch_uid=f"{uid}_save")
@@ -0,0 +1,44 @@
+"""
+Image resizing run in the derivative worker processes.
+Only depends on Pillow so spawned workers start without loading Django.
+"""
+import io
+from PIL import Image, ImageOps
+
+PIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+SAVE_OPTIONS = {
+    'webp': {'method': 4},
+    'jpeg': {'optimize': True, 'progressive': True},
+}
+
+
+def _flatten(image):
+    # JPEG has no alpha channel: transparent areas become white.
+    flattened = Image.new('RGB', image.size, (255, 255, 255))
+    flattened.paste(image, mask=image.getchannel('A'))
+    return flattened
+
+
+def render_derivatives(data, widths, formats, quality):
+    """
+    Resizes the encoded image data to every width (never upscaling) and encodes it in every format.
+    Returns a list of (width, format, encoded bytes).
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image.load()
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    results = []
+    for width in widths:
+        resized = image
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for image_format in formats:
+            output = io.BytesIO()
+            encoded = _flatten(resized) if image_format == 'jpeg' and resized.mode == 'RGBA' else resized
+            encoded.save(output, PIL_FORMATS[image_format], quality=quality, **SAVE_OPTIONS[image_format])
+            results.append((width, image_format, output.getvalue()))
+    return results
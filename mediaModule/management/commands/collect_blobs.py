@@ -0,0 +1,116 @@
+import os
+from datetime import timedelta
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils.timezone import now
+from mediaModule.blobs import blob_fields, count_references
+from mediaModule.models import Blob
+from mediaModule.storage import BLOB_PREFIX, ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    help = "Deletes unreferenced blobs of the content-addressed document storage and reports the space saved."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recount', action='store_true', help="Recount references from the file fields first")
+        parser.add_argument('--adopt', action='store_true',
+                            help="Move files uploaded before the content-addressed storage into it (implies --recount)")
+        parser.add_argument('--grace-hours', type=float, default=24,
+                            help="Keep unreferenced blobs stored more recently than this")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted without deleting")
+
+    def handle(self, *args, **options):
+        storage = ContentAddressedStorage()
+        dry_run = options['dry_run']
+        if options['adopt'] and not dry_run:
+            self.adopt(storage)
+        if options['recount'] or options['adopt']:
+            self.recount()
+
+        cutoff = now() - timedelta(hours=options['grace_hours'])
+        orphans = Blob.objects.filter(ref_count__lte=0, stored_at__lt=cutoff)
+        deleted = freed = 0
+        for blob in orphans.iterator():
+            if not dry_run and not self.delete_blob(storage, blob.pk, cutoff):
+                continue
+            deleted += 1
+            freed += blob.size
+        strays = self.delete_strays(storage, cutoff, dry_run)
+
+        totals = Blob.objects.aggregate(physical=Sum('size'), logical=Sum(F('size') * F('ref_count')))
+        physical, logical = totals['physical'] or 0, totals['logical'] or 0
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(f"{verb} {deleted} unreferenced blobs ({freed / 2 ** 20:.1f} MiB) and {strays} stray files")
+        self.stdout.write(
+            f"{Blob.objects.count()} blobs: {physical / 2 ** 20:.1f} MiB stored for "
+            f"{logical / 2 ** 20:.1f} MiB of referenced files ({max(logical - physical, 0) / 2 ** 20:.1f} MiB saved)"
+        )
+
+    def delete_blob(self, storage, pk, cutoff):
+        """
+        Deletes the blob if it is still unreferenced and past the grace period. The row stays locked
+        until its file is gone: an upload of the same content waits, then stores the file again.
+        """
+        with transaction.atomic():
+            blob = Blob.objects.select_for_update().filter(pk=pk, ref_count__lte=0, stored_at__lt=cutoff).first()
+            if blob is None:
+                return False  # referenced or uploaded again since the query
+            blob.delete()
+            FileSystemStorage.delete(storage, blob.name)
+        return True
+
+    def recount(self):
+        counts = count_references()
+        changed = []
+        for blob in Blob.objects.iterator():
+            if blob.ref_count != counts.get(blob.name, 0):
+                blob.ref_count = counts.get(blob.name, 0)
+                changed.append(blob)
+        Blob.objects.bulk_update(changed, ['ref_count'], batch_size=1000)
+        missing = set(counts) - set(Blob.objects.filter(name__in=list(counts)).values_list('name', flat=True))
+        for name in sorted(missing):
+            self.stderr.write(f"Referenced blob has no record: {name}")
+        self.stdout.write(f"Recounted references: {len(changed)} blobs corrected")
+
+    def adopt(self, storage):
+        adopted = 0
+        for model, name in blob_fields():
+            legacy = (
+                model._default_manager.exclude(**{f"{name}__startswith": f"{BLOB_PREFIX}/"})
+                .exclude(**{name: ""}).exclude(**{f"{name}__isnull": True})
+            )
+            moved = {}
+            for pk, old_name in legacy.values_list('pk', name).iterator():
+                if old_name not in moved:
+                    if not storage.exists(old_name):
+                        self.stderr.write(f"Missing file for {model._meta.label} {pk}: {old_name}")
+                        continue
+                    with storage.open(old_name, 'rb') as file:
+                        moved[old_name] = storage.save(old_name, file)
+                # update() keeps the signals out: references are recounted afterwards.
+                model._default_manager.filter(pk=pk).update(**{name: moved[old_name]})
+                adopted += 1
+            for old_name in moved:
+                FileSystemStorage.delete(storage, old_name)
+        self.stdout.write(f"Adopted {adopted} legacy files")
+
+    def delete_strays(self, storage, cutoff, dry_run):
+        """
+        Files under the blob directory without a Blob record (interrupted uploads), older than cutoff.
+        """
+        root = storage.path(BLOB_PREFIX)
+        if not os.path.isdir(root):
+            return 0
+        known = set(Blob.objects.values_list('name', flat=True))
+        strays = 0
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+                if name not in known and os.path.getmtime(path) < cutoff.timestamp():
+                    if not dry_run:
+                        os.remove(path)
+                    strays += 1
+        return strays
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Storage Name')),
+                ('sha256', models.CharField(db_index=True, max_length=64, verbose_name='SHA-256')),
+                ('size', models.BigIntegerField(verbose_name='Size (bytes)')),
+                ('ref_count', models.IntegerField(default=0, verbose_name='References')),
+                ('stored_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Last Stored At')),
+            ],
+            options={
+                'verbose_name': 'Blob',
+                'verbose_name_plural': 'Blobs',
+                'indexes': [models.Index(fields=['ref_count', 'stored_at'], name='blob_gc_idx')],
+            },
+        ),
+    ]
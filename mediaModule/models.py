@@ -0,0 +1,27 @@
+from django.db import models
+from django.utils.timezone import now
+from django.utils.translation import gettext_lazy as _
+
+
+class Blob(models.Model):
+    """
+    A file stored once by ContentAddressedStorage, shared by every field value that names it.
+    ref_count is kept up to date by mediaModule.blobs; `manage.py collect_blobs --recount` rebuilds it.
+    """
+    name = models.CharField(max_length=255, unique=True, verbose_name=_("Storage Name"))
+    sha256 = models.CharField(max_length=64, db_index=True, verbose_name=_("SHA-256"))
+    size = models.BigIntegerField(verbose_name=_("Size (bytes)"))
+    ref_count = models.IntegerField(default=0, verbose_name=_("References"))
+    # Refreshed every time the content is uploaded again: collect_blobs leaves recent blobs alone,
+    # so an upload whose record isn't saved yet never loses its file.
+    stored_at = models.DateTimeField(default=now, verbose_name=_("Last Stored At"))
+
+    class Meta:
+        verbose_name = _("Blob")
+        verbose_name_plural = _("Blobs")
+        indexes = [
+            models.Index(fields=["ref_count", "stored_at"], name="blob_gc_idx"),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,82 @@
+"""
+Content-addressed file storage: each distinct file is written once, under its SHA-256.
+
+Uploads are streamed through the hash in chunks while being written to a temporary file, which is
+then moved to blobs/<hash[:2]>/<hash[2:4]>/<hash><ext>, or dropped if that blob already exists.
+That decision and the refresh of Blob.stored_at happen under a lock on the blob's row, which
+collect_blobs also takes to delete a blob, so an upload never reuses a file that is being deleted.
+Field values naming the same blob share it; deleting a field's file only drops a reference and
+unreferenced blobs are removed by `manage.py collect_blobs`.
+"""
+import hashlib
+import os
+import tempfile
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+from django.utils.timezone import now
+
+BLOB_PREFIX = "blobs"
+CHUNK_SIZE = 1024 * 1024
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def is_blob(self, name):
+        return bool(name) and name.replace("\\", "/").startswith(f"{BLOB_PREFIX}/")
+
+    def blob_name(self, digest, extension):
+        return f"{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}"
+
+    def get_available_name(self, name, max_length=None):
+        # The stored name is derived from the content in _save, never from the upload name.
+        return name
+
+    def _save(self, name, content):
+        from .models import Blob
+
+        temp_dir = self.path(os.path.join(BLOB_PREFIX, "tmp"))
+        os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        handle, temp_path = tempfile.mkstemp(dir=temp_dir)
+        try:
+            with os.fdopen(handle, "wb") as temp_file:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks(CHUNK_SIZE):
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                    size += len(chunk)
+            name = self.blob_name(digest.hexdigest(), os.path.splitext(name)[1])
+            path = self.path(name)
+            with transaction.atomic():
+                # Waits for a collect_blobs run deleting this blob, which locks the same row.
+                list(Blob.objects.select_for_update().filter(name=name).values_list("pk"))
+                if os.path.exists(path):
+                    os.remove(temp_path)
+                    os.utime(path)  # not a stray for collect_blobs while its record is written
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(temp_path, path)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(path, self.file_permissions_mode)
+                Blob.objects.update_or_create(
+                    name=name,
+                    defaults={"stored_at": now()},
+                    create_defaults={"sha256": digest.hexdigest(), "size": size, "stored_at": now()},
+                )
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+    def delete(self, name):
+        # Other records may share the blob: it is only removed by collect_blobs once unreferenced.
+        if not self.is_blob(name):
+            super().delete(name)
+
+
+def document_storage():
+    return ContentAddressedStorage()
@@ -0,0 +1,245 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from PIL import Image
+from rest_framework.test import APIClient
+from accountModule.models import CustomUser
+from employeModule.models import Employee, EmployeeDocument
+from landModule.models import Land, LandDocument, Wilaya
+from .imaging import render_derivatives
+from .management.commands.collect_blobs import Command as CollectBlobs
+from .models import Blob
+
+
+def png(width, height, color=(200, 30, 30, 255)):
+    output = io.BytesIO()
+    Image.new("RGBA", (width, height), color).save(output, "PNG")
+    return output.getvalue()
+
+
+class RenderDerivativesTests(TestCase):
+    def decode(self, data):
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return image
+
+    def test_never_upscales(self):
+        results = render_derivatives(png(200, 100), [96, 320], ["webp"], 80)
+        sizes = {width: self.decode(data).size for width, _, data in results}
+        self.assertEqual(sizes, {96: (96, 48), 320: (200, 100)})
+
+    def test_alpha_is_flattened_on_white_for_jpeg_only(self):
+        results = {image_format: self.decode(data)
+                   for _, image_format, data in render_derivatives(png(40, 20, (0, 0, 0, 0)), [96], ["webp", "jpeg"], 90)}
+        self.assertEqual(results["jpeg"].mode, "RGB")
+        self.assertTrue(all(channel > 245 for channel in results["jpeg"].getpixel((10, 10))))
+        self.assertEqual(results["webp"].mode, "RGBA")
+        self.assertEqual(results["webp"].getpixel((10, 10))[3], 0)
+
+
+@override_settings(IMAGE_DERIVATIVES={"FIELDS": ["accountModule.CustomUser.profile_picture"], "WIDTHS": [96, 320],
+                                      "FORMATS": ["webp", "jpeg"], "MAX_WORKERS": 0, "ON_UPLOAD": False})
+class DerivativeViewTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        cache.clear()
+
+        self.user = CustomUser.objects.create_user(
+            username="farmer", password="secret", profile_picture=SimpleUploadedFile("me.png", png(200, 100)),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("image_derivative", kwargs={
+            "app_label": "accountModule", "model_name": "customuser", "pk": self.user.pk,
+            "field": "profile_picture", "width": 96, "image_format": "webp",
+        })
+
+    def test_redirects_to_the_stored_derivative(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("max-age=300", response["Cache-Control"])
+        self.assertNotIn("public", response["Cache-Control"])
+
+        response = self.client.get(response["Location"])
+        self.assertEqual((response.status_code, response["Content-Type"]), (200, "image/webp"))
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertNotIn("public", response["Cache-Control"])
+        image = Image.open(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(image.size, (96, 48))
+
+    def test_requires_authentication(self):
+        redirect = self.client.get(self.url)["Location"]
+        anonymous = APIClient()
+        self.assertEqual(anonymous.get(self.url).status_code, 401)
+        self.assertEqual(anonymous.get(redirect).status_code, 401)
+
+    def test_unknown_records_sizes_and_fields_are_not_found(self):
+        kwargs = {"app_label": "accountModule", "model_name": "customuser", "pk": self.user.pk,
+                  "field": "profile_picture", "width": 96, "image_format": "jpeg"}
+        for changes in ({"pk": "not-a-number"}, {"pk": self.user.pk + 1}, {"width": 97}, {"field": "username"}):
+            response = self.client.get(reverse("image_derivative", kwargs={**kwargs, **changes}))
+            self.assertEqual(response.status_code, 404, changes)
+        response = self.client.get(reverse("image_derivative_file", kwargs={
+            "digest": "0" * 64, "width": 96, "image_format": "jpeg",
+        }))
+        self.assertEqual(response.status_code, 404)
+
+
+class BlobStorageTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.land = Land.objects.create(
+            international_number="BL-1", wilaya=Wilaya.objects.create(name="Adana"), address="Field",
+            price=Decimal("100.00"), land_type="agricultural", area=Decimal("10.00"),
+        )
+        self.employee = Employee.objects.create(
+            name="Ayse Demir", employee_id="E-1", job_title="Agronomist", phone_number="555", residence_location="Adana",
+            monthly_salary=Decimal("1000.00"), age=30, marital_status="single",
+        )
+
+    def land_document(self, content, filename="deed.pdf"):
+        return LandDocument.objects.create(land=self.land, title="Deed", file=ContentFile(content, name=filename))
+
+    def employee_document(self, content, filename="contract.pdf"):
+        return EmployeeDocument.objects.create(employee=self.employee, document_name="Contract",
+                                               file=ContentFile(content, name=filename))
+
+    def ref_counts(self):
+        return dict(Blob.objects.values_list("sha256", "ref_count"))
+
+    def blob_files(self):
+        root = os.path.join(self.media_root, "blobs")
+        return sorted(
+            filename for directory, _, files in os.walk(root) for filename in files if os.path.basename(directory) != "tmp"
+        )
+
+    def collect(self, *args):
+        output = io.StringIO()
+        call_command("collect_blobs", *args, stdout=output, stderr=io.StringIO())
+        return output.getvalue()
+
+    def age(self, hours=48):
+        Blob.objects.update(stored_at=now() - timedelta(hours=hours))
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.land_document(b"same bytes", "a.pdf")
+        second = self.land_document(b"same bytes", "b.PDF")
+        self.assertTrue(first.file.name.startswith("blobs/"))
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(Blob.objects.get().ref_count, 2)
+
+        self.employee_document(b"same bytes", "c.pdf")
+        self.land_document(b"other bytes", "d.pdf")
+        self.assertEqual(Blob.objects.get(name=first.file.name).ref_count, 3)
+        self.assertEqual(len(self.blob_files()), 2)
+        with first.file.open("rb") as file:
+            self.assertEqual(file.read(), b"same bytes")
+
+    def test_references_follow_create_replace_and_delete(self):
+        land_document = self.land_document(b"version 1")
+        employee_document = self.employee_document(b"version 1")
+        old = land_document.file.name
+        self.assertEqual(Blob.objects.get(name=old).ref_count, 2)
+
+        land_document.file = ContentFile(b"version 2", name="deed.pdf")
+        land_document.save()
+        new = land_document.file.name
+        self.assertEqual((Blob.objects.get(name=old).ref_count, Blob.objects.get(name=new).ref_count), (1, 1))
+
+        # Saving without a change keeps the counts.
+        LandDocument.objects.get(pk=land_document.pk).save()
+        self.assertEqual(Blob.objects.get(name=new).ref_count, 1)
+
+        employee_document.file.delete(save=False)
+        employee_document.delete()
+        land_document.delete()
+        self.assertEqual((Blob.objects.get(name=old).ref_count, Blob.objects.get(name=new).ref_count), (0, 0))
+        # Deleting a field's file never removes the shared blob itself.
+        self.assertEqual(len(self.blob_files()), 2)
+
+    def test_recount_rebuilds_reference_counts(self):
+        shared = self.land_document(b"shared").file.name
+        self.employee_document(b"shared")
+        orphan = self.land_document(b"orphan")
+        LandDocument.objects.filter(pk=orphan.pk).delete()  # queryset delete: the counts don't follow
+        Blob.objects.update(ref_count=7)
+
+        output = self.collect("--recount")
+        self.assertIn("2 blobs corrected", output)
+        self.assertEqual(Blob.objects.get(name=shared).ref_count, 2)
+        self.assertEqual(Blob.objects.get(name=orphan.file.name).ref_count, 0)
+
+    def test_adopt_moves_legacy_files_into_blobs(self):
+        legacy_dir = os.path.join(self.media_root, "land_documents")
+        os.makedirs(legacy_dir)
+        with open(os.path.join(legacy_dir, "old.pdf"), "wb") as file:
+            file.write(b"legacy bytes")
+        document = self.land_document(b"placeholder")
+        placeholder = document.file.name
+        LandDocument.objects.filter(pk=document.pk).update(file="land_documents/old.pdf")
+        other = self.employee_document(b"placeholder")
+        EmployeeDocument.objects.filter(pk=other.pk).update(file="employees/documents/missing.pdf")
+
+        output = self.collect("--adopt", "--grace-hours", "0")
+        self.assertIn("Adopted 1 legacy files", output)
+        document.refresh_from_db()
+        self.assertTrue(document.file.name.startswith("blobs/"))
+        with document.file.open("rb") as file:
+            self.assertEqual(file.read(), b"legacy bytes")
+        self.assertFalse(os.path.exists(os.path.join(legacy_dir, "old.pdf")))
+        self.assertEqual(Blob.objects.get(name=document.file.name).ref_count, 1)
+        # The updates dropped every reference to the placeholder: the recount lets it be collected.
+        self.assertFalse(Blob.objects.filter(name=placeholder).exists())
+
+    def test_grace_period_keeps_recent_orphans(self):
+        kept = self.land_document(b"kept")
+        orphan = self.land_document(b"orphan")
+        orphan.delete()
+        self.assertIn("Deleted 0 unreferenced blobs", self.collect())
+
+        self.age()
+        self.assertIn("Would delete 1 unreferenced blobs", self.collect("--dry-run"))
+        self.assertIn("Deleted 1 unreferenced blobs", self.collect())
+        self.assertEqual(list(Blob.objects.values_list("name", flat=True)), [kept.file.name])
+        self.assertFalse(orphan.file.storage.exists(orphan.file.name))
+        self.assertTrue(kept.file.storage.exists(kept.file.name))
+
+    def test_upload_again_refreshes_the_grace_period(self):
+        orphan = self.land_document(b"orphan")
+        orphan.delete()
+        self.age()
+        blob = Blob.objects.get()
+        cutoff = now() - timedelta(hours=24)
+
+        # Uploaded again after collect_blobs listed it: the locked re-check keeps it.
+        orphan.file.storage.save("again.pdf", ContentFile(b"orphan"))
+        self.assertFalse(CollectBlobs().delete_blob(orphan.file.storage, blob.pk, cutoff))
+        self.assertTrue(orphan.file.storage.exists(blob.name))
+
+        self.age()
+        self.assertTrue(CollectBlobs().delete_blob(orphan.file.storage, blob.pk, cutoff))
+        self.assertFalse(orphan.file.storage.exists(blob.name))
+        # A later upload stores the file again.
+        self.assertEqual(self.land_document(b"orphan").file.name, blob.name)
+        self.assertTrue(orphan.file.storage.exists(blob.name))
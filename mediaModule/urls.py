@@ -0,0 +1,21 @@
+from django.urls import path, register_converter
+from .views import DerivativeFileView, ImageDerivativeView
+
+
+class ImageFormatConverter:
+    regex = 'webp|jpeg'
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return value
+
+
+register_converter(ImageFormatConverter, 'image_format')
+
+urlpatterns = [
+    path('derivatives/<slug:digest>/<int:width>.<image_format:image_format>', DerivativeFileView.as_view(), name='image_derivative_file'),
+    path('<str:app_label>/<str:model_name>/<str:pk>/<str:field>/<int:width>.<image_format:image_format>',
+         ImageDerivativeView.as_view(), name='image_derivative'),
+]
@@ -0,0 +1,57 @@
+# mediaModule/views.py
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from .derivatives import CONTENT_TYPES, derivative_name, ensure_derivatives, get_setting, image_fields
+
+# A derivative URL contains the hash of its source, so its content never changes.
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# The image behind a record can be replaced, so where it points to is only cached briefly.
+LOOKUP_MAX_AGE = 5 * 60
+
+
+def _check_size(width, image_format):
+    if width not in get_setting('WIDTHS') or image_format not in get_setting('FORMATS'):
+        raise Http404("Unsupported image size or format")
+
+
+class ImageDerivativeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, app_label, model_name, pk, field, width, image_format):
+        """
+        Redirects to the derivative of a record's image, rendering it first if needed.
+        e.g. /images/landModule/landimage/12/image/320.webp
+        """
+        _check_size(width, image_format)
+        if field not in image_fields().get((app_label, model_name.lower()), []):
+            raise Http404("No derivatives for this image field")
+        model = apps.get_model(app_label, model_name)
+        # DRF's get_object_or_404 turns a pk of the wrong type (e.g. not a UUID) into a 404.
+        fieldfile = getattr(get_object_or_404(model, pk=pk), field)
+        if not fieldfile:
+            raise Http404("No image")
+        digest = ensure_derivatives(fieldfile)
+        response = redirect('image_derivative_file', digest=digest, width=width, image_format=image_format)
+        # Private: only the signed in user's browser may keep the images, never a shared cache.
+        patch_cache_control(response, private=True, max_age=LOOKUP_MAX_AGE)
+        return response
+
+
+class DerivativeFileView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, digest, width, image_format):
+        _check_size(width, image_format)
+        name = derivative_name(digest, width, image_format)
+        if not default_storage.exists(name):
+            raise Http404("No such derivative")
+        response = FileResponse(default_storage.open(name, 'rb'), content_type=CONTENT_TYPES[image_format])
+        patch_cache_control(response, private=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+        return response
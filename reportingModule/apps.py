@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ReportingmoduleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reportingModule'
+
+    def ready(self):
+        from django.core import checks
+        from .cache import check_version_cache, connect_invalidation
+        from .reports import registry
+
+        checks.register(check_version_cache)
+        connect_invalidation(registry.source_models())
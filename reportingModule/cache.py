@@ -0,0 +1,201 @@
+# reportingModule/cache.py
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from django.apps import apps
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.db import router, transaction
+from django.db.models.signals import post_delete, post_save
+from .reports.registry import registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MAX_ENTRIES': 64,                  # 0 disables the result cache
+    'MAX_BYTES': 64 * 1024 * 1024,      # approximate total size of the cached outputs
+    'VERSION_CACHE': 'default',         # cache alias holding the per-model version counters
+}
+
+# Backends whose data lives in one process: versions bumped there never reach the other workers.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def get_setting(name):
+    return getattr(settings, 'REPORT_CACHE', {}).get(name, DEFAULTS[name])
+
+
+class ReportCache:
+    """
+    In-process LRU store of generated report outputs, bounded by entry count and total size.
+    """
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = len(value)
+        if not self.max_entries or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = value
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+report_cache = ReportCache(get_setting('MAX_ENTRIES'), get_setting('MAX_BYTES'))
+
+
+def check_version_cache(app_configs=None, **kwargs):
+    """
+    System check: the version counters must live in a cache every worker shares.
+    """
+    alias = get_setting('VERSION_CACHE')
+    try:
+        backend = settings.CACHES[alias]['BACKEND']
+    except KeyError:
+        return [checks.Error(f"REPORT_CACHE['VERSION_CACHE'] names the unknown cache '{alias}'", id='reportingModule.E001')]
+    if backend in PROCESS_LOCAL_CACHES:
+        return [checks.Error(
+            f"REPORT_CACHE['VERSION_CACHE'] uses the per-process cache '{alias}' ({backend})",
+            hint="Writes in one worker would not invalidate the reports cached by the others. "
+                 "Point it at a database, redis or memcached cache.",
+            id='reportingModule.E002',
+        )]
+    return []
+
+
+def _version_key(model_label):
+    return f"reportingModule:version:{model_label}"
+
+
+def _with_version_cache(operation):
+    """
+    operation(cache) on the version cache. A failing backend is logged and gives None, so reports are
+    regenerated instead of the write or the request that touched the counters failing.
+    """
+    alias = get_setting('VERSION_CACHE')
+    try:
+        cache = caches[alias]
+        if isinstance(cache, DatabaseCache):
+            # A savepoint keeps a failed cache query from aborting the caller's transaction.
+            with transaction.atomic(using=router.db_for_write(cache.cache_model_class)):
+                return operation(cache)
+        return operation(cache)
+    except Exception:
+        logger.exception("Report version cache '%s' is unavailable", alias)
+        return None
+
+
+def model_version(model_label):
+    """
+    Current data version of a model. A missing counter (never set, or evicted) starts
+    from the clock, so it can't fall back to a version that older entries were built with.
+    An unavailable cache gives a fresh version every time: nothing is served from the result cache.
+    """
+    key = _version_key(model_label)
+
+    def read(cache):
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        return version
+
+    version = _with_version_cache(read)
+    return version if version is not None else time.time_ns()
+
+
+def bump_version(model_label):
+    """
+    Makes the cached reports built from the model stale. Writes that send no signals
+    (bulk_create, queryset.update()) call it themselves.
+    """
+    key = _version_key(model_label)
+
+    def bump(cache):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+    _with_version_cache(bump)
+
+
+def bump_model_version(sender, **kwargs):
+    """
+    Signal receiver: any write to a source model makes cached reports built from it stale.
+    """
+    bump_version(sender._meta.label)
+
+
+def connect_invalidation(model_labels):
+    """
+    Connects the version bump to post_save/post_delete of the given models.
+    Labels of models that are not installed are skipped.
+    """
+    for label in model_labels:
+        try:
+            model = apps.get_model(label)
+        except (LookupError, ValueError):
+            continue
+        post_save.connect(bump_model_version, sender=model, dispatch_uid=f"report_cache_save_{label}")
+        post_delete.connect(bump_model_version, sender=model, dispatch_uid=f"report_cache_delete_{label}")
+
+
+def make_key(report_type, fields, filters, export_format, versions, aggregation=None):
+    """
+    Content address of a report: hash of what was asked for plus the data versions it was built from.
+    Field order is kept because it decides the column order of the output.
+    """
+    payload = json.dumps({
+        'report_type': report_type,
+        'fields': list(dict.fromkeys(fields or [])),
+        'filters': filters or {},
+        'export_format': export_format,
+        'aggregation': aggregation or {},
+        'versions': versions,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def cached_generate(report_type, report, export_format='csv'):
+    """
+    Returns report.generate(export_format), served from the cache when the same report
+    was already generated and none of its source models changed since.
+    """
+    versions = {label: model_version(label) for label in registry.get(report_type).source_models}
+    key = make_key(report_type, report.fields, report.filters, export_format, versions, report.aggregation)
+    output = report_cache.get(key)
+    if output is None:
+        output = report.generate(export_format=export_format)
+        report_cache.set(key, output)
+    return output
@@ -0,0 +1,42 @@
+import json
+import time
+from itertools import cycle, islice
+from django.core.management.base import BaseCommand, CommandError
+from reportingModule.reports.base_report import EXPORT_EXTENSIONS
+from reportingModule.reports.report_factory import ReportFactory
+
+
+class Command(BaseCommand):
+    help = "Compares the output size and encode time of the report export formats."
+
+    def add_arguments(self, parser):
+        parser.add_argument('report_type', help="Report to benchmark (e.g. 'sales')")
+        parser.add_argument('--fields', nargs='*', default=[], help="Report fields (default: all)")
+        parser.add_argument('--filters', default='{}', help="Report filters as a JSON object")
+        parser.add_argument('--rows', type=int, help="Repeat the fetched rows up to this many rows")
+        parser.add_argument('--formats', nargs='*', default=list(EXPORT_EXTENSIONS), help="Formats to compare")
+
+    def handle(self, *args, **options):
+        try:
+            report = ReportFactory.create_report(options['report_type'], options['fields'], json.loads(options['filters']))
+            # Rows are fetched once so only the encoding is timed.
+            rows = report.get_data()
+        except (ValueError, ImportError) as e:
+            raise CommandError(str(e))
+        if not rows:
+            raise CommandError("The report returned no rows to benchmark")
+        if options['rows']:
+            rows = list(islice(cycle(rows), options['rows']))
+
+        self.stdout.write(f"{len(rows)} rows")
+        self.stdout.write(f"{'format':<10}{'size (KiB)':>14}{'encode (s)':>14}")
+        for export_format in options['formats']:
+            start = time.perf_counter()
+            try:
+                output = report.encode(iter(rows), export_format)
+            except (ImportError, ValueError) as e:
+                self.stdout.write(f"{export_format:<10}  skipped: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            size = len(output.encode('utf-8') if isinstance(output, str) else output)
+            self.stdout.write(f"{export_format:<10}{size / 1024:>14.1f}{elapsed:>14.3f}")
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportingModule', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='aggregation',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Aggregation'),
+        ),
+    ]
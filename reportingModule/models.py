@@ -1,3 +1,44 @@
+import uuid
 from django.db import models
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class ReportJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        RUNNING = 'running', _('Running')
+        SUCCESS = 'success', _('Success')
+        FAILED = 'failed', _('Failed')
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='report_jobs',
+        verbose_name=_("User")
+    )
+    report_type = models.CharField(_("Report Type"), max_length=50)
+    fields = models.JSONField(_("Fields"), default=list, blank=True)
+    filters = models.JSONField(_("Filters"), default=dict, blank=True)
+    aggregation = models.JSONField(_("Aggregation"), default=dict, blank=True)
+    export_format = models.CharField(_("Export Format"), max_length=20, default='csv')
+    status = models.CharField(
+        _("Status"),
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    file = models.FileField(_("Report File"), upload_to='reports/', null=True, blank=True)
+    error = models.TextField(_("Error"), blank=True)
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+    finished_at = models.DateTimeField(_("Finished At"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Report Job")
+        verbose_name_plural = _("Report Jobs")
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.report_type} report ({self.get_status_display()})"
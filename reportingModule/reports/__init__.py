@@ -0,0 +1,21 @@
+# reportingModule/reports/__init__.py
+#
+# Available reports. Each one is declared with its model, fields and filters;
+# the module holding the report class is only imported when the report is first used.
+
+from .registry import registry
+
+registry.register(
+    'sales',
+    'reportingModule.reports.sales_report.SalesReport',
+    model='expenseModule.SaleTransaction',
+    filters=('start_date', 'end_date'),
+    description="Sale transactions, optionally limited to a date range.",
+)
+registry.register(
+    'vaccination',
+    'reportingModule.reports.vaccination_report.VaccinationReport',
+    model='animalModule.VaccinationRecord',
+    filters=('animal_id',),
+    description="Vaccination records, optionally limited to one animal.",
+)
@@ -1,49 +1,256 @@
 from abc import ABC, abstractmethod
+import csv
+import tempfile
 import pandas as pd
+from django.db import models
+from django.db.models import Avg, Count, Max, Min, Sum
+from django.db.models.functions import Cast, TruncDay, TruncMonth, TruncWeek
+
+# File extension used when a report is saved to disk, per export format.
+EXPORT_EXTENSIONS = {
+    'csv': 'csv',
+    'excel': 'xlsx',
+    'parquet': 'parquet',
+    'arrow': 'arrow',
+}
+
+# Content type served for each export format.
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+
+# Formats encoded straight from the row iterator into Arrow record batches.
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+# Aggregate functions and date truncations accepted by aggregated reports.
+AGGREGATE_FUNCTIONS = {
+    'sum': Sum,
+    'count': Count,
+    'avg': Avg,
+    'min': Min,
+    'max': Max,
+}
+DATE_TRUNCATIONS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+class _Echo:
+    """
+    File-like object whose write() hands the line back instead of storing it,
+    so csv.writer can be used to build rows for a streaming response.
+    """
+    def write(self, value):
+        return value
+
 
 class BaseReport(ABC):
-    def __init__(self, fields, filters, user=None):
+    # Number of rows fetched per round trip when streaming from the database.
+    chunk_size = 2000
+
+    def __init__(self, fields, filters, user=None, aggregation=None):
         """
         :param fields: List of fields/columns the user wants in the report.
         :param filters: Dictionary of filters (e.g., date range, status, etc.).
         :param user: The current user (for permission or user-specific queries).
+        :param aggregation: Optional grouping done in the database, e.g.
+            {"group_by": ["product", "date"], "aggregates": {"total_value": "sum"}, "date_trunc": "month"}.
+            When given, the rows are the groups and `fields` is ignored.
         """
         self.fields = fields
         self.filters = filters
         self.user = user
+        self.aggregation = aggregation or {}
 
     @abstractmethod
-    def get_data(self):
+    def get_queryset(self):
         """
-        Must be implemented by subclasses to fetch data based on the filters.
-        Returns a list of dictionaries or any structure that can be transformed into a DataFrame.
+        Must be implemented by subclasses to build the filtered queryset for the report.
         """
         pass
 
+    def get_columns(self, model, fields=None):
+        """
+        Validates the requested fields against the model's concrete fields and returns
+        the columns to select. An empty field list selects every concrete field.
+        """
+        fields = self.fields if fields is None else fields
+        if not fields:
+            return []
+        available = set()
+        for field in model._meta.concrete_fields:
+            available.update((field.name, field.attname))
+        invalid = [col for col in fields if col not in available]
+        if invalid:
+            raise ValueError(f"Invalid report fields: {', '.join(map(str, invalid))}")
+        return list(dict.fromkeys(fields))
+
+    def get_values(self):
+        """
+        Returns the queryset as dictionaries restricted to the requested columns,
+        so unrequested columns are never fetched from the database.
+        """
+        qs = self.get_queryset()
+        if self.aggregation:
+            return self.aggregate(qs)
+        return qs.values(*self.get_columns(qs.model))
+
+    def aggregate(self, qs):
+        """
+        Groups the queryset in the database with values(*group_by).annotate(*aggregates).
+        Date fields in group_by are truncated to date_trunc and named '<field>_<unit>';
+        aggregate columns are named '<field>__<function>'.
+        """
+        columns, truncations, annotations = self._aggregation(qs.model)
+        return qs.annotate(**truncations).values(*columns).annotate(**annotations).order_by(*columns)
+
+    def _aggregation(self, model):
+        """
+        (group columns in group_by order, date truncations by name, aggregates by name) of the aggregated report.
+        """
+        group_by = self.get_columns(model, self.aggregation.get('group_by', []))
+        aggregates = self.aggregation.get('aggregates') or {}
+        date_trunc = self.aggregation.get('date_trunc')
+        if not aggregates:
+            raise ValueError("Aggregated reports need at least one aggregate")
+        if not group_by:
+            # values() without fields would group by every column: one "group" per row.
+            raise ValueError("Aggregated reports need at least one group_by field")
+        if date_trunc is not None and date_trunc not in DATE_TRUNCATIONS:
+            raise ValueError(f"Invalid date truncation: {date_trunc}")
+
+        columns = []
+        truncations = {}
+        for name in group_by:
+            field = model._meta.get_field(name)
+            # DateTimeField is a DateField too.
+            if date_trunc and isinstance(field, models.DateField):
+                alias = f"{name}_{date_trunc}"
+                truncations[alias] = DATE_TRUNCATIONS[date_trunc](name)
+                columns.append(alias)
+            else:
+                columns.append(name)
+
+        annotations = {}
+        for name in self.get_columns(model, list(aggregates)):
+            functions = aggregates[name]
+            for function in [functions] if isinstance(functions, str) else functions:
+                if function not in AGGREGATE_FUNCTIONS:
+                    raise ValueError(f"Invalid aggregate function: {function}")
+                annotations[f"{name}__{function}"] = self._aggregate_expression(model._meta.get_field(name), function)
+        return columns, truncations, annotations
+
+    def _aggregate_expression(self, field, function):
+        if function == 'avg':
+            # Averages are not exact anyway; a float keeps the type the same on every database.
+            return Cast(Avg(field.name), models.FloatField())
+        if function == 'sum' and isinstance(field, models.DecimalField):
+            # A sum needs more digits than the column it adds up.
+            return Sum(field.name, output_field=models.DecimalField(max_digits=38, decimal_places=field.decimal_places))
+        return AGGREGATE_FUNCTIONS[function](field.name)
+
+    def get_header(self):
+        """
+        Column names of the report in output order, known without running the query.
+        Aggregated reports keep the group_by order, truncated dates included.
+        """
+        if self.aggregation:
+            columns, _, annotations = self._aggregation(self.get_queryset().model)
+            return [*columns, *annotations]
+        query = self.get_values().query
+        return [*query.values_select, *query.annotation_select]
+
+    def get_data(self):
+        """
+        Returns the report rows as a list of dictionaries.
+        """
+        return list(self._in_header_order(self.get_values()))
+
+    def iter_rows(self):
+        """
+        Yields the report rows one by one, reading the queryset in server-side chunks
+        so the full result set is never held in memory.
+        """
+        return self._in_header_order(self.get_values().iterator(chunk_size=self.chunk_size))
+
+    def _in_header_order(self, rows):
+        # values() puts annotations (truncated dates) after the plain fields, whatever the group_by order.
+        if not self.aggregation:
+            return rows
+        header = self.get_header()
+        return ({name: row[name] for name in header} for row in rows)
+
     def format_data(self, data):
         """
-        Formats data as a pandas DataFrame and selects only the requested fields.
+        Formats data as a pandas DataFrame. Column selection already happened in the
+        query, so the header only fixes the column order (and the columns of an empty report).
         """
-        df = pd.DataFrame(data)
-        if self.fields:
-            # Ensure we only include valid columns (assuming the data contains them)
-            df = df[[col for col in self.fields if col in df.columns]]
-        return df
+        return pd.DataFrame(data, columns=self.get_header())
 
     def generate(self, export_format='csv'):
         """
         Fetch, format, and export the report in the desired format.
         """
-        data = self.get_data()
-        df = self.format_data(data)
-        
         if export_format == 'csv':
-            return df.to_csv(index=False)
+            return self.encode(self.get_data(), export_format)
+        return self.encode(self.iter_rows(), export_format)
+
+    def encode(self, rows, export_format):
+        """
+        Encodes already fetched rows in the desired format.
+        """
+        if export_format in COLUMNAR_FORMATS:
+            from .columnar import arrow_schema, write_columnar
+            return write_columnar(rows, arrow_schema(self.get_values(), self.get_header()), export_format,
+                                  self.chunk_size)
+
+        if export_format == 'csv':
+            return self.format_data(rows).to_csv(index=False)
         elif export_format == 'excel':
-            from io import BytesIO
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df.to_excel(writer, index=False)
-            return output.getvalue()
+            with self._excel_tempfile(rows) as output:
+                return output.read()
         else:
-            raise ValueError("Unsupported export format")
\ No newline at end of file
+            raise ValueError("Unsupported export format")
+
+    def excel_file(self):
+        """
+        Writes the report to a temporary xlsx file on disk and returns it open and rewound,
+        ready to be streamed. The file is removed once it is closed.
+        """
+        return self._excel_tempfile(self.iter_rows())
+
+    def _excel_tempfile(self, rows):
+        from .excel import write_excel
+        output = tempfile.TemporaryFile(suffix='.xlsx')
+        try:
+            write_excel(rows, output, self.get_header())
+        except Exception:
+            output.close()
+            raise
+        output.seek(0)
+        return output
+
+    def stream_csv(self):
+        """
+        Returns a generator of CSV text chunks suitable for a StreamingHttpResponse.
+        The queryset is built here so that setup errors surface before streaming starts.
+        """
+        return self._csv_chunks(self.iter_rows(), self.get_header())
+
+    def _csv_chunks(self, rows, header):
+        writer = csv.writer(_Echo())
+        # Send the header on its own so the client gets the first byte before the query runs.
+        yield writer.writerow(header)
+        buffer = []
+        for row in rows:
+            buffer.append(writer.writerow(row.values()))
+            if len(buffer) >= self.chunk_size:
+                yield ''.join(buffer)
+                buffer = []
+        if buffer:
+            yield ''.join(buffer)
@@ -0,0 +1,46 @@
+# reportingModule/reports/excel.py
+
+import datetime
+from decimal import Decimal
+import xlsxwriter
+
+# Rows per worksheet in the xlsx format, header row included.
+EXCEL_MAX_ROWS = 1048576
+
+_NATIVE_TYPES = (str, bool, int, float, Decimal, datetime.date, datetime.time, datetime.timedelta)
+
+
+def _excel_value(value):
+    # Types xlsxwriter can't write (uuid, json, files) are written as text.
+    if value is None or isinstance(value, _NATIVE_TYPES):
+        return value
+    return str(value)
+
+
+def write_excel(rows, output, header):
+    """
+    Writes an iterator of row dictionaries to an xlsx workbook at output (path or binary file).
+
+    xlsxwriter's constant_memory mode flushes each row to disk as soon as the next one starts,
+    so memory stays flat however many rows there are. A new worksheet is started whenever
+    the current one reaches the xlsx row limit; each worksheet starts with the header row.
+    """
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'remove_timezone': True,
+        'default_date_format': 'yyyy-mm-dd',
+        # Cell values are data: never turn them into formulas or hyperlinks.
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+    })
+    worksheet = workbook.add_worksheet()
+    worksheet.write_row(0, 0, header)
+    row_index = 1
+    for row in rows:
+        if row_index >= EXCEL_MAX_ROWS:
+            worksheet = workbook.add_worksheet()
+            worksheet.write_row(0, 0, header)
+            row_index = 1
+        worksheet.write_row(row_index, 0, [_excel_value(value) for value in row.values()])
+        row_index += 1
+    workbook.close()
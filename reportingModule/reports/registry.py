@@ -0,0 +1,93 @@
+# reportingModule/reports/registry.py
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+class ReportEntry:
+    def __init__(self, name, path, model, fields=None, filters=(), description=''):
+        """
+        :param name: Report type used in the API payloads (e.g. 'sales').
+        :param path: Dotted path of the report class; its module is only imported on first use.
+        :param model: Label ('app.Model') of the model the report reads.
+        :param fields: Fields the report may select. None allows every concrete field of the model.
+        :param filters: Filter keys the report understands.
+        :param description: Short human readable description for the discovery endpoint.
+        """
+        self.name = name
+        self.path = path
+        self.model = model
+        self.fields = fields
+        self.filters = tuple(filters)
+        self.description = description
+        self._report_class = None
+
+    @property
+    def source_models(self):
+        return (self.model,)
+
+    def get_model(self):
+        try:
+            return apps.get_model(self.model)
+        except (LookupError, ValueError) as e:
+            raise ValueError(f"Report '{self.name}' is unavailable: {e}")
+
+    def get_fields(self):
+        """
+        Fields a report of this type may select: the declared ones, or every concrete field of its model.
+        """
+        if self.fields is not None:
+            return list(self.fields)
+        return [field.name for field in self.get_model()._meta.concrete_fields]
+
+    def load(self):
+        """
+        Imports the report class the first time it is needed.
+        A broken report module only makes its own report unavailable.
+        """
+        if self._report_class is None:
+            try:
+                self._report_class = import_string(self.path)
+            except ImportError as e:
+                raise ValueError(f"Report '{self.name}' is unavailable: {e}")
+        return self._report_class
+
+    def validate(self, fields, filters, aggregation=None):
+        unknown_filters = [key for key in filters if key not in self.filters]
+        if unknown_filters:
+            raise ValueError(f"Invalid report filters: {', '.join(map(str, unknown_filters))}")
+        if self.fields is not None:
+            aggregation = aggregation or {}
+            requested = [*fields, *aggregation.get('group_by', []), *(aggregation.get('aggregates') or {})]
+            unknown_fields = [col for col in requested if col not in self.fields]
+            if unknown_fields:
+                raise ValueError(f"Invalid report fields: {', '.join(map(str, unknown_fields))}")
+
+
+class ReportRegistry:
+    def __init__(self):
+        self._entries = {}
+
+    def register(self, name, path, model, **options):
+        """
+        Declares a report under name. Nothing is imported until the report is used.
+        """
+        if name in self._entries:
+            raise ImproperlyConfigured(f"Report '{name}' is already registered")
+        self._entries[name] = ReportEntry(name, path, model, **options)
+
+    def get(self, name):
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise ValueError(f"Invalid Report Type: {name}")
+
+    def all(self):
+        return list(self._entries.values())
+
+    def source_models(self):
+        return {label for entry in self._entries.values() for label in entry.source_models}
+
+
+registry = ReportRegistry()
@@ -1,20 +1,15 @@
 # reportingModule/reports/report_factory.py
 
-from .sales_report import SalesReport
-from .vaccination_report import VaccinationReport
-from .animal_report import AnimalReport  # assuming you have this
+from .registry import registry
 
 class ReportFactory:
     @staticmethod
-    def create_report(report_type, fields, filters, user=None):
+    def create_report(report_type, fields, filters, user=None, aggregation=None):
         """
-        :param report_type: A string indicating the type of report (e.g., 'sales', 'vaccination', 'animal')
+        :param report_type: A string indicating the type of report (e.g., 'sales', 'vaccination')
+        :param aggregation: Optional group_by / aggregates / date_trunc options (see BaseReport)
         """
-        if report_type == 'sales':
-            return SalesReport(fields, filters, user)
-        elif report_type == 'vaccination':
-            return VaccinationReport(fields, filters, user)
-        elif report_type == 'animal':
-            return AnimalReport(fields, filters, user)
-        else:
-            raise ValueError(f"Invalid Report Type: {report_type}")
+        entry = registry.get(report_type)
+        entry.get_model()
+        entry.validate(fields, filters, aggregation)
+        return entry.load()(fields, filters, user, aggregation=aggregation)
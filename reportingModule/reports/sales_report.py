@@ -4,21 +4,19 @@ from .base_report import BaseReport
 from django.db.models import Q
 
 class SalesReport(BaseReport):
-    def get_data(self):
+    def get_queryset(self):
         """
-        Example: Query sales data from bankModule.
-        Replace with your actual business logic.
+        Query sales data from expenseModule.
         """
-        # Import the model from bankModule
-        from bankModule.models import Transaction  
-        
-        # Start with all transactions and apply filters.
-        qs = Transaction.objects.all()
+        # Import the model from expenseModule
+        from expenseModule.models import SaleTransaction
+
+        # Start with all sales and apply filters.
+        qs = SaleTransaction.objects.all()
         if 'start_date' in self.filters:
             qs = qs.filter(date__gte=self.filters['start_date'])
         if 'end_date' in self.filters:
             qs = qs.filter(date__lte=self.filters['end_date'])
         # More filters can be added here...
-        
-        # Return a list of dictionaries; you can use Django's .values() for simplicity.
-        return list(qs.values())
+
+        return qs
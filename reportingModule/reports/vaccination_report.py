@@ -1,7 +1,7 @@
 from .base_report import BaseReport
 
 class VaccinationReport(BaseReport):
-    def get_data(self):
+    def get_queryset(self):
         """
         Example: Query vaccination records.
         Replace with actual queries from the appropriate module.
@@ -13,4 +13,4 @@ class VaccinationReport(BaseReport):
             qs = qs.filter(animal_id=self.filters['animal_id'])
         # Apply additional filters as needed
         
-        return list(qs.values())
\ No newline at end of file
+        return qs
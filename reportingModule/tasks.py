@@ -0,0 +1,47 @@
+# reportingModule/tasks.py
+
+from celery import shared_task
+from django.core.files.base import ContentFile, File
+from django.utils import timezone
+from .cache import cached_generate
+from .models import ReportJob
+from .reports.base_report import EXPORT_EXTENSIONS
+from .reports.report_factory import ReportFactory
+
+
+@shared_task
+def generate_report_job(job_id):
+    """
+    Runs a queued report job and stores the generated file under MEDIA_ROOT.
+    """
+    job = ReportJob.objects.get(pk=job_id)
+    job.status = ReportJob.Status.RUNNING
+    job.save(update_fields=['status'])
+
+    try:
+        report = ReportFactory.create_report(
+            job.report_type, job.fields, job.filters, user=job.user, aggregation=job.aggregation
+        )
+        if job.export_format == 'excel':
+            # Large workbooks are written to a temporary file and copied to storage from disk.
+            output = File(report.excel_file(), name=f"{job.report_type}.xlsx")
+        else:
+            output = cached_generate(job.report_type, report, export_format=job.export_format)
+    except Exception as e:
+        job.status = ReportJob.Status.FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        return job.status
+
+    if isinstance(output, str):
+        output = output.encode('utf-8')
+    if isinstance(output, bytes):
+        output = ContentFile(output)
+    filename = f"{job.report_type}_{job.pk}.{EXPORT_EXTENSIONS[job.export_format]}"
+    with output:
+        job.file.save(filename, output, save=False)
+    job.status = ReportJob.Status.SUCCESS
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'status', 'finished_at'])
+    return job.status
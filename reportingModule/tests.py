@@ -1,3 +1,378 @@
-from django.test import TestCase
+import datetime
+import io
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest.mock import patch
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from django.conf import settings
+from django.db import models, transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+from accountModule.models import CustomUser
+from expenseModule.models import SaleTransaction
+from .cache import ReportCache, cached_generate, check_version_cache, make_key, model_version, report_cache
+from .models import ReportJob
+from .reports.base_report import EXPORT_CONTENT_TYPES
+from .reports.columnar import arrow_schema, arrow_type
+from .reports.registry import ReportRegistry
+from .reports.sales_report import SalesReport
 
-# Create your tests here.
+
+def create_sale(number, day=datetime.date(2025, 1, 15), quantity=2, price_per_product="10.00"):
+    # total_value is derived from quantity and price_per_product on save.
+    return SaleTransaction.objects.create(
+        sale_number=number, sale_place="Market", address="Address", phone="0500", date=day,
+        quantity=quantity, price_per_product=price_per_product, payment_method="cash",
+        delivery_date=day, vat="2.00",
+    )
+
+
+class ReportJobTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user = CustomUser.objects.create_user(username="reporter", password="secret")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for number in ("S-1", "S-2"):
+            create_sale(number)
+
+    def submit(self, payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('report_job_submit'), payload, format='json')
+        self.assertEqual(response.status_code, 202)
+        return response.data["job_id"]
+
+    def test_job_runs_and_serves_file(self):
+        job_id = self.submit({"report_type": "sales", "fields": ["sale_number", "total_value"]})
+
+        response = self.client.get(reverse('report_job_detail', args=[job_id]))
+        self.assertEqual(response.data["status"], ReportJob.Status.SUCCESS)
+        self.assertIn("download_url", response.data)
+
+        response = self.client.get(reverse('report_job_download', args=[job_id]))
+        self.assertEqual(response.status_code, 200)
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(content.splitlines(), ["sale_number,total_value", "S-1,20.00", "S-2,20.00"])
+
+    def test_failed_job_reports_error(self):
+        job_id = self.submit({"report_type": "sales", "fields": ["missing_field"]})
+
+        response = self.client.get(reverse('report_job_detail', args=[job_id]))
+        self.assertEqual(response.data["status"], ReportJob.Status.FAILED)
+        self.assertIn("missing_field", response.data["error"])
+        response = self.client.get(reverse('report_job_download', args=[job_id]))
+        self.assertEqual(response.status_code, 409)
+
+    def test_unknown_report_type_is_rejected(self):
+        response = self.client.post(reverse('report_job_submit'), {"report_type": "unknown"}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ReportJob.objects.exists())
+
+
+class StreamingCsvTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create_user(username="reporter", password="secret"))
+        for number in ("S-1", "S-2", "S-3"):
+            create_sale(number)
+
+    def test_stream_returns_streaming_csv(self):
+        response = self.client.post(reverse('generate_report'), {
+            "report_type": "sales", "fields": ["sale_number", "quantity"], "stream": True,
+        }, format='json')
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="sales_report.csv"', response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(content.splitlines(), ["sale_number,quantity", "S-1,2", "S-2,2", "S-3,2"])
+
+    def test_rows_are_sent_in_chunks(self):
+        report = SalesReport(["sale_number"], {})
+        report.chunk_size = 2
+        self.assertEqual(list(report.stream_csv()), ["sale_number\r\n", "S-1\r\nS-2\r\n", "S-3\r\n"])
+
+    def test_empty_report_is_header_only(self):
+        report = SalesReport(["sale_number", "date"], {"start_date": "2030-01-01"})
+        self.assertEqual(list(report.stream_csv()), ["sale_number,date\r\n"])
+
+
+class FieldSelectionTests(TestCase):
+    def test_only_requested_columns_are_selected(self):
+        report = SalesReport(["total_value", "sale_number", "total_value"], {})
+        self.assertEqual(report.get_values().query.values_select, ("total_value", "sale_number"))
+        self.assertEqual(report.get_header(), ["total_value", "sale_number"])
+        self.assertNotIn("vat", str(report.get_values().query))
+
+    def test_unknown_field_is_rejected(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create_user(username="reporter", password="secret"))
+        response = client.post(reverse('generate_report'), {
+            "report_type": "sales", "fields": ["sale_number", "password"],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", response.data["error"])
+
+
+class ReportCacheTests(TestCase):
+    def setUp(self):
+        report_cache.clear()
+        self.addCleanup(report_cache.clear)
+
+    def test_cache_key(self):
+        key = make_key("sales", ["sale_number", "date"], {"start_date": "2025-01-01", "end_date": "2025-02-01"},
+                       "csv", {"expenseModule.SaleTransaction": 1})
+        self.assertEqual(key, make_key(
+            "sales", ["sale_number", "date", "sale_number"], {"end_date": "2025-02-01", "start_date": "2025-01-01"},
+            "csv", {"expenseModule.SaleTransaction": 1},
+        ))
+        for changed in (
+            make_key("sales", ["date", "sale_number"], {"start_date": "2025-01-01", "end_date": "2025-02-01"},
+                     "csv", {"expenseModule.SaleTransaction": 1}),
+            make_key("sales", ["sale_number", "date"], {"start_date": "2025-01-01", "end_date": "2025-02-01"},
+                     "excel", {"expenseModule.SaleTransaction": 1}),
+            make_key("sales", ["sale_number", "date"], {"start_date": "2025-01-01", "end_date": "2025-02-01"},
+                     "csv", {"expenseModule.SaleTransaction": 2}),
+        ):
+            self.assertNotEqual(key, changed)
+
+    def test_writes_to_a_source_model_invalidate_cached_reports(self):
+        label = "expenseModule.SaleTransaction"
+        sale = create_sale("S-1")
+        first = model_version(label)
+        report = SalesReport(["sale_number"], {})
+        self.assertEqual(cached_generate("sales", report).splitlines(), ["sale_number", "S-1"])
+        with self.assertNumQueries(3):  # the version counter only, in a savepoint
+            cached_generate("sales", report)
+
+        create_sale("S-2")
+        second = model_version(label)
+        self.assertNotEqual(first, second)
+        self.assertEqual(cached_generate("sales", report).splitlines(), ["sale_number", "S-1", "S-2"])
+        sale.delete()
+        self.assertNotEqual(second, model_version(label))
+        self.assertEqual(cached_generate("sales", report).splitlines(), ["sale_number", "S-2"])
+
+    def test_unavailable_version_cache_never_breaks_writes(self):
+        broken = {**settings.CACHES, "broken": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "missing_cache_table",
+        }}
+        report = SalesReport(["sale_number"], {})
+        with override_settings(CACHES=broken, REPORT_CACHE={"VERSION_CACHE": "broken"}), \
+                self.assertLogs("reportingModule.cache", "ERROR"):
+            with transaction.atomic():
+                create_sale("S-1")
+            sale = create_sale("S-2")
+            sale.delete()
+            self.assertNotEqual(model_version("expenseModule.SaleTransaction"),
+                                model_version("expenseModule.SaleTransaction"))
+            # Treated as a cold cache: every request regenerates the report.
+            self.assertEqual(cached_generate("sales", report).splitlines(), ["sale_number", "S-1"])
+            create_sale("S-3")
+            self.assertEqual(cached_generate("sales", report).splitlines(), ["sale_number", "S-1", "S-3"])
+
+    def test_lru_eviction_by_count_and_bytes(self):
+        cache = ReportCache(max_entries=2, max_bytes=10)
+        cache.set("a", "123")
+        cache.set("b", "456")
+        cache.get("a")
+        cache.set("c", "789")
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), ("123", None, "789"))
+
+        cache.set("d", "12345678")
+        self.assertEqual((cache.get("a"), cache.get("c"), cache.get("d"), cache.size), (None, None, "12345678", 8))
+        cache.set("e", "12345678901")
+        self.assertIsNone(cache.get("e"))
+
+    def test_per_process_version_cache_fails_the_checks(self):
+        self.assertEqual(check_version_cache(), [])
+        locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=locmem, REPORT_CACHE={"VERSION_CACHE": "default"}):
+            self.assertEqual([error.id for error in check_version_cache()], ["reportingModule.E002"])
+        with override_settings(REPORT_CACHE={"VERSION_CACHE": "missing"}):
+            self.assertEqual([error.id for error in check_version_cache()], ["reportingModule.E001"])
+
+
+class ColumnarExportTests(TestCase):
+    def setUp(self):
+        create_sale("S-1", quantity=2, price_per_product="10.05")
+        create_sale("S-2", day=datetime.date(2025, 2, 1), quantity=3)
+        self.report = SalesReport(["sale_number", "date", "quantity", "total_value"], {})
+        self.report.chunk_size = 1
+
+    def assert_round_trip(self, table):
+        self.assertEqual(table.schema.field("total_value").type, pa.decimal128(10, 2))
+        self.assertEqual(table.schema.field("date").type, pa.date32())
+        self.assertEqual(table.schema.field("quantity").type, pa.int64())
+        self.assertEqual(table.to_pylist(), [
+            {"sale_number": "S-1", "date": datetime.date(2025, 1, 15), "quantity": 2, "total_value": Decimal("20.10")},
+            {"sale_number": "S-2", "date": datetime.date(2025, 2, 1), "quantity": 3, "total_value": Decimal("30.00")},
+        ])
+
+    def test_parquet_round_trip(self):
+        self.assert_round_trip(pq.read_table(io.BytesIO(self.report.generate("parquet"))))
+
+    def test_arrow_ipc_round_trip(self):
+        self.assert_round_trip(ipc.open_file(pa.BufferReader(self.report.generate("arrow"))).read_all())
+
+    def test_decimal_fields_keep_precision_and_scale(self):
+        field = models.DecimalField(max_digits=14, decimal_places=4)
+        self.assertEqual(arrow_type(field), pa.decimal128(14, 4))
+
+
+class ExcelExportTests(TestCase):
+    def setUp(self):
+        for number in range(5):
+            create_sale(f"S-{number}")
+
+    def sheets(self, content):
+        workbook = load_workbook(io.BytesIO(content), read_only=True)
+        return [[list(row) for row in sheet.iter_rows(values_only=True)] for sheet in workbook.worksheets]
+
+    def test_rows_roll_over_to_a_new_sheet_at_the_row_limit(self):
+        with patch("reportingModule.reports.excel.EXCEL_MAX_ROWS", 3):
+            content = SalesReport(["sale_number", "quantity"], {}).generate("excel")
+        self.assertEqual(self.sheets(content), [
+            [["sale_number", "quantity"], ["S-0", 2], ["S-1", 2]],
+            [["sale_number", "quantity"], ["S-2", 2], ["S-3", 2]],
+            [["sale_number", "quantity"], ["S-4", 2]],
+        ])
+
+    def test_streamed_excel_is_sent_from_a_file(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create_user(username="reporter", password="secret"))
+        response = client.post(reverse('generate_report'), {
+            "report_type": "sales", "fields": ["sale_number"], "export_format": "excel", "stream": True,
+        }, format='json')
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(response["Content-Type"], EXPORT_CONTENT_TYPES["excel"])
+        self.assertIn('filename="sales_report.xlsx"', response["Content-Disposition"])
+        rows = self.sheets(b"".join(response.streaming_content))[0]
+        self.assertEqual(rows, [["sale_number"], *[[f"S-{number}"] for number in range(5)]])
+
+
+class ReportRegistryTests(TestCase):
+    def setUp(self):
+        self.registry = ReportRegistry()
+        self.registry.register("sales", "reportingModule.reports.sales_report.SalesReport",
+                               model="expenseModule.SaleTransaction", fields=("sale_number", "date", "quantity"),
+                               filters=("start_date",), description="Sales")
+        self.registry.register("broken", "reportingModule.reports.missing_report.MissingReport",
+                               model="missingModule.Missing")
+
+    def test_report_modules_are_imported_on_first_use(self):
+        with patch("reportingModule.reports.registry.import_string", return_value=SalesReport) as import_string:
+            entry = self.registry.get("sales")
+            entry.get_fields()
+            entry.validate(["sale_number"], {})
+            import_string.assert_not_called()
+            entry.load()
+            entry.load()
+        import_string.assert_called_once_with("reportingModule.reports.sales_report.SalesReport")
+
+    def test_a_broken_report_only_makes_itself_unavailable(self):
+        with self.assertRaisesMessage(ValueError, "Report 'broken' is unavailable"):
+            self.registry.get("broken").load()
+        with self.assertRaisesMessage(ValueError, "Report 'broken' is unavailable"):
+            self.registry.get("broken").get_model()
+        self.assertIs(self.registry.get("sales").load(), SalesReport)
+        with self.assertRaisesMessage(ValueError, "Invalid Report Type: unknown"):
+            self.registry.get("unknown")
+
+    def test_fields_and_filters_are_validated_against_the_entry(self):
+        entry = self.registry.get("sales")
+        entry.validate(["sale_number"], {"start_date": "2025-01-01"},
+                       {"group_by": ["date"], "aggregates": {"quantity": "sum"}})
+        with self.assertRaisesMessage(ValueError, "Invalid report filters: end_date"):
+            entry.validate(["sale_number"], {"end_date": "2025-01-01"})
+        with self.assertRaisesMessage(ValueError, "Invalid report fields: vat"):
+            entry.validate(["sale_number", "vat"], {})
+        with self.assertRaisesMessage(ValueError, "Invalid report fields: total_value"):
+            entry.validate([], {}, {"group_by": ["date"], "aggregates": {"total_value": "sum"}})
+
+    def test_discovery_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create_user(username="reporter", password="secret"))
+        with patch("reportingModule.views.registry", self.registry):
+            response = client.get(reverse('report_list'))
+        self.assertEqual(response.status_code, 200)
+        sales, broken = response.data["reports"]
+        self.assertEqual(sales, {
+            "report_type": "sales", "description": "Sales", "model": "expenseModule.SaleTransaction",
+            "fields": ["sale_number", "date", "quantity"], "filters": ["start_date"], "available": True,
+        })
+        self.assertEqual((broken["report_type"], broken["available"], broken["fields"]), ("broken", False, []))
+        self.assertEqual(response.data["export_formats"], ["csv", "excel", "parquet", "arrow"])
+        response = client.post(reverse('generate_report'), {"report_type": "sales", "filters": {"buyer": 1}},
+                               format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class AggregatedReportTests(TestCase):
+    def setUp(self):
+        create_sale("S-1", day=datetime.date(2025, 1, 5), quantity=1)
+        create_sale("S-2", day=datetime.date(2025, 1, 20), quantity=3, price_per_product="10.20")
+        create_sale("S-3", day=datetime.date(2025, 2, 1), quantity=2)
+        self.aggregation = {
+            "group_by": ["date"], "date_trunc": "month",
+            "aggregates": {"total_value": "sum", "quantity": ["count", "avg"]},
+        }
+
+    def test_groups_by_truncated_date(self):
+        report = SalesReport([], {}, aggregation=self.aggregation)
+        self.assertEqual(report.get_header(), ["date_month", "total_value__sum", "quantity__count", "quantity__avg"])
+        self.assertEqual(report.get_data(), [
+            {"date_month": datetime.date(2025, 1, 1), "total_value__sum": Decimal("40.60"), "quantity__count": 2,
+             "quantity__avg": 2.0},
+            {"date_month": datetime.date(2025, 2, 1), "total_value__sum": Decimal("20.00"), "quantity__count": 1,
+             "quantity__avg": 2.0},
+        ])
+        lines = report.generate("csv").splitlines()
+        self.assertEqual((lines[0], len(lines)), ("date_month,total_value__sum,quantity__count,quantity__avg", 3))
+
+    def test_columns_follow_the_group_by_order(self):
+        aggregation = {"group_by": ["date", "quantity"], "date_trunc": "month", "aggregates": {"total_value": "sum"}}
+        report = SalesReport([], {}, aggregation=aggregation)
+        header = ["date_month", "quantity", "total_value__sum"]
+        self.assertEqual(report.get_header(), header)
+        self.assertEqual([list(row) for row in report.get_data()], [header] * 3)
+        self.assertEqual(list(next(report.iter_rows())), header)
+        lines = report.generate("csv").splitlines()
+        self.assertEqual(lines[0], ",".join(header))
+        self.assertTrue(lines[1].startswith("2025-01-01,1,"))  # SQLite drops the trailing zeros of the sum
+        table = pq.read_table(io.BytesIO(report.generate("parquet")))
+        self.assertEqual(table.schema.names, header)
+        self.assertEqual(table.slice(0, 1).to_pylist(),
+                         [{"date_month": datetime.date(2025, 1, 1), "quantity": 1, "total_value__sum": Decimal("10.00")}])
+        workbook = load_workbook(io.BytesIO(report.generate("excel")), read_only=True)
+        self.assertEqual(list(next(workbook.worksheets[0].iter_rows(min_row=2, values_only=True)))[1:], [1, 10])
+
+    def test_arrow_schema_of_aggregated_output(self):
+        report = SalesReport([], {}, aggregation=self.aggregation)
+        schema = arrow_schema(report.get_values())
+        self.assertEqual(
+            [(field.name, field.type) for field in schema],
+            [("date_month", pa.date32()), ("total_value__sum", pa.decimal128(38, 2)),
+             ("quantity__count", pa.int64()), ("quantity__avg", pa.float64())],
+        )
+        table = pq.read_table(io.BytesIO(report.generate("parquet")))
+        self.assertEqual(table.column("total_value__sum").to_pylist(), [Decimal("40.60"), Decimal("20.00")])
+
+    def test_aggregates_without_group_by_are_rejected(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create_user(username="reporter", password="secret"))
+        response = client.post(reverse('generate_report'), {
+            "report_type": "sales", "aggregates": {"total_value": "sum"},
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("group_by", response.data["error"])
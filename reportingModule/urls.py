@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import ReportListView, GenerateReportView, SubmitReportJobView, ReportJobDetailView, ReportJobDownloadView
+
+urlpatterns = [
+    path('', ReportListView.as_view(), name='report_list'),
+    path('generate/', GenerateReportView.as_view(), name='generate_report'),
+    path('jobs/', SubmitReportJobView.as_view(), name='report_job_submit'),
+    path('jobs/<uuid:job_id>/', ReportJobDetailView.as_view(), name='report_job_detail'),
+    path('jobs/<uuid:job_id>/download/', ReportJobDownloadView.as_view(), name='report_job_download'),
+]
@@ -1,10 +1,57 @@
 # reportingModule/views.py
 
+import os
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
+from .cache import cached_generate
+from .models import ReportJob
+from .reports import registry
+from .reports.base_report import EXPORT_CONTENT_TYPES, EXPORT_EXTENSIONS
 from .reports.report_factory import ReportFactory
+from .tasks import generate_report_job
+
+AGGREGATION_KEYS = ('group_by', 'aggregates', 'date_trunc')
+
+
+def get_aggregation(data):
+    """
+    Collects the optional aggregation options of a report payload.
+    """
+    return {key: data[key] for key in AGGREGATION_KEYS if data.get(key)}
+
+
+class ReportListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Lists the registered reports with the fields, filters and export formats they accept.
+        Report modules are not imported to build this list.
+        """
+        reports = []
+        for entry in registry.all():
+            try:
+                fields = entry.get_fields()
+                available = True
+            except ValueError:
+                fields = []
+                available = False
+            reports.append({
+                "report_type": entry.name,
+                "description": entry.description,
+                "model": entry.model,
+                "fields": fields,
+                "filters": list(entry.filters),
+                "available": available,
+            })
+        return Response({"reports": reports, "export_formats": list(EXPORT_EXTENSIONS)})
+
 
 class GenerateReportView(APIView):
     permission_classes = [IsAuthenticated]
@@ -13,10 +60,16 @@ class GenerateReportView(APIView):
         """
         Expected JSON payload:
         {
-            "report_type": "sales",         # or 'vaccination', 'animal', etc.
+            "report_type": "sales",         # or 'vaccination', etc.
             "fields": ["id", "amount", ...],  # list of fields the user wants
             "filters": {"start_date": "2025-01-01", "end_date": "2025-01-31"},
-            "export_format": "csv"            # or 'excel'
+            "export_format": "csv",           # or 'excel', 'parquet', 'arrow'
+            "stream": false,                  # true streams a csv or excel export as a file download
+
+            # Optional, aggregates in the database instead of returning raw rows:
+            "group_by": ["product", "date"],
+            "aggregates": {"total_value": "sum", "id": ["count"]},   # sum, count, avg, min, max
+            "date_trunc": "month"             # day, week or month; applied to the date fields in group_by
         }
         """
         data = request.data
@@ -24,14 +77,107 @@ class GenerateReportView(APIView):
         fields = data.get('fields', [])
         filters = data.get('filters', {})
         export_format = data.get('export_format', 'csv')
+        stream = data.get('stream', False)
+        aggregation = get_aggregation(data)
+
+        if stream and export_format not in ('csv', 'excel'):
+            return Response({"error": "Streaming is only supported for csv and excel exports"}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
             # Use the factory to create the proper report instance.
-            report = ReportFactory.create_report(report_type, fields, filters, user=request.user)
-            output = report.generate(export_format=export_format)
+            report = ReportFactory.create_report(report_type, fields, filters, user=request.user, aggregation=aggregation)
+            if stream and export_format == 'excel':
+                excel_file = report.excel_file()
+            elif stream:
+                chunks = report.stream_csv()
+            else:
+                output = cached_generate(report_type, report, export_format=export_format)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if stream and export_format == 'excel':
+            # The workbook was written row by row to a temporary file; send it from disk.
+            return FileResponse(
+                excel_file,
+                as_attachment=True,
+                filename=f"{report_type}_report.xlsx",
+                content_type=EXPORT_CONTENT_TYPES['excel'],
+            )
+        if stream:
+            # Rows are read from the database in chunks and written as they arrive,
+            # so memory stays flat regardless of the report size.
+            response = StreamingHttpResponse(chunks, content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="{report_type}_report.csv"'
+            return response
         
-        # For binary data (like Excel), you might want to return a FileResponse.
-        # Here we simply return the content as a string for demonstration.
+        # Binary formats (excel, parquet, arrow) can't travel in a JSON body; send them as a download.
+        if isinstance(output, bytes):
+            response = HttpResponse(output, content_type=EXPORT_CONTENT_TYPES[export_format])
+            response['Content-Disposition'] = f'attachment; filename="{report_type}_report.{EXPORT_EXTENSIONS[export_format]}"'
+            return response
         return Response({"report": output})
+
+
+class SubmitReportJobView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Queues a report to be generated by a celery worker.
+        Accepts the same payload as GenerateReportView and returns the job id to poll.
+        """
+        data = request.data
+        report_type = data.get('report_type')
+        fields = data.get('fields', [])
+        filters = data.get('filters', {})
+        export_format = data.get('export_format', 'csv')
+        aggregation = get_aggregation(data)
+
+        if export_format not in EXPORT_EXTENSIONS:
+            return Response({"error": "Unsupported export format"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # Fail fast on an unknown report type instead of queuing a job that can only fail.
+            ReportFactory.create_report(report_type, fields, filters, user=request.user, aggregation=aggregation)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = ReportJob.objects.create(
+            user=request.user,
+            report_type=report_type,
+            fields=fields,
+            filters=filters,
+            aggregation=aggregation,
+            export_format=export_format,
+        )
+        job_id = str(job.pk)
+        transaction.on_commit(lambda: generate_report_job.delay(job_id))
+        return Response({"job_id": job_id, "status": job.status}, status=status.HTTP_202_ACCEPTED)
+
+
+class ReportJobDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id, *args, **kwargs):
+        """
+        Returns the status of a report job, with a download link once it has finished.
+        """
+        job = get_object_or_404(ReportJob, pk=job_id, user=request.user)
+        payload = {"job_id": str(job.pk), "status": job.status}
+        if job.status == ReportJob.Status.SUCCESS:
+            payload["download_url"] = request.build_absolute_uri(reverse('report_job_download', args=[job.pk]))
+        elif job.status == ReportJob.Status.FAILED:
+            payload["error"] = job.error
+        return Response(payload)
+
+
+class ReportJobDownloadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id, *args, **kwargs):
+        """
+        Serves the finished report file from MEDIA_ROOT.
+        """
+        job = get_object_or_404(ReportJob, pk=job_id, user=request.user)
+        if job.status != ReportJob.Status.SUCCESS:
+            return Response({"error": "Report is not ready", "status": job.status}, status=status.HTTP_409_CONFLICT)
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=os.path.basename(job.file.name))